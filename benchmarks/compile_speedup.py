@@ -0,0 +1,75 @@
+"""
+Compares the interpreted evaluation of operator chains with the evaluation of
+the compiled chains from 'LogicalOperator.compile()'.
+The workloads are the perfect matching formulation of
+'sample/perfect_matching.py' on complete graphs of growing size and a chain
+without exclusion predicates in the form of the README example.
+
+Run with 'python -m benchmarks.compile_speedup'.
+"""
+
+from sample.perfect_matching import create_operators
+from sat_expander.LogicalOperator import (
+    LogicalOperator,
+    AndOperator,
+    OrOperator,
+    ExpressionOperator,
+)
+from sat_expander.Functions import FunctionFactory, to_tuple_iter
+
+from itertools import combinations, product
+from time import perf_counter
+from typing import Tuple
+
+
+def perfect_matching(n: int) -> Tuple[LogicalOperator, ...]:
+    V = tuple(range(1, n + 1))
+    return create_operators(V, tuple(combinations(V, 2)))
+
+
+def readme_chain(n: int) -> Tuple[LogicalOperator, ...]:
+    A = tuple(range(n))
+    factory = FunctionFactory()
+    factory.build("s", 2, product(A, A))
+    factory.build("r", 1, to_tuple_iter(A))
+    factory.add_constant("t")
+    return (
+        AndOperator(("x",), to_tuple_iter(A))
+        .chain(AndOperator(("z",), to_tuple_iter(A)))
+        .chain(OrOperator(("y",), to_tuple_iter(A)))
+        .chain(ExpressionOperator(factory, ("s(x, y)", "-r(z)", "t"))),
+    )
+
+
+def measure(operators: Tuple[LogicalOperator, ...]) -> Tuple[int, float, float]:
+    start = perf_counter()
+    interpreted = tuple(tuple(op.iter_clauses()) for op in operators)
+    interpreted_time = perf_counter() - start
+
+    start = perf_counter()
+    compiled = tuple(tuple(op.compile().iter_clauses()) for op in operators)
+    compiled_time = perf_counter() - start
+
+    if interpreted != compiled:
+        raise RuntimeError("The compiled chains produce different clauses.")
+    return sum(map(len, compiled)), interpreted_time, compiled_time
+
+
+def main():
+    print(
+        f"{'workload':>20} {'clauses':>10} {'interpreted':>12} {'compiled':>10} {'speedup':>8}"
+    )
+    workloads = [
+        (f"perfect matching K{n}", perfect_matching, n) for n in (4, 10, 20, 30)
+    ]
+    workloads += [(f"readme chain n={n}", readme_chain, n) for n in (4, 20, 40, 80)]
+    for name, build, n in workloads:
+        clauses, interpreted_time, compiled_time = measure(build(n))
+        print(
+            f"{name:>20} {clauses:>10} {interpreted_time:>11.3f}s "
+            f"{compiled_time:>9.3f}s {interpreted_time / compiled_time:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
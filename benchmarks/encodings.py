@@ -0,0 +1,131 @@
+"""
+Parameterized generators of standard SAT encodings for the benchmarks. Every
+generator returns the operators whose lines form the CNF and only uses the
+operators and the 'FunctionFactory' of the package.
+"""
+
+from sample.perfect_matching import create_operators
+from sat_expander.LogicalOperator import (
+    LogicalOperator,
+    AndOperator,
+    OrOperator,
+    ExpressionOperator,
+)
+from sat_expander.Functions import FunctionFactory, to_tuple_iter
+from sat_expander.ExclusionPredicates import require_value_item
+
+from itertools import combinations, product
+from random import Random
+from typing import Tuple
+
+
+def random_graph(
+    n: int, p: float, seed: int = 0
+) -> Tuple[Tuple[int, ...], Tuple[Tuple[int, int], ...]]:
+    """
+    Returns the vertices and edges of an Erdős–Rényi graph G(n, p).
+    """
+    random = Random(seed)
+    V = tuple(range(1, n + 1))
+    return V, tuple(edge for edge in combinations(V, 2) if random.random() < p)
+
+
+def perfect_matching(n: int, p: float, seed: int = 0) -> Tuple[LogicalOperator, ...]:
+    """
+    Perfect matching formulation of 'sample/perfect_matching.py' on a random
+    graph.
+    """
+    return create_operators(*random_graph(n, p, seed))
+
+
+def pigeonhole(n: int) -> Tuple[LogicalOperator, ...]:
+    """
+    n + 1 pigeons in n holes. Unsatisfiable.
+    """
+    pigeons = tuple(range(n + 1))
+    holes = tuple(range(n))
+    factory = FunctionFactory()
+    factory.build("p", 2, product(pigeons, holes))
+    return (
+        AndOperator(("i",), to_tuple_iter(pigeons))
+        .chain(OrOperator(("h",), to_tuple_iter(holes)))
+        .chain(ExpressionOperator(factory, ("p(i, h)",))),
+        AndOperator(("h",), to_tuple_iter(holes))
+        .chain(AndOperator(("i", "j"), combinations(pigeons, 2)))
+        .chain(ExpressionOperator(factory, ("-p(i, h)", "-p(j, h)"))),
+    )
+
+
+def n_queens(n: int) -> Tuple[LogicalOperator, ...]:
+    """
+    n queens on an n x n board which don't attack each other.
+    """
+    cells = tuple(product(range(n), range(n)))
+    factory = FunctionFactory()
+    factory.build("q", 2, cells)
+    attacks = tuple(
+        (r1, c1, r2, c2)
+        for (r1, c1), (r2, c2) in combinations(cells, 2)
+        if r1 == r2 or c1 == c2 or abs(r1 - r2) == abs(c1 - c2)
+    )
+    return (
+        AndOperator(("r",), to_tuple_iter(range(n)))
+        .chain(OrOperator(("c",), to_tuple_iter(range(n))))
+        .chain(ExpressionOperator(factory, ("q(r, c)",))),
+        AndOperator(("r1", "c1", "r2", "c2"), attacks).chain(
+            ExpressionOperator(factory, ("-q(r1, c1)", "-q(r2, c2)"))
+        ),
+    )
+
+
+def graph_coloring(
+    n: int, p: float, k: int, seed: int = 0
+) -> Tuple[LogicalOperator, ...]:
+    """
+    Colors the vertices of a random graph with k colors, such that adjacent
+    vertices have different colors.
+    """
+    V, E = random_graph(n, p, seed)
+    colors = tuple(range(k))
+    factory = FunctionFactory()
+    factory.build("col", 2, product(V, colors))
+    return (
+        AndOperator(("v",), to_tuple_iter(V))
+        .chain(OrOperator(("c",), to_tuple_iter(colors)))
+        .chain(ExpressionOperator(factory, ("col(v, c)",))),
+        AndOperator(("v",), to_tuple_iter(V))
+        .chain(AndOperator(("c", "d"), combinations(colors, 2)))
+        .chain(ExpressionOperator(factory, ("-col(v, c)", "-col(v, d)"))),
+        AndOperator(("u", "w"), E)
+        .chain(AndOperator(("c",), to_tuple_iter(colors)))
+        .chain(ExpressionOperator(factory, ("-col(u, c)", "-col(w, c)"))),
+    )
+
+
+def sudoku(b: int) -> Tuple[LogicalOperator, ...]:
+    """
+    Empty Sudoku with b x b boxes, i.e. a grid of size b^2 x b^2.
+    """
+    N = b * b
+    numbers = tuple(range(N))
+    cells = tuple(product(numbers, numbers))
+    boxes = tuple((r // b * b + c // b, r, c) for r, c in cells)
+    factory = FunctionFactory()
+    factory.build("x", 3, product(numbers, numbers, numbers))
+    return (
+        AndOperator(("r", "c"), cells)
+        .chain(OrOperator(("d",), to_tuple_iter(numbers)))
+        .chain(ExpressionOperator(factory, ("x(r, c, d)",))),
+        AndOperator(("r", "c"), cells)
+        .chain(AndOperator(("d", "e"), combinations(numbers, 2)))
+        .chain(ExpressionOperator(factory, ("-x(r, c, d)", "-x(r, c, e)"))),
+        AndOperator(("r", "d"), cells)
+        .chain(OrOperator(("c",), to_tuple_iter(numbers)))
+        .chain(ExpressionOperator(factory, ("x(r, c, d)",))),
+        AndOperator(("c", "d"), cells)
+        .chain(OrOperator(("r",), to_tuple_iter(numbers)))
+        .chain(ExpressionOperator(factory, ("x(r, c, d)",))),
+        AndOperator(("box", "d"), cells)
+        .chain(OrOperator(("b", "r", "c"), boxes, require_value_item(0, "box")))
+        .chain(ExpressionOperator(factory, ("x(r, c, d)",))),
+    )
@@ -0,0 +1,191 @@
+"""
+Generates the encodings of 'benchmarks/encodings.py' at growing sizes and
+reports the throughput of the clause generation and of writing DIMACS.
+
+For every workload the clauses are generated once to count the clauses and
+literals and once more while streaming them into a DIMACS file with
+'write_dimacs'. Every workload runs in its own process, so the peak resident
+set size belongs to the workload alone.
+
+Run with 'python -m benchmarks.scaling --scale small'. The 'large' scale
+generates millions of clauses per workload. The results can be saved with
+'--save baseline.json' and a later run can be compared with
+'--compare baseline.json'. The comparison fails, if a throughput drops or the
+peak memory grows by more than '--tolerance', or if the number of clauses
+changes.
+"""
+
+from benchmarks import encodings
+from sat_expander.CNF import write_dimacs
+
+from argparse import ArgumentParser, SUPPRESS
+from itertools import chain
+from tempfile import TemporaryDirectory
+from time import perf_counter
+from typing import Dict, List
+import json
+import os
+import platform
+import resource
+import subprocess
+import sys
+
+WORKLOADS = {
+    "perfect_matching": (
+        encodings.perfect_matching,
+        {"small": (12, 0.5), "medium": (200, 0.1), "large": (1000, 0.05)},
+    ),
+    "pigeonhole": (
+        encodings.pigeonhole,
+        {"small": (10,), "medium": (50,), "large": (150,)},
+    ),
+    "n_queens": (
+        encodings.n_queens,
+        {"small": (8,), "medium": (40,), "large": (100,)},
+    ),
+    "graph_coloring": (
+        encodings.graph_coloring,
+        {"small": (50, 0.2, 4), "medium": (500, 0.05, 8), "large": (2000, 0.05, 10)},
+    ),
+    "sudoku": (
+        encodings.sudoku,
+        {"small": (3,), "medium": (5,), "large": (7,)},
+    ),
+}
+# Metrics where a higher value is better or worse.
+THROUGHPUTS = ("clauses_per_second", "literals_per_second", "dimacs_bytes_per_second")
+COSTS = ("peak_rss_kb",)
+
+
+def run_workload(name: str, scale: str) -> Dict:
+    build, scales = WORKLOADS[name]
+    parameters = scales[scale]
+    operators = build(*parameters)
+
+    clauses = literals = 0
+    start = perf_counter()
+    for line in chain.from_iterable(op.iter_clauses() for op in operators):
+        clauses += 1
+        literals += len(line)
+    generate_seconds = perf_counter() - start
+
+    with TemporaryDirectory() as directory:
+        path = os.path.join(directory, f"{name}.cnf")
+        start = perf_counter()
+        write_dimacs(path, chain.from_iterable(op.iter_clauses() for op in operators))
+        dimacs_seconds = perf_counter() - start
+        dimacs_bytes = os.path.getsize(path)
+
+    return {
+        "workload": name,
+        "scale": scale,
+        "parameters": list(parameters),
+        "clauses": clauses,
+        "literals": literals,
+        "generate_seconds": generate_seconds,
+        "clauses_per_second": clauses / generate_seconds,
+        "literals_per_second": literals / generate_seconds,
+        "dimacs_bytes": dimacs_bytes,
+        "dimacs_seconds": dimacs_seconds,
+        "dimacs_bytes_per_second": dimacs_bytes / dimacs_seconds,
+        # Kilobytes on Linux, bytes on macOS.
+        "peak_rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        // (1024 if sys.platform == "darwin" else 1),
+    }
+
+
+def run_in_subprocess(name: str, scale: str) -> Dict:
+    output = subprocess.run(
+        [sys.executable, "-m", "benchmarks.scaling", "--single", name, scale],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout
+    return json.loads(output)
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """
+    Returns a message for every regression of the results against the baseline.
+    """
+    previous = {(r["workload"], r["scale"]): r for r in baseline["results"]}
+    regressions = []
+    for result in results:
+        old = previous.get((result["workload"], result["scale"]))
+        if old is None:
+            continue
+        label = f"{result['workload']} ({result['scale']})"
+        if result["clauses"] != old["clauses"]:
+            regressions.append(
+                f"{label}: {result['clauses']} clauses instead of {old['clauses']}"
+            )
+        for metric in THROUGHPUTS:
+            if result[metric] < old[metric] * (1 - tolerance):
+                regressions.append(
+                    f"{label}: {metric} dropped from {old[metric]:.0f} to {result[metric]:.0f}"
+                )
+        for metric in COSTS:
+            if result[metric] > old[metric] * (1 + tolerance):
+                regressions.append(
+                    f"{label}: {metric} grew from {old[metric]} to {result[metric]}"
+                )
+    return regressions
+
+
+def print_result(result: Dict):
+    print(
+        f"{result['workload']:>17} {result['clauses']:>10} "
+        f"{result['clauses_per_second']:>12.0f} {result['literals_per_second']:>12.0f} "
+        f"{result['dimacs_bytes_per_second'] / 2**20:>10.2f} "
+        f"{result['peak_rss_kb'] / 1024:>9.1f}"
+    )
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--scale", choices=("small", "medium", "large"), default="small"
+    )
+    parser.add_argument("--workloads", nargs="+", choices=tuple(WORKLOADS))
+    parser.add_argument("--save", metavar="PATH", help="write the results as JSON")
+    parser.add_argument("--compare", metavar="PATH", help="JSON baseline to compare")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    parser.add_argument("--single", nargs=2, help=SUPPRESS)
+    args = parser.parse_args()
+
+    if args.single:
+        print(json.dumps(run_workload(*args.single)))
+        return
+
+    print(
+        f"{'workload':>17} {'clauses':>10} {'clauses/s':>12} {'literals/s':>12} "
+        f"{'DIMACS MB/s':>10} {'peak MB':>9}"
+    )
+    results = []
+    for name in args.workloads or WORKLOADS:
+        result = run_in_subprocess(name, args.scale)
+        print_result(result)
+        results.append(result)
+
+    if args.save:
+        with open(args.save, "w") as file:
+            json.dump(
+                {
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "results": results,
+                },
+                file,
+                indent=2,
+            )
+    if args.compare:
+        with open(args.compare) as file:
+            regressions = compare(results, json.load(file), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
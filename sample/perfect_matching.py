@@ -8,15 +8,25 @@ The graph G=(V,E) consists of a vertex set consisting of integers and an edge
 set consisting of pairs of vertices.
 For example: G=((1, 2, 3, 4), ((1, 2), (1, 3), (1, 4), (2, 3), (2, 4), (3, 4)))
 """
-from sat_expander.LogicalOperator import OrOperator, AndOperator, ExpressionOperator
+from sat_expander.LogicalOperator import (
+    LogicalOperator,
+    OrOperator,
+    AndOperator,
+    ExpressionOperator,
+)
 from sat_expander.Functions import FunctionFactory, to_tuple_iter
-from sat_expander.ExclusionPredicates import check_variables_in_context
+from sat_expander.ExclusionPredicates import (
+    check_variables_in_context,
+    require_var_in_value,
+)
 from sat_expander.CNF import cnf_to_dimacs
 
 from typing import Tuple
 
 
-def create_sat_formulation(V: Tuple[int, ...], E: Tuple[Tuple[int, int], ...]) -> str:
+def create_operators(
+    V: Tuple[int, ...], E: Tuple[Tuple[int, int], ...]
+) -> Tuple[LogicalOperator, LogicalOperator]:
     """
     First we define the function 'p(u,v)' which describes if the edeg
     consisting of the vertices u, v is in the perfect matching.
@@ -24,10 +34,8 @@ def create_sat_formulation(V: Tuple[int, ...], E: Tuple[Tuple[int, int], ...]) -
     factory = FunctionFactory()
     factory.build("p", 2, E)
 
-    @check_variables_in_context("v")
-    def vertex_in_edge(context, value: Tuple[int, int]) -> bool:
-        # Checks if edge is incident to vertex v
-        return context.vars["v"] in value
+    # Checks if edge is incident to vertex v
+    vertex_in_edge = require_var_in_value("v")
 
     """
     For each vertex v, there should be an edge uw such that either u=v or w=v
@@ -45,10 +53,14 @@ def create_sat_formulation(V: Tuple[int, ...], E: Tuple[Tuple[int, int], ...]) -
 
     We also need the additional predicate:
     v needs to be incident to the edge e' and e' != e
+    Since 'vertex_in_edge' describes its logic, the operators only iterate the
+    edges incident to v instead of all edges.
     """
-    @check_variables_in_context("v", "u", "w")
-    def vertex_in_edge_and_edges_not_same(context, edge: Tuple[int, int]) -> bool:
-        return context.vars["v"] in edge and set(edge) != set((context.vars["u"], context.vars["w"]))
+    @check_variables_in_context("u", "w")
+    def edges_not_same(context, edge: Tuple[int, int]) -> bool:
+        return set(edge) != set((context.vars["u"], context.vars["w"]))
+
+    vertex_in_edge_and_edges_not_same = vertex_in_edge & edges_not_same
 
     vertex_dont_share_two_edges_in_matching = AndOperator(("v", ), to_tuple_iter(V)).chain(
         AndOperator(("u", "w"), E, vertex_in_edge)
@@ -58,6 +70,11 @@ def create_sat_formulation(V: Tuple[int, ...], E: Tuple[Tuple[int, int], ...]) -
         ExpressionOperator(factory, ("-p(u,w)", "-p(r,s)"))
     )
 
+    return each_vertex_in_matching, vertex_dont_share_two_edges_in_matching
+
+
+def create_sat_formulation(V: Tuple[int, ...], E: Tuple[Tuple[int, int], ...]) -> str:
+    each_vertex_in_matching, vertex_dont_share_two_edges_in_matching = create_operators(V, E)
     cnf1 = each_vertex_in_matching.evaluate()
     cnf2 = vertex_dont_share_two_edges_in_matching.evaluate()
     return cnf_to_dimacs(cnf1 + cnf2)
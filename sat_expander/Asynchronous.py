@@ -0,0 +1,192 @@
+from sat_expander.CNF import (
+    CNFLine,
+    DIMACS_BUFFER_SIZE,
+    DIMACS_HEADER,
+    DimacsFile,
+    dimacs_parameters,
+    number_of_variables,
+    write_clauses,
+)
+from sat_expander.Functions import FunctionFactory
+from sat_expander.LogicalOperator import LogicalOperator
+from sat_expander.LogicalOperatorContext import LogicalOperatorContext
+
+from asyncio import StreamWriter
+from concurrent.futures import Executor
+from io import BytesIO
+from itertools import islice
+from os import PathLike
+from typing import AsyncIterable, AsyncIterator, Iterator, Tuple
+import asyncio
+
+DEFAULT_BATCH_SIZE = 10_000
+
+ClauseBatch = Tuple[CNFLine, ...]
+
+
+async def aiter_clauses(
+    operator: LogicalOperator,
+    context: LogicalOperatorContext | None = None,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    executor: Executor | None = None,
+) -> AsyncIterator[ClauseBatch]:
+    """
+    Yields the lines of 'operator.iter_clauses(context)' in batches of
+    'batch_size' lines, only the last batch can be smaller. Every batch is
+    generated in 'executor' or the default executor of the event loop, so
+    the event loop keeps serving other tasks meanwhile.
+
+    The chain is evaluated by one thread at a time, so 'executor' must run
+    in the same process, e.g. a 'ThreadPoolExecutor'. Use the 'workers' of
+    'AndOperator.iter_clauses' to evaluate on several cores.
+    """
+    if batch_size < 1:
+        raise ValueError(f"The batch size must be positive, but is '{batch_size}'.")
+    loop = asyncio.get_running_loop()
+    clauses = operator.iter_clauses(context)
+    try:
+        while True:
+            batch = await loop.run_in_executor(
+                executor, _next_batch, clauses, batch_size
+            )
+            if batch:
+                yield batch
+            if len(batch) < batch_size:
+                return
+    finally:
+        try:
+            clauses.close()
+        except ValueError:
+            # The batch is still generated in the executor, because the
+            # iteration was cancelled. The generator is dropped afterwards.
+            pass
+
+
+def _next_batch(clauses: Iterator[CNFLine], batch_size: int) -> ClauseBatch:
+    return tuple(islice(clauses, batch_size))
+
+
+class AsyncDimacsSink:
+    def __init__(
+        self,
+        target: StreamWriter | str | PathLike,
+        factory: FunctionFactory | None = None,
+        header: str | None = None,
+        num_clauses: int | None = None,
+        num_variables: int | None = None,
+        executor: Executor | None = None,
+        buffer_size: int = DIMACS_BUFFER_SIZE,
+    ):
+        """
+        Writes batches of clauses in the DIMACS format without blocking the
+        event loop.
+
+        A path is written like a 'DimacsFile', where the file operations run
+        in 'executor'. The file is opened by 'open', which is called by
+        'async with' or the first 'write', and the 'p cnf' line is updated
+        by 'close'. A 'StreamWriter', e.g. a socket or the standard input of
+        a solver started with 'asyncio.create_subprocess_exec', can't be
+        updated afterwards. Then the 'p cnf' line is written first and
+        'num_clauses' and the number of variables, by 'num_variables' or
+        'factory', must be known beforehand. The batches are converted to
+        text in 'executor' and written once the stream accepts more data.
+
+        Keyword arguments:
+        factory -- 'FunctionFactory' used to build the clauses. Its
+            'variable_counter' gives the number of variables.
+        header -- comment lines of the DIMACS output.
+        """
+        self.factory: FunctionFactory | None = factory
+        self.executor: Executor | None = executor
+        self.buffer_size: int = buffer_size
+        self.num_clauses: int = 0
+        self.expected_clauses: int | None = num_clauses
+        self.file: DimacsFile | None = None
+        self.stream: StreamWriter | None = None
+        self._file_arguments: Tuple | None = None
+        if isinstance(target, StreamWriter):
+            if num_clauses is None or (factory is None and num_variables is None):
+                raise ValueError(
+                    "The number of clauses and variables must be given to write to a stream."
+                )
+            self.stream = target
+            self.num_variables: int = number_of_variables(factory, num_variables or 0)
+            self.stream.write(
+                (
+                    (DIMACS_HEADER if header is None else header)
+                    + dimacs_parameters(self.num_variables, num_clauses)
+                ).encode()
+            )
+        else:
+            self._file_arguments = (target, factory, header, buffer_size)
+
+    async def open(self):
+        """
+        Opens the 'DimacsFile' of a path in 'executor'. Does nothing for
+        streams and opened files.
+        """
+        if self._file_arguments is not None and self.file is None:
+            self.file = await asyncio.get_running_loop().run_in_executor(
+                self.executor, DimacsFile, *self._file_arguments
+            )
+
+    async def write(self, batch: ClauseBatch) -> int:
+        """
+        Writes a batch of clauses and returns the number of written clauses.
+        """
+        loop = asyncio.get_running_loop()
+        if self._file_arguments is not None:
+            await self.open()
+            written = await loop.run_in_executor(self.executor, self.file.add, batch)
+        else:
+            data, written, max_variable = await loop.run_in_executor(
+                self.executor, _dimacs_bytes, batch, self.buffer_size
+            )
+            if max_variable > self.num_variables:
+                raise RuntimeError(
+                    f"The variable '{max_variable}' exceeds the '{self.num_variables}' variables of the 'p cnf' line."
+                )
+            self.stream.write(data)
+            await self.stream.drain()
+        self.num_clauses += written
+        return written
+
+    async def write_all(self, batches: AsyncIterable[ClauseBatch]) -> int:
+        """
+        Writes all batches, e.g. of 'aiter_clauses', and returns the number of
+        written clauses.
+        """
+        written = 0
+        async for batch in batches:
+            written += await self.write(batch)
+        return written
+
+    async def close(self):
+        """
+        Updates the 'p cnf' line of a file and closes it. A stream is only
+        drained, so it can be used further.
+        """
+        if self._file_arguments is not None:
+            await self.open()
+            await asyncio.get_running_loop().run_in_executor(
+                self.executor, self.file.close
+            )
+            return
+        await self.stream.drain()
+        if self.num_clauses != self.expected_clauses:
+            raise RuntimeError(
+                f"Expected '{self.expected_clauses}' clauses, but '{self.num_clauses}' clauses were written."
+            )
+
+    async def __aenter__(self) -> "AsyncDimacsSink":
+        await self.open()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+
+def _dimacs_bytes(batch: ClauseBatch, buffer_size: int) -> Tuple[bytes, int, int]:
+    target = BytesIO()
+    written, max_variable = write_clauses(target, batch, str.encode, buffer_size, True)
+    return target.getvalue(), written, max_variable
@@ -1,31 +1,692 @@
-from typing import Tuple
+from sat_expander.Functions import FunctionFactory
+
+from typing import Dict, Tuple, Iterable, Iterator, BinaryIO, TextIO, Sized
+from array import array
+from os import PathLike, SEEK_END, fspath, path as os_path
+from io import TextIOBase
+from shutil import copyfileobj
+from tempfile import TemporaryFile
+import bz2
+import gzip
+import lzma
 
 CNFLine = Tuple[int, ...]
 CNF = Tuple[CNFLine, ...]
 
+DIMACS_HEADER = """
+c
+c DIMACS format file generated by SATExpander (https://github.com/PantomInach/SATExpander).
+c
+"""
+# Widths of the fields of a 'p cnf' line which is patched after writing.
+DIMACS_VARIABLES_WIDTH = 10
+DIMACS_CLAUSES_WIDTH = 20
+DIMACS_BUFFER_SIZE = 1 << 20
+# Compressions of DIMACS files chosen by the suffix of the path.
+DIMACS_COMPRESSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+
+class CompactCNF:
+    def __init__(self, clauses: Iterable[CNFLine] = ()):
+        """
+        CNF which stores the literals of all lines in one flat array of 32 bit
+        integers. The line 'i' consists of the literals between 'offsets[i]'
+        and 'offsets[i + 1]'. Iterating yields the lines as tuples, so it can
+        be used in place of a 'CNF'.
+
+        Both arrays support the buffer protocol and can be shared without
+        copying, e.g. with 'to_numpy'.
+        """
+        self.literals: array = array("i")
+        self.offsets: array = array("q", (0,))
+        self.extend(clauses)
+
+    def append(self, clause: CNFLine):
+        self.literals.extend(clause)
+        self.offsets.append(len(self.literals))
+
+    def extend(self, clauses: Iterable[CNFLine]):
+        if isinstance(clauses, CompactCNF):
+            self += clauses
+            return
+        literals = self.literals
+        offsets = self.offsets
+        for clause in clauses:
+            literals.extend(clause)
+            offsets.append(len(literals))
+
+    def extend_block(self, block):
+        """
+        Appends the rows of a two dimensional NumPy array as lines.
+        """
+        rows, width = block.shape
+        self.literals.frombytes(block.astype("int32").tobytes())
+        start = self.offsets[-1]
+        if width:
+            self.offsets.extend(range(start + width, start + rows * width + 1, width))
+        else:
+            self.offsets.extend(start for _ in range(rows))
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index: int) -> CNFLine:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("CompactCNF index out of range.")
+        return tuple(self.literals[self.offsets[index] : self.offsets[index + 1]])
+
+    def __iter__(self) -> Iterator[CNFLine]:
+        literals = self.literals
+        start = 0
+        for end in self.offsets[1:]:
+            yield tuple(literals[start:end])
+            start = end
+
+    def __add__(self, other: "CompactCNF | CNF") -> "CompactCNF":
+        result = CompactCNF()
+        result.literals = self.literals[:]
+        result.offsets = self.offsets[:]
+        result += other
+        return result
+
+    def __radd__(self, other: CNF) -> "CompactCNF":
+        result = CompactCNF(other)
+        result += self
+        return result
+
+    def __iadd__(self, other: "CompactCNF | CNF") -> "CompactCNF":
+        if not isinstance(other, CompactCNF):
+            self.extend(other)
+            return self
+        shift = len(self.literals)
+        self.literals.extend(other.literals)
+        self.offsets.extend(offset + shift for offset in other.offsets[1:])
+        return self
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, CompactCNF):
+            return self.literals == other.literals and self.offsets == other.offsets
+        try:
+            return len(self) == len(other) and all(
+                a == tuple(b) for a, b in zip(self, other)
+            )
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"CompactCNF({tuple(self)})"
+
+    @property
+    def nbytes(self) -> int:
+        return (
+            len(self.literals) * self.literals.itemsize
+            + len(self.offsets) * self.offsets.itemsize
+        )
 
-def join_cnfs(cnf1: CNF, cnf2: CNF) -> CNF:
+    def to_numpy(self):
+        """
+        Returns the literals and offsets as NumPy arrays sharing the memory of
+        this CNF. Requires NumPy to be installed.
+        """
+        import numpy
+
+        return (
+            numpy.frombuffer(self.literals, dtype=numpy.int32),
+            numpy.frombuffer(self.offsets, dtype=numpy.int64),
+        )
+
+    def write_dimacs(
+        self,
+        target: "str | PathLike | BinaryIO | TextIO",
+        factory: FunctionFactory | None = None,
+        header: str | None = None,
+        compresslevel: int | None = None,
+    ) -> int:
+        return write_dimacs(
+            target, self, factory=factory, header=header, compresslevel=compresslevel
+        )
+
+
+def join_cnfs(cnf1: CNF | CompactCNF, cnf2: CNF | CompactCNF) -> CNF | CompactCNF:
     return cnf1 + cnf2
 
 
 def cnf_to_dimacs(cnf: CNF, header=None) -> str:
-    header = (
+    header = DIMACS_HEADER if header is None else header
+    max_variable = 0
+    clauses = []
+    for line in cnf:
+        if line:
+            max_variable = max(max_variable, max(map(abs, line)))
+        clauses.append(" ".join(map(str, (*line, 0))) + "\n")
+    # Solvers expect the largest variable, not the number of used variables.
+    parameters = f"p cnf {max_variable} {len(cnf)}"
+    return header + parameters + "\n" + "".join(clauses)
+
+
+class VariableRenumbering:
+    def __init__(self, original: array):
         """
-c
-c DIMACS format file generated by SATExpander (https://github.com/PantomInach/SATExpander).
-c
-"""
-        if header is None
-        else header
+        Maps the variables 1..n of a CNF returned by 'compact_variables' to
+        the variables of the original CNF and back. 'original[i]' is the
+        original variable of 'i', where 'original[0]' is 0.
+        """
+        self.original: array = original
+        self._renumbered: Dict[int, int] | None = None
+
+    def __len__(self) -> int:
+        return len(self.original) - 1
+
+    def original_literal(self, literal: int) -> int:
+        variable = self.original[abs(literal)] if abs(literal) <= len(self) else 0
+        if not variable:
+            raise ValueError(f"The variable '{abs(literal)}' isn't renumbered.")
+        return variable if literal > 0 else -variable
+
+    def renumbered_literal(self, literal: int) -> int:
+        if self._renumbered is None:
+            self._renumbered = dict(zip(self.original, range(len(self.original))))
+            del self._renumbered[0]
+        variable = self._renumbered.get(abs(literal))
+        if variable is None:
+            raise ValueError(
+                f"The variable '{abs(literal)}' doesn't occur in the compacted CNF."
+            )
+        return variable if literal > 0 else -variable
+
+    def renumber(self, clauses: Iterable[CNFLine]) -> CompactCNF:
+        """
+        Renumbers further lines, e.g. assumptions, over the same variables.
+        """
+        return CompactCNF(tuple(map(self.renumbered_literal, line)) for line in clauses)
+
+    def restore_model(self, model: Iterable[int]) -> array:
+        """
+        Maps the signed literals of a model of the compacted CNF, e.g.
+        'SolverResult.model', to the original variables. The result can be
+        decoded with 'FunctionFactory.decode', which skips the variables not
+        occurring in the CNF.
+        """
+        original = self.original
+        n = len(original)
+        restored = array("i")
+        for literal in model:
+            if 0 < literal < n:
+                restored.append(original[literal])
+            elif 0 < -literal < n:
+                restored.append(-original[-literal])
+            else:
+                raise ValueError(f"The variable '{abs(literal)}' isn't renumbered.")
+        return restored
+
+
+def compact_variables(
+    clauses: Iterable[CNFLine],
+) -> Tuple[CompactCNF, VariableRenumbering]:
+    """
+    Renumbers the variables occurring in the clauses to 1..n in their order,
+    so that variables of functions which are never used in a line leave no
+    gaps. Returns the renumbered lines and the 'VariableRenumbering' for
+    restoring models of them. Writing the lines with 'write_dimacs' without a
+    factory then gives n as the number of variables. Uses NumPy if it is
+    installed.
+    """
+    if not isinstance(clauses, CompactCNF):
+        clauses = CompactCNF(clauses)
+    compacted = CompactCNF()
+    compacted.offsets = array("q", clauses.offsets)
+    try:
+        import numpy
+    except ImportError:
+        variables = sorted(set(map(abs, clauses.literals)))
+        renumbered = dict(zip(variables, range(1, len(variables) + 1)))
+        compacted.literals = array(
+            "i",
+            [renumbered[x] if x > 0 else -renumbered[-x] for x in clauses.literals],
+        )
+        return compacted, VariableRenumbering(array("i", [0, *variables]))
+    literals, _ = clauses.to_numpy()
+    variables, inverse = numpy.unique(numpy.abs(literals), return_inverse=True)
+    renumbered = (inverse.reshape(-1) + 1).astype(numpy.int32)
+    numpy.negative(renumbered, out=renumbered, where=literals < 0)
+    compacted.literals = array("i", renumbered.tobytes())
+    original = array("i", [0])
+    original.frombytes(variables.astype(numpy.int32).tobytes())
+    return compacted, VariableRenumbering(original)
+
+
+def write_dimacs(
+    target: str | PathLike | BinaryIO | TextIO,
+    clauses: Iterable[CNFLine],
+    factory: FunctionFactory | None = None,
+    header: str | None = None,
+    num_clauses: int | None = None,
+    buffer_size: int = DIMACS_BUFFER_SIZE,
+    compresslevel: int | None = None,
+) -> int:
+    """
+    Writes the clauses in the DIMACS format to 'target' while they are
+    generated and returns the number of written clauses. The clauses are never
+    collected, so e.g. 'AndOperator.iter_clauses()' can be passed directly.
+
+    Keyword arguments:
+    target -- path of the output file or an opened stream.
+    factory -- 'FunctionFactory' used to build the clauses. Its
+        'variable_counter' gives the number of variables in the 'p cnf' line.
+    num_clauses -- number of clauses, if known beforehand.
+    buffer_size -- number of characters collected before writing to 'target'.
+    compresslevel -- compression level for compressed files, see below.
+
+    If 'target' is seekable, the 'p cnf' line is written with fixed width
+    fields and patched after all clauses are written. Otherwise, the numbers
+    must be known beforehand, i.e. 'factory' and 'num_clauses' are given or
+    'clauses' is a sized collection, which is then iterated twice.
+
+    Paths ending with '.gz', '.bz2' or '.xz' are compressed with 'gzip', 'bz2'
+    or 'lzma' while the clauses are written. If the numbers aren't known
+    beforehand, the compressed clauses are written to a temporary file first.
+    The output then consists of a compressed stream with the header followed
+    by the compressed stream of the clauses, which is read as one file by
+    the decompressors.
+    """
+    if isinstance(target, (str, PathLike)):
+        compression = dimacs_compression(target)
+        if compression is None:
+            with open(target, "wb") as stream:
+                return write_dimacs(
+                    stream, clauses, factory, header, num_clauses, buffer_size
+                )
+        return _write_compressed_dimacs(
+            target,
+            compression,
+            compresslevel,
+            clauses,
+            factory,
+            header,
+            num_clauses,
+            buffer_size,
+        )
+    encode = (lambda s: s) if isinstance(target, TextIOBase) else str.encode
+    header = DIMACS_HEADER if header is None else header
+    target.write(encode(header))
+
+    if target.seekable():
+        parameters_position = target.tell()
+        target.write(encode(dimacs_parameters(0, 0, fixed_width=True)))
+        written, max_variable = write_clauses(
+            target, clauses, encode, buffer_size, factory is None
+        )
+        end_position = target.tell()
+        target.seek(parameters_position)
+        target.write(
+            encode(
+                dimacs_parameters(
+                    number_of_variables(factory, max_variable),
+                    written,
+                    fixed_width=True,
+                )
+            )
+        )
+        target.seek(end_position)
+        return written
+
+    return _write_dimacs_with_known_counts(
+        target, clauses, factory, num_clauses, buffer_size, encode
     )
-    unique_variables = set()
-    clauses = ""
-    for line in cnf:
-        clause_line = ""
-        for x in line:
-            unique_variables.add(abs(x))
-            clause_line += str(x) + " "
-        clause_line += "0"
-        clauses += clause_line + "\n"
-    parameters = f"p cnf {len(unique_variables)} {len(cnf)}"
-    return header + parameters + "\n" + clauses
+
+
+def _write_dimacs_with_known_counts(
+    target, clauses, factory, num_clauses, buffer_size, encode
+) -> int:
+    if num_clauses is None:
+        if not isinstance(clauses, Sized):
+            raise ValueError(
+                "The number of clauses must be given when writing an iterator to a non seekable stream."
+            )
+        num_clauses = len(clauses)
+    if factory is None:
+        if not isinstance(clauses, Sized):
+            raise ValueError(
+                "A 'FunctionFactory' must be given when writing an iterator to a non seekable stream."
+            )
+        max_variable = max((abs(x) for line in clauses for x in line), default=0)
+    else:
+        max_variable = 0
+    num_variables = number_of_variables(factory, max_variable)
+    target.write(encode(dimacs_parameters(num_variables, num_clauses)))
+    written, _ = write_clauses(target, clauses, encode, buffer_size, False)
+    if written != num_clauses:
+        raise RuntimeError(
+            f"Expected '{num_clauses}' clauses, but '{written}' clauses were written."
+        )
+    check_allocated_variables(factory, num_variables)
+    return written
+
+
+def check_allocated_variables(factory: FunctionFactory | None, num_variables: int):
+    """
+    Raises if the clauses allocated variables from the factory while they were
+    written after a 'p cnf' line with 'num_variables'.
+    """
+    if factory is not None and factory.variable_counter - 1 > num_variables:
+        raise RuntimeError(
+            f"The clauses allocated variables up to '{factory.variable_counter - 1}' while they were written, but the 'p cnf' line gives '{num_variables}' variables. Evaluate the chain once before, e.g. with a counting pass, or write to a seekable target."
+        )
+
+
+def dimacs_compression(path: str | PathLike) -> str | None:
+    """
+    Returns the compression of a DIMACS file chosen by the suffix of its path,
+    see 'DIMACS_COMPRESSIONS', or 'None'.
+    """
+    return DIMACS_COMPRESSIONS.get(os_path.splitext(fspath(path))[1])
+
+
+def compressed_stream(
+    compression: str, file, mode: str, compresslevel: int | None = None
+) -> BinaryIO:
+    """
+    Opens a compressed stream on a path or a binary file object. 'compression'
+    is one of the values of 'DIMACS_COMPRESSIONS'.
+    """
+    if compression == "gzip":
+        level = 9 if compresslevel is None else compresslevel
+        if isinstance(file, (str, PathLike)):
+            return gzip.open(file, mode, compresslevel=level)
+        # No file name and modification time, so the output is reproducible.
+        return gzip.GzipFile(
+            filename="", mode=mode, compresslevel=level, fileobj=file, mtime=0
+        )
+    if compression == "bz2":
+        level = 9 if compresslevel is None else compresslevel
+        return bz2.open(file, mode, compresslevel=level)
+    if "w" in mode:
+        return lzma.open(file, mode, preset=compresslevel)
+    return lzma.open(file, mode)
+
+
+def _write_compressed_dimacs(
+    path: str | PathLike,
+    compression: str,
+    compresslevel: int | None,
+    clauses: Iterable[CNFLine],
+    factory: FunctionFactory | None,
+    header: str | None,
+    num_clauses: int | None,
+    buffer_size: int,
+) -> int:
+    header = DIMACS_HEADER if header is None else header
+    counts_known = (num_clauses is not None or isinstance(clauses, Sized)) and (
+        factory is not None or isinstance(clauses, Sized)
+    )
+    if counts_known:
+        with compressed_stream(compression, path, "wb", compresslevel) as stream:
+            stream.write(header.encode())
+            return _write_dimacs_with_known_counts(
+                stream, clauses, factory, num_clauses, buffer_size, str.encode
+            )
+
+    directory = os_path.dirname(os_path.abspath(fspath(path)))
+    with TemporaryFile(dir=directory) as body:
+        with compressed_stream(compression, body, "wb", compresslevel) as stream:
+            written, max_variable = write_clauses(
+                stream, clauses, str.encode, buffer_size, factory is None
+            )
+        if num_clauses is not None and written != num_clauses:
+            raise RuntimeError(
+                f"Expected '{num_clauses}' clauses, but '{written}' clauses were written."
+            )
+        body.seek(0)
+        with open(path, "wb") as output:
+            with compressed_stream(compression, output, "wb", compresslevel) as stream:
+                stream.write(header.encode())
+                stream.write(
+                    dimacs_parameters(
+                        number_of_variables(factory, max_variable), written
+                    ).encode()
+                )
+            copyfileobj(body, output)
+    return written
+
+
+class DimacsFile:
+    def __init__(
+        self,
+        path: str | PathLike,
+        factory: FunctionFactory | None = None,
+        header: str | None = None,
+        buffer_size: int = DIMACS_BUFFER_SIZE,
+    ):
+        """
+        DIMACS file to which clauses can be added over time, e.g. from several
+        chains sharing one 'FunctionFactory'. A new file is created with a
+        fixed width 'p cnf' line. An existing file written by 'write_dimacs'
+        or 'DimacsFile' is opened for appending, so adding clauses only costs
+        writing the new clauses. The 'p cnf' line is updated in place by
+        'flush' and 'close'.
+
+        Keyword arguments:
+        factory -- 'FunctionFactory' used to build the clauses. Its
+            'variable_counter' gives the number of variables.
+        header -- comment lines of a new file.
+        """
+        if dimacs_compression(path) is not None:
+            raise ValueError(
+                f"Compressed DIMACS files can't be appended to. Path: '{path}'."
+            )
+        self.factory: FunctionFactory | None = factory
+        self.buffer_size: int = buffer_size
+        try:
+            self.file: BinaryIO = open(path, "r+b")
+        except FileNotFoundError:
+            self.file = open(path, "w+b")
+        try:
+            self._open_parameters(header)
+        except BaseException:
+            self.file.close()
+            raise
+
+    def _open_parameters(self, header: str | None):
+        self.file.seek(0, SEEK_END)
+        if self.file.tell() == 0:
+            self.file.write((DIMACS_HEADER if header is None else header).encode())
+            self.parameters_position: int = self.file.tell()
+            self.file.write(dimacs_parameters(0, 0, fixed_width=True).encode())
+            self.num_variables: int = 0
+            self.num_clauses: int = 0
+            return
+        self.file.seek(0)
+        while True:
+            position = self.file.tell()
+            line = self.file.readline()
+            if not line or not (line.startswith(b"c") or not line.strip()):
+                break
+        fields = line.split()
+        if (
+            len(line) != len(dimacs_parameters(0, 0, fixed_width=True))
+            or fields[:2] != [b"p", b"cnf"]
+            or len(fields) != 4
+        ):
+            raise ValueError(
+                "The 'p cnf' line of the DIMACS file doesn't have the fixed width of 'write_dimacs', so it can't be updated in place."
+            )
+        self.parameters_position = position
+        self.num_variables = int(fields[2])
+        self.num_clauses = int(fields[3])
+        self.file.seek(0, SEEK_END)
+
+    def add(self, clauses: Iterable[CNFLine]) -> int:
+        """
+        Appends the clauses while they are generated and returns the number
+        of added clauses.
+        """
+        written, max_variable = write_clauses(
+            self.file, clauses, str.encode, self.buffer_size, self.factory is None
+        )
+        self.num_clauses += written
+        self.num_variables = max(
+            self.num_variables, number_of_variables(self.factory, max_variable)
+        )
+        return written
+
+    def flush(self):
+        """
+        Writes the current numbers of variables and clauses into the 'p cnf'
+        line.
+        """
+        self.num_variables = number_of_variables(self.factory, self.num_variables)
+        end_position = self.file.tell()
+        self.file.seek(self.parameters_position)
+        self.file.write(
+            dimacs_parameters(
+                self.num_variables, self.num_clauses, fixed_width=True
+            ).encode()
+        )
+        self.file.seek(end_position)
+        self.file.flush()
+
+    def close(self):
+        if self.file.closed:
+            return
+        try:
+            self.flush()
+        finally:
+            self.file.close()
+
+    def __enter__(self) -> "DimacsFile":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+
+def read_dimacs(
+    source: str | PathLike | BinaryIO, buffer_size: int = DIMACS_BUFFER_SIZE
+) -> CompactCNF:
+    """
+    Reads the clauses of a DIMACS file into a 'CompactCNF'. Paths ending with
+    '.gz', '.bz2' or '.xz' are decompressed while reading. 'source' can also
+    be an opened binary stream. The file is read in chunks of about
+    'buffer_size' bytes, so only the clauses are kept in memory.
+    """
+    if isinstance(source, (str, PathLike)):
+        compression = dimacs_compression(source)
+        if compression is None:
+            with open(source, "rb") as stream:
+                return read_dimacs(stream, buffer_size)
+        with compressed_stream(compression, source, "rb") as stream:
+            return read_dimacs(stream, buffer_size)
+
+    cnf = CompactCNF()
+    literals, offsets = cnf.literals, cnf.offsets
+    rest = b""
+    while True:
+        chunk = source.read(buffer_size)
+        if not chunk:
+            break
+        chunk = rest + chunk
+        end = chunk.rfind(b"\n") + 1
+        if end == 0:
+            rest = chunk
+            continue
+        chunk, rest = chunk[:end], chunk[end:]
+        if _read_dimacs_chunk(_dimacs_tokens(chunk), literals, offsets):
+            return cnf
+    if rest:
+        _read_dimacs_chunk(_dimacs_tokens(rest), literals, offsets)
+    if len(literals) != offsets[-1]:
+        raise ValueError("The last clause of the DIMACS file isn't terminated by '0'.")
+    return cnf
+
+
+def _dimacs_tokens(chunk: bytes) -> Tuple[list, bool]:
+    """
+    Returns the literal tokens of a chunk of lines and if the chunk contains
+    the end marker '%'. Comment and 'p cnf' lines are skipped.
+    """
+    if b"c" not in chunk and b"p" not in chunk and b"%" not in chunk:
+        return chunk.split(), False
+    tokens = []
+    for line in chunk.splitlines():
+        stripped = line.lstrip()
+        if stripped.startswith(b"%"):
+            return tokens, True
+        if not stripped.startswith((b"c", b"p")):
+            tokens.extend(stripped.split())
+    return tokens, False
+
+
+def _read_dimacs_chunk(tokens: Tuple[list, bool], literals: array, offsets: array):
+    """
+    Appends the literals of the tokens and the offsets of the terminated
+    clauses. Returns if the end marker was reached.
+    """
+    tokens, end_reached = tokens
+    values = array("i", map(int, tokens))
+    start = 0
+    while True:
+        # The terminating zeros are found by 'array.index' in C.
+        try:
+            end = values.index(0, start)
+        except ValueError:
+            break
+        literals.extend(values[start:end])
+        offsets.append(len(literals))
+        start = end + 1
+    literals.extend(values[start:])
+    return end_reached
+
+
+def number_of_variables(factory: FunctionFactory | None, max_variable: int) -> int:
+    """
+    Returns the number of variables of the 'p cnf' line for clauses with the
+    largest variable 'max_variable', which were built with 'factory'.
+    """
+    if factory is None:
+        return max_variable
+    return max(factory.variable_counter - 1, max_variable)
+
+
+def dimacs_parameters(
+    num_variables: int, num_clauses: int, fixed_width: bool = False
+) -> str:
+    """
+    Returns the 'p cnf' line. With 'fixed_width' the numbers are padded, so the
+    line can be overwritten in place with larger numbers later.
+    """
+    if fixed_width:
+        return f"p cnf {num_variables:>{DIMACS_VARIABLES_WIDTH}} {num_clauses:>{DIMACS_CLAUSES_WIDTH}}\n"
+    return f"p cnf {num_variables} {num_clauses}\n"
+
+
+def write_clauses(
+    target, clauses: Iterable[CNFLine], encode, buffer_size: int, track_variables: bool
+) -> Tuple[int, int]:
+    """
+    Writes the clauses in the DIMACS format without a header in chunks of
+    about 'buffer_size' characters. 'encode' converts the text for 'target',
+    e.g. 'str.encode' for binary streams. Returns the number of written
+    clauses and the largest variable, if 'track_variables' is set.
+    """
+    written = 0
+    max_variable = 0
+    buffer = []
+    buffered = 0
+    for line in clauses:
+        if track_variables and line:
+            max_variable = max(max_variable, max(map(abs, line)))
+        text = " ".join(map(str, (*line, 0))) + "\n"
+        buffer.append(text)
+        buffered += len(text)
+        written += 1
+        if buffered >= buffer_size:
+            target.write(encode("".join(buffer)))
+            buffer.clear()
+            buffered = 0
+    if buffer:
+        target.write(encode("".join(buffer)))
+    return written, max_variable
@@ -0,0 +1,213 @@
+"""
+CNF encodings of cardinality constraints over literals. Every encoding yields
+the lines of the CNF. Encodings with auxiliary variables get them from
+'new_variables(count)', e.g. 'FunctionFactory.new_variables'.
+"""
+
+from sat_expander.CNF import CNFLine
+
+from itertools import combinations
+from typing import Callable, Iterator, List, Sequence
+
+NewVariables = Callable[[int], Sequence[int]]
+
+AT_MOST_ONE_ENCODINGS = ("pairwise", "sequential", "commander", "ladder", "totalizer")
+AT_MOST_K_ENCODINGS = ("pairwise", "sequential", "totalizer")
+
+
+def at_most_one(
+    literals: Sequence[int],
+    encoding: str = "sequential",
+    new_variables: NewVariables | None = None,
+) -> Iterator[CNFLine]:
+    if encoding not in AT_MOST_ONE_ENCODINGS:
+        raise ValueError(
+            f"Unknown encoding '{encoding}'. Choose one of {AT_MOST_ONE_ENCODINGS}."
+        )
+    if len(literals) <= 1:
+        return iter(())
+    if encoding == "pairwise" or len(literals) == 2:
+        return pairwise(literals)
+    if encoding == "sequential":
+        return sequential_counter(literals, 1, new_variables)
+    if encoding == "commander":
+        return commander(literals, new_variables)
+    if encoding == "ladder":
+        return ladder(literals, new_variables)
+    return totalizer(literals, 1, None, new_variables)
+
+
+def at_most_k(
+    literals: Sequence[int],
+    k: int,
+    encoding: str = "sequential",
+    new_variables: NewVariables | None = None,
+) -> Iterator[CNFLine]:
+    if k < 0:
+        return iter(((),))
+    if k == 1:
+        return at_most_one(literals, encoding, new_variables)
+    if encoding not in AT_MOST_K_ENCODINGS:
+        raise ValueError(
+            f"The encoding '{encoding}' can't be used for at most {k}. Choose one of {AT_MOST_K_ENCODINGS}."
+        )
+    if len(literals) <= k:
+        return iter(())
+    if k == 0:
+        return iter(tuple((-x,) for x in literals))
+    if encoding == "pairwise":
+        return (tuple(-x for x in subset) for subset in combinations(literals, k + 1))
+    if encoding == "sequential":
+        return sequential_counter(literals, k, new_variables)
+    return totalizer(literals, k, None, new_variables)
+
+
+def at_least_k(
+    literals: Sequence[int],
+    k: int,
+    encoding: str = "sequential",
+    new_variables: NewVariables | None = None,
+) -> Iterator[CNFLine]:
+    """
+    At least k literals are true, i.e. at most n - k of their negations.
+    The totalizer counts the literals directly.
+    """
+    if k <= 0:
+        return iter(())
+    if k > len(literals):
+        return iter(((),))
+    if k == 1:
+        return iter((tuple(literals),))
+    if encoding == "totalizer":
+        return totalizer(literals, None, k, new_variables)
+    return at_most_k(
+        tuple(-x for x in literals), len(literals) - k, encoding, new_variables
+    )
+
+
+def exactly_one(
+    literals: Sequence[int],
+    encoding: str = "sequential",
+    new_variables: NewVariables | None = None,
+) -> Iterator[CNFLine]:
+    yield tuple(literals)
+    yield from at_most_one(literals, encoding, new_variables)
+
+
+def pairwise(literals: Sequence[int]) -> Iterator[CNFLine]:
+    """
+    At most one literal is true with a line for every pair. O(n^2) lines.
+    """
+    return ((-x, -y) for x, y in combinations(literals, 2))
+
+
+def sequential_counter(
+    literals: Sequence[int], k: int, new_variables: NewVariables
+) -> Iterator[CNFLine]:
+    """
+    At most k literals are true. The auxiliary variable s[i][j] is true, if at
+    least j + 1 of the first i + 1 literals are true (Sinz, 2005).
+    O(n * k) lines and auxiliary variables.
+    """
+    n = len(literals)
+    variables = iter(new_variables((n - 1) * k))
+    s = [[next(variables) for _ in range(k)] for _ in range(n - 1)]
+    x = literals
+    yield (-x[0], s[0][0])
+    for j in range(1, k):
+        yield (-s[0][j],)
+    for i in range(1, n - 1):
+        yield (-x[i], s[i][0])
+        yield (-s[i - 1][0], s[i][0])
+        for j in range(1, k):
+            yield (-x[i], -s[i - 1][j - 1], s[i][j])
+            yield (-s[i - 1][j], s[i][j])
+        yield (-x[i], -s[i - 1][k - 1])
+    yield (-x[n - 1], -s[n - 2][k - 1])
+
+
+def commander(
+    literals: Sequence[int], new_variables: NewVariables, group_size: int = 3
+) -> Iterator[CNFLine]:
+    """
+    At most one literal is true. The literals are split into groups with at
+    most one true literal, each implying its commander variable. At most one
+    commander is true, which is encoded recursively (Klieber and Kwon, 2007).
+    O(n) lines and auxiliary variables.
+    """
+    while len(literals) > group_size:
+        groups = [
+            literals[i : i + group_size] for i in range(0, len(literals), group_size)
+        ]
+        commanders = new_variables(len(groups))
+        for group, commander_variable in zip(groups, commanders):
+            yield from pairwise(group)
+            for x in group:
+                yield (-x, commander_variable)
+        literals = tuple(commanders)
+    yield from pairwise(literals)
+
+
+def ladder(literals: Sequence[int], new_variables: NewVariables) -> Iterator[CNFLine]:
+    """
+    At most one literal is true. The auxiliary variables y[i] form a ladder,
+    i.e. y[i + 1] implies y[i], and the literal i implies y[i - 1] and not
+    y[i] (Gent and Nightingale, 2004). O(n) lines and auxiliary variables.
+    """
+    n = len(literals)
+    y = new_variables(n - 1)
+    for i in range(n - 2):
+        yield (-y[i + 1], y[i])
+    for i, x in enumerate(literals):
+        if i > 0:
+            yield (-x, y[i - 1])
+        if i < n - 1:
+            yield (-x, -y[i])
+
+
+def totalizer(
+    literals: Sequence[int],
+    at_most: int | None,
+    at_least: int | None,
+    new_variables: NewVariables,
+) -> Iterator[CNFLine]:
+    """
+    At most 'at_most' or at least 'at_least' literals are true. A binary
+    tree sums up the literals in unary: the output variable r[j] of a node
+    is true if at least j + 1 literals below are true (Bailleux and Boufkhad,
+    2003). The outputs are cut off after the bound.
+    O(n * k) lines and O(n log n) auxiliary variables.
+    """
+    lines: List[CNFLine] = []
+    bound = at_most + 1 if at_most is not None else at_least
+
+    def count(literals: Sequence[int]) -> Sequence[int]:
+        if len(literals) == 1:
+            return literals
+        a = count(literals[: len(literals) // 2])
+        b = count(literals[len(literals) // 2 :])
+        r = new_variables(min(len(a) + len(b), bound))
+        for i in range(len(a) + 1):
+            for j in range(len(b) + 1):
+                if at_most is not None and 0 < i + j:
+                    # At least i + j literals are true.
+                    lines.append(
+                        tuple(-a[i - 1] for _ in range(i > 0))
+                        + tuple(-b[j - 1] for _ in range(j > 0))
+                        + (r[min(i + j, bound) - 1],)
+                    )
+                if at_least is not None and i + j < len(r):
+                    # Less than i + j + 1 literals are true.
+                    lines.append(
+                        tuple(a[i] for _ in range(i < len(a)))
+                        + tuple(b[j] for _ in range(j < len(b)))
+                        + (-r[i + j],)
+                    )
+        return r
+
+    outputs = count(tuple(literals))
+    yield from lines
+    if at_most is not None and len(outputs) > at_most:
+        yield (-outputs[at_most],)
+    if at_least is not None:
+        yield (outputs[at_least - 1],)
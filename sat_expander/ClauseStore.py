@@ -0,0 +1,253 @@
+from sat_expander.CNF import CNF, CNFLine, CompactCNF, write_dimacs
+from sat_expander.Functions import FunctionFactory
+
+from array import array
+from bisect import bisect_right
+from os import PathLike
+from tempfile import TemporaryFile
+from typing import BinaryIO, Iterable, Iterator, List, TextIO, Tuple
+import mmap
+
+DEFAULT_MAX_MEMORY_BYTES = 64 << 20
+
+
+class ClauseStore:
+    def __init__(
+        self,
+        clauses: Iterable[CNFLine] = (),
+        max_memory_bytes: int = DEFAULT_MAX_MEMORY_BYTES,
+        directory: str | PathLike | None = None,
+    ):
+        """
+        CNF which keeps at most about 'max_memory_bytes' of lines in a
+        'CompactCNF' buffer. Full buffers are spilled as chunks to two
+        temporary files in 'directory', one with the literals and one with
+        the offsets of the lines, which are memory mapped for reading. The
+        files are deleted by 'close'.
+
+        The store can be used like a 'CompactCNF', e.g. as the target of
+        'LogicalOperator.emit', and iterated any number of times. Iteration,
+        indexing and writing DIMACS files read the memory maps, so only the
+        operating system caches the spilled lines.
+        """
+        self.max_memory_bytes: int = max_memory_bytes
+        self.directory: str | PathLike | None = directory
+        self.buffer: CompactCNF = CompactCNF()
+        # Spilled chunks as (first line, number of lines, position of the
+        # first literal, position of the first offset) in their files.
+        self.chunks: List[Tuple[int, int, int, int]] = []
+        self.spilled_lines: int = 0
+        self._files: Tuple[BinaryIO, BinaryIO] | None = None
+        self._sizes: List[int] = [0, 0]
+        self._views: Tuple[memoryview, memoryview] | None = None
+        self.extend(clauses)
+
+    def append(self, clause: CNFLine):
+        self.buffer.append(clause)
+        if self.buffer.nbytes >= self.max_memory_bytes:
+            self.spill()
+
+    def extend(self, clauses: Iterable[CNFLine]):
+        if isinstance(clauses, ClauseStore):
+            self._extend_store(clauses)
+            return
+        if isinstance(clauses, CompactCNF):
+            self.buffer += clauses
+            if self.buffer.nbytes >= self.max_memory_bytes:
+                self.spill()
+            return
+        literals = self.buffer.literals
+        offsets = self.buffer.offsets
+        # Literals take 4 and offsets 8 bytes.
+        limit = self.max_memory_bytes // 4
+        for clause in clauses:
+            literals.extend(clause)
+            n = len(literals)
+            offsets.append(n)
+            if n + 2 * len(offsets) >= limit:
+                self.spill()
+                literals = self.buffer.literals
+                offsets = self.buffer.offsets
+
+    def extend_block(self, block):
+        """
+        Appends the rows of a two dimensional NumPy array as lines.
+        """
+        self.buffer.extend_block(block)
+        if self.buffer.nbytes >= self.max_memory_bytes:
+            self.spill()
+
+    def spill(self):
+        """
+        Writes the lines of the buffer as a chunk to the files.
+        """
+        if not len(self.buffer):
+            return
+        self._write_chunk(len(self.buffer), self.buffer.literals, self.buffer.offsets)
+        self.buffer = CompactCNF()
+
+    def _write_chunk(self, lines: int, literals, offsets):
+        if self._files is None:
+            self._files = (
+                TemporaryFile(dir=self.directory),
+                TemporaryFile(dir=self.directory),
+            )
+        literal_position, offset_position = self._sizes
+        self._files[0].write(literals)
+        self._files[1].write(offsets)
+        self._sizes[0] += len(literals)
+        self._sizes[1] += len(offsets)
+        self.chunks.append(
+            (self.spilled_lines, lines, literal_position, offset_position)
+        )
+        self.spilled_lines += lines
+
+    def _extend_store(self, other: "ClauseStore"):
+        # The chunks of 'other' are copied between the files without
+        # creating lines.
+        self.spill()
+        chunks = tuple(other.chunks)
+        if chunks:
+            literals, offsets = other._mapped()
+            for _, lines, literal_position, offset_position in chunks:
+                start = offsets[offset_position]
+                end = offsets[offset_position + lines]
+                self._write_chunk(
+                    lines,
+                    literals[literal_position + start : literal_position + end],
+                    offsets[offset_position : offset_position + lines + 1],
+                )
+        self.buffer += other.buffer
+
+    def _mapped(self) -> Tuple[memoryview, memoryview]:
+        """
+        Returns the literals and offsets of the files as memory mapped arrays.
+        """
+        if self._views is None or list(map(len, self._views)) != self._sizes:
+            views = []
+            for file, typecode in zip(self._files, "iq"):
+                file.flush()
+                if file.tell() == 0:
+                    views.append(memoryview(array(typecode)))
+                    continue
+                mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+                views.append(memoryview(mapped).cast(typecode))
+            self._views = tuple(views)
+        return self._views
+
+    def __len__(self) -> int:
+        return self.spilled_lines + len(self.buffer)
+
+    def __getitem__(self, index: int) -> CNFLine:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("ClauseStore index out of range.")
+        if index >= self.spilled_lines:
+            return self.buffer[index - self.spilled_lines]
+        first_line, _, literal_position, offset_position = self.chunks[
+            bisect_right(self.chunks, (index, float("inf"))) - 1
+        ]
+        literals, offsets = self._mapped()
+        line = offset_position + index - first_line
+        return tuple(
+            literals[
+                literal_position + offsets[line] : literal_position + offsets[line + 1]
+            ]
+        )
+
+    def __iter__(self) -> Iterator[CNFLine]:
+        for chunk in self.iter_chunks():
+            yield from chunk
+
+    def iter_chunks(self) -> Iterator[CompactCNF]:
+        """
+        Yields the spilled chunks and the buffer as 'CompactCNF's. Every chunk
+        is copied from the memory maps in one piece.
+        """
+        if self.chunks:
+            literals, offsets = self._mapped()
+            for _, lines, literal_position, offset_position in tuple(self.chunks):
+                chunk = CompactCNF()
+                chunk.offsets = array("q")
+                chunk.offsets.frombytes(
+                    offsets[offset_position : offset_position + lines + 1].cast("B")
+                )
+                chunk.literals = array("i")
+                chunk.literals.frombytes(
+                    literals[
+                        literal_position
+                        + chunk.offsets[0] : literal_position
+                        + chunk.offsets[-1]
+                    ].cast("B")
+                )
+                yield chunk
+        if len(self.buffer):
+            yield self.buffer
+
+    def __add__(self, other: "ClauseStore | CompactCNF | CNF") -> "ClauseStore":
+        result = ClauseStore(
+            max_memory_bytes=self.max_memory_bytes, directory=self.directory
+        )
+        result.extend(self)
+        result.extend(other)
+        return result
+
+    def __iadd__(self, other: "ClauseStore | CompactCNF | CNF") -> "ClauseStore":
+        self.extend(other)
+        return self
+
+    def __eq__(self, other) -> bool:
+        try:
+            return len(self) == len(other) and all(
+                a == tuple(b) for a, b in zip(self, other)
+            )
+        except TypeError:
+            return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"ClauseStore({len(self)} lines, {len(self.chunks)} spilled chunks)"
+
+    @property
+    def max_variable(self) -> int:
+        """
+        Largest variable of all lines.
+        """
+        largest = 0
+        for chunk in self.iter_chunks():
+            if chunk.literals:
+                largest = max(largest, max(chunk.literals), -min(chunk.literals))
+        return largest
+
+    def write_dimacs(
+        self,
+        target: "str | PathLike | BinaryIO | TextIO",
+        factory: FunctionFactory | None = None,
+        header: str | None = None,
+        compresslevel: int | None = None,
+    ) -> int:
+        return write_dimacs(
+            target, self, factory=factory, header=header, compresslevel=compresslevel
+        )
+
+    def close(self):
+        """
+        Deletes the files of the spilled chunks. The store is empty afterwards.
+        """
+        self._views = None
+        if self._files is not None:
+            for file in self._files:
+                file.close()
+        self._files = None
+        self._sizes = [0, 0]
+        self.chunks = []
+        self.spilled_lines = 0
+        self.buffer = CompactCNF()
+
+    def __enter__(self) -> "ClauseStore":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
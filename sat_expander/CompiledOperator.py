@@ -0,0 +1,238 @@
+from sat_expander.LogicalOperator import (
+    LogicalOperator,
+    AndOperator,
+    OrOperator,
+    ExpressionOperator,
+)
+from sat_expander.LogicalOperatorContext import LogicalOperatorContext
+from sat_expander.Functions import (
+    Function,
+    Constant,
+    ProductFunction,
+    evaluates_by_relation,
+)
+from sat_expander.CNF import CNF, CNFLine
+
+from typing import Dict, Iterator, List, Tuple
+
+
+class CompiledOperator:
+    def __init__(self, operator: LogicalOperator):
+        """
+        Compiles a chain of 'AndOperator', 'OrOperator' and one
+        'ExpressionOperator' into generated Python code. The arities of the
+        values and the scopes of the variables are checked once. While
+        evaluating, the variables are held in local variables instead of
+        'LogicalOperatorContext' objects and the literals are looked up
+        directly in the relations of the functions. Exclusion predicates still
+        get a 'LogicalOperatorContext'. Indexable predicates on variables
+        bound by the chain are replaced by lookups in the value index.
+
+        The values of the operators and the relations of the functions are
+        captured at compile time, so changes to the chain afterwards require a
+        new compilation.
+        """
+        self.operators: Tuple[LogicalOperator, ...] = _collect_chain(operator)
+        self.expression: ExpressionOperator = self.operators[-1]
+        self.bound_variables: Tuple[str, ...] = _check_scopes(self.operators[:-1])
+        for op in self.operators[:-1]:
+            _check_arities(op)
+        self.free_variables: Tuple[str, ...] = tuple(
+            dict.fromkeys(
+                arg
+                for _, args, _ in self.expression.expressions
+                for arg in args
+                if arg not in self.bound_variables
+            )
+        )
+        self.source, namespace = self._generate()
+        exec(compile(self.source, "<compiled operator>", "exec"), namespace)
+        self._iterate = namespace["_iterate"]
+
+    def evaluate(self, context: LogicalOperatorContext | None = None) -> CNF:
+        return tuple(self.iter_clauses(context))
+
+    def emit(self, target, context: LogicalOperatorContext | None = None):
+        target.extend(self.iter_clauses(context))
+        return target
+
+    def iter_clauses(
+        self, context: LogicalOperatorContext | None = None
+    ) -> Iterator[CNFLine]:
+        if context is None:
+            context = LogicalOperatorContext.empty()
+        intersection = set(context.vars.keys()).intersection(self.bound_variables)
+        if intersection:
+            raise ValueError(
+                f"The arguments to add overlapp with the given arguments. Overlapp: {intersection}"
+            )
+        free_values = tuple(context.getArgument(var) for var in self.free_variables)
+        for func, _, _ in self.expression.expressions:
+            func.was_evaluated = True
+        return self._iterate(context.vars, *free_values)
+
+    def _generate(self) -> Tuple[str, Dict]:
+        namespace = {
+            "_Context": LogicalOperatorContext,
+            "_expression_failed": self._expression_failed,
+        }
+        local_names: Dict[str, str] = {}
+        for var in (*self.free_variables, *self.bound_variables):
+            local_names[var] = f"_a{len(local_names)}"
+        lines: List[str] = [
+            "def _iterate(_outer, "
+            + "".join(local_names[var] + ", " for var in self.free_variables)
+            + "):"
+        ]
+        indent = 1
+        bound: List[str] = []
+        in_clause = False
+        for i, op in enumerate(self.operators[:-1]):
+            if isinstance(op, OrOperator) and not in_clause:
+                lines.append("    " * indent + "_clause = []")
+                in_clause = True
+            namespace[f"_values{i}"] = op.values
+            predicate, index = op._build_value_index()
+            if predicate is not None and predicate.key_variable in bound:
+                namespace[f"_index{i}"] = index
+                lines.append(
+                    "    " * indent
+                    + f"for _t{i} in _index{i}.get({local_names[predicate.key_variable]}, ()):"
+                )
+                satisfied = predicate is op.exclude_predicate
+            else:
+                lines.append("    " * indent + f"for _t{i} in _values{i}:")
+                satisfied = False
+            indent += 1
+            bound.extend(op.variables)
+            lines.append(
+                "    " * indent
+                + "".join(local_names[var] + ", " for var in op.variables)
+                + f"= _t{i}"
+            )
+            if op.exclude_predicate is not None and not satisfied:
+                namespace[f"_predicate{i}"] = op.exclude_predicate
+                lines.append(
+                    "    " * indent
+                    + f"if not _predicate{i}(_Context(vars={_context_dict(bound, local_names)}), _t{i}):"
+                )
+                lines.append("    " * (indent + 1) + "continue")
+
+        literals = []
+        for j, (func, args, sign) in enumerate(self.expression.expressions):
+            literals.append(
+                self._literal_source(j, func, args, sign, local_names, namespace)
+            )
+        lines.append("    " * indent + "try:")
+        if in_clause:
+            lines.append(
+                "    " * (indent + 1)
+                + f"_clause += ({''.join(x + ', ' for x in literals)})"
+            )
+        else:
+            lines.append(
+                "    " * (indent + 1)
+                + f"_line = ({''.join(x + ', ' for x in literals)})"
+            )
+        lines.append("    " * indent + "except KeyError:")
+        lines.append(
+            "    " * (indent + 1)
+            + f"_expression_failed({_context_dict(bound, local_names)})"
+        )
+        if in_clause:
+            first_or = next(
+                i for i, op in enumerate(self.operators) if isinstance(op, OrOperator)
+            )
+            lines.append("    " * (first_or + 1) + "yield tuple(_clause)")
+        else:
+            lines.append("    " * indent + "yield _line")
+        return "\n".join(lines) + "\n", namespace
+
+    @staticmethod
+    def _literal_source(
+        j: int,
+        func: Function,
+        args: Tuple[str, ...],
+        sign: int,
+        local_names: Dict[str, str],
+        namespace: Dict,
+    ) -> str:
+        if isinstance(func, Constant):
+            return str(sign * func.value)
+        if isinstance(func, ProductFunction) and not func.relation.overrides:
+            # Compute the variable from the positions in the axes of the domain.
+            func.was_evaluated = True
+            terms = [str(func.range[0])]
+            stride = 1
+            for k in reversed(range(len(args))):
+                namespace[f"_index{j}_{k}"] = func.domain.indices[k]
+                terms.append(f"_index{j}_{k}[{local_names[args[k]]}] * {stride}")
+                stride *= func.domain.sizes[k]
+            return ("-" if sign < 0 else "") + "(" + " + ".join(terms) + ")"
+        namespace[f"_relation{j}"] = func.relation
+        key = "(" + "".join(local_names[arg] + ", " for arg in args) + ")"
+        return ("-" if sign < 0 else "") + f"_relation{j}[{key}]"
+
+    def _expression_failed(self, variables: Dict):
+        # Reevaluate the expression to raise the error of the interpreted path.
+        self.expression.evaluate(LogicalOperatorContext(vars=variables))
+        raise RuntimeError(
+            f"The expression of the compiled operator failed in context '{variables}'."
+        )
+
+
+def _context_dict(bound: List[str], local_names: Dict[str, str]) -> str:
+    return (
+        "{**_outer, " + "".join(f"{var!r}: {local_names[var]}, " for var in bound) + "}"
+    )
+
+
+def _collect_chain(operator: LogicalOperator) -> Tuple[LogicalOperator, ...]:
+    operators = []
+    current = operator
+    while current is not None and not isinstance(current, ExpressionOperator):
+        if not isinstance(current, (AndOperator, OrOperator)):
+            raise NotImplementedError(
+                f"The operator '{type(current).__name__}' can't be compiled."
+            )
+        if getattr(current, "factory", None) is not None:
+            raise NotImplementedError(
+                "Or operators with definition variables can't be compiled."
+            )
+        operators.append(current)
+        current = current.suboperator
+    if current is None:
+        raise RuntimeError(
+            "Only chains ending with an ExpressionOperator can be compiled."
+        )
+    for func, _, _ in current.expressions:
+        if not isinstance(func, Constant) and not evaluates_by_relation(func):
+            raise NotImplementedError(f"The function '{func.name}' can't be compiled.")
+    operators.append(current)
+    return tuple(operators)
+
+
+def _check_scopes(operators: Tuple[LogicalOperator, ...]) -> Tuple[str, ...]:
+    bound: List[str] = []
+    for op in operators:
+        intersection = set(bound).intersection(op.variables)
+        if intersection or len(set(op.variables)) != len(op.variables):
+            raise ValueError(
+                f"The arguments to add overlapp with the given arguments. Overlapp: {intersection or op.variables}"
+            )
+        bound.extend(op.variables)
+    return tuple(bound)
+
+
+def _check_arities(operator: LogicalOperator):
+    for values in operator.values:
+        try:
+            len(values)
+        except TypeError:
+            raise RuntimeError(
+                f"The values '{values}' are not iterable. Consider using 'Function.to_tuple_iter(domain)' as the domain in the definition of the AllQantor."
+            )
+        if len(values) != len(operator.variables):
+            raise RuntimeError(
+                f"The length of values '{values}' for the variables '{operator.variables}' don't have a matching length."
+            )
@@ -1,9 +1,11 @@
 from sat_expander.LogicalOperatorContext import LogicalOperatorContext
 
+from functools import wraps
 from warnings import warn
-from typing import Callable, Tuple
+from typing import Callable, Dict, Iterable, Tuple, TypeVar
 from enum import Enum
 
+T = TypeVar("T")
 ExclusionPredicate = Callable[[LogicalOperatorContext, Tuple], bool]
 
 
@@ -18,6 +20,7 @@ def check_variables_in_context(
     var_not_found_response: VarNotFoundResponse = VarNotFoundResponse.WARN,
 ):
     def decorator(predicate):
+        @wraps(predicate)
         def wrappe(context: LogicalOperatorContext, *args):
             if _handle_vars_not_found(
                 context, *vars, var_not_found_response=var_not_found_response
@@ -52,34 +55,214 @@ def _handle_vars_not_found(
     return False
 
 
+class Predicate:
+    """
+    Exclusion predicate which describes its logic instead of being an opaque
+    function. It is called like any other exclusion predicate. Missing
+    variables in the context are handled like in 'check_variables_in_context'.
+
+    Predicates can be combined with '&'. Indexable predicates let the
+    'AndOperator' and 'OrOperator' build a hash index over their values once
+    and only iterate the values matching the context.
+    """
+
+    def __init__(
+        self,
+        *vars: str,
+        var_not_found_response: VarNotFoundResponse = VarNotFoundResponse.WARN,
+    ):
+        self.variables: Tuple[str, ...] = vars
+        self.var_not_found_response: VarNotFoundResponse = var_not_found_response
+
+    def __call__(self, context: LogicalOperatorContext, value: Tuple) -> bool:
+        if _handle_vars_not_found(
+            context,
+            *self.variables,
+            var_not_found_response=self.var_not_found_response,
+        ):
+            return True
+        return self.test(context.vars, value)
+
+    def test(self, vars: Dict[str, T], value: Tuple) -> bool:
+        raise NotImplementedError("Test will not be implemented for base class.")
+
+    def dependencies(self) -> frozenset | None:
+        """
+        Returns the variables of the context the predicate depends on.
+        """
+        return frozenset(self.variables)
+
+    def indexable(self) -> "IndexablePredicate | None":
+        """
+        Returns the part of the predicate which can be used for an index.
+        """
+        return None
+
+    def __and__(self, other: ExclusionPredicate) -> "AllOf":
+        return AllOf(self, other)
+
+    def __rand__(self, other: ExclusionPredicate) -> "AllOf":
+        return AllOf(other, self)
+
+
+class IndexablePredicate(Predicate):
+    """
+    Predicate which is true for a value if and only if one of the
+    'index_keys' of the value equals the value of 'key_variable' in the context.
+    """
+
+    key_variable: str
+
+    def index_keys(self, value: Tuple) -> Iterable:
+        raise NotImplementedError("Index_keys will not be implemented for base class.")
+
+    def indexable(self) -> "IndexablePredicate":
+        return self
+
+
+class ExcludeVarTuple(Predicate):
+    """
+    value != (var1, var2, ...)
+    """
+
+    def test(self, vars: Dict[str, T], value: Tuple) -> bool:
+        return value != tuple(vars[var] for var in self.variables)
+
+
+class VarInValue(IndexablePredicate):
+    """
+    var in value
+    """
+
+    def __init__(
+        self,
+        var: str,
+        var_not_found_response: VarNotFoundResponse = VarNotFoundResponse.WARN,
+    ):
+        super().__init__(var, var_not_found_response=var_not_found_response)
+        self.key_variable: str = var
+
+    def test(self, vars: Dict[str, T], value: Tuple) -> bool:
+        return vars[self.key_variable] in value
+
+    def index_keys(self, value: Tuple) -> Iterable:
+        return dict.fromkeys(value)
+
+
+class ValueItemEquals(IndexablePredicate):
+    """
+    value[position] == var
+    """
+
+    def __init__(
+        self,
+        position: int,
+        var: str,
+        var_not_found_response: VarNotFoundResponse = VarNotFoundResponse.WARN,
+    ):
+        super().__init__(var, var_not_found_response=var_not_found_response)
+        self.position: int = position
+        self.key_variable: str = var
+
+    def test(self, vars: Dict[str, T], value: Tuple) -> bool:
+        return value[self.position] == vars[self.key_variable]
+
+    def index_keys(self, value: Tuple) -> Iterable:
+        return (value[self.position],)
+
+
+class AllOf(Predicate):
+    """
+    predicate1 and predicate2 and ...
+    The predicates can also be opaque exclusion predicates.
+    """
+
+    def __init__(self, *predicates: ExclusionPredicate):
+        self.predicates: Tuple[ExclusionPredicate, ...] = predicates
+        self.variables: Tuple[str, ...] = ()
+        self.var_not_found_response: VarNotFoundResponse = VarNotFoundResponse.IGNORE
+
+    def __call__(self, context: LogicalOperatorContext, value: Tuple) -> bool:
+        return all(predicate(context, value) for predicate in self.predicates)
+
+    def dependencies(self) -> frozenset | None:
+        dependencies = tuple(map(predicate_dependencies, self.predicates))
+        if None in dependencies:
+            return None
+        return frozenset().union(*dependencies)
+
+    def indexable(self) -> IndexablePredicate | None:
+        return next(
+            (
+                predicate.indexable()
+                for predicate in self.predicates
+                if isinstance(predicate, Predicate)
+                and predicate.indexable() is not None
+            ),
+            None,
+        )
+
+    def __and__(self, other: ExclusionPredicate) -> "AllOf":
+        return AllOf(*self.predicates, other)
+
+    def __rand__(self, other: ExclusionPredicate) -> "AllOf":
+        return AllOf(other, *self.predicates)
+
+
+def predicate_dependencies(predicate: ExclusionPredicate | None) -> frozenset | None:
+    """
+    Returns the variables of the context an exclusion predicate depends on or
+    'None' for opaque predicates.
+    """
+    if predicate is None:
+        return frozenset()
+    if isinstance(predicate, Predicate):
+        return predicate.dependencies()
+    return None
+
+
 def exclude_variable(
     var: str, var_not_found_response: VarNotFoundResponse = VarNotFoundResponse.WARN
-) -> ExclusionPredicate:
+) -> ExcludeVarTuple:
     """
     Generates exclusion predicate for excluding values which match a certain
     variable in the context. For example,
     And[x in V] Or[y in V\\{x}] ...
     """
-
-    @check_variables_in_context(var, var_not_found_response=var_not_found_response)
-    def predicate(context: LogicalOperatorContext, value: Tuple) -> bool:
-        return value != (context.vars[var],)
-
-    return predicate
+    return ExcludeVarTuple(var, var_not_found_response=var_not_found_response)
 
 
 def exclude_var_tuple(
     *vars: Tuple[str, ...],
     var_not_found_response: VarNotFoundResponse = VarNotFoundResponse.WARN,
-) -> ExclusionPredicate:
+) -> ExcludeVarTuple:
     """
     Generates exlusion predicate for a tuple of variables.
     For example,
     And[x in V] And[y in U] Or[z in VxU \\ {(x, y)}] ...
     """
+    return ExcludeVarTuple(*vars, var_not_found_response=var_not_found_response)
 
-    @check_variables_in_context(*vars, var_not_found_response=var_not_found_response)
-    def predicate(context: LogicalOperatorContext, value: Tuple) -> bool:
-        return value != tuple(context.vars[var] for var in vars)
 
-    return predicate
+def require_var_in_value(
+    var: str, var_not_found_response: VarNotFoundResponse = VarNotFoundResponse.WARN
+) -> VarInValue:
+    """
+    Generates exclusion predicate for excluding values which don't contain a
+    certain variable in the context. For example,
+    And[v in V] Or[(u, w) in E, v in (u, w)] ...
+    """
+    return VarInValue(var, var_not_found_response=var_not_found_response)
+
+
+def require_value_item(
+    position: int,
+    var: str,
+    var_not_found_response: VarNotFoundResponse = VarNotFoundResponse.WARN,
+) -> ValueItemEquals:
+    """
+    Generates exclusion predicate for excluding values whose item at
+    'position' doesn't match a certain variable in the context. For example,
+    And[x in V] Or[(u, w) in E, u = x] ...
+    """
+    return ValueItemEquals(position, var, var_not_found_response=var_not_found_response)
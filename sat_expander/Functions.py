@@ -1,6 +1,27 @@
 from sat_expander.LogicalOperatorContext import LogicalOperatorContext
 
-from typing import List, Tuple, Dict, TypeVar, Set, Iterable
+from typing import (
+    List,
+    Tuple,
+    Dict,
+    TypeVar,
+    Set,
+    Iterable,
+    Iterator,
+    NamedTuple,
+    Sequence,
+)
+from array import array
+from bisect import bisect_left, bisect_right
+from os import PathLike
+import json
+import mmap
+import sys
+from collections import Counter
+from collections.abc import Mapping, KeysView
+from functools import partial
+from itertools import compress, product, repeat
+from operator import is_not
 from warnings import warn
 
 T = TypeVar("T")  # Type of the arguments for the function
@@ -8,35 +29,76 @@ T = TypeVar("T")  # Type of the arguments for the function
 
 class Function:
     def __init__(
-        self, name: str, arguemts_len: int, domain: Iterable[T], start_variable: int
+        self,
+        name: str,
+        arguemts_len: int,
+        domain: Iterable[T],
+        start_variable: int,
+        commutative: bool = False,
     ):
+        """
+        Keyword arguments:
+        commutative -- if set, the arguments of the function can be permuted,
+            e.g. f(x,y) = f(y,x). Only one variable is assigned to all
+            permutations of the arguments.
+        """
         domain = tuple(domain)
         self.was_evaluated: bool = False
         self.name: str = name
         self.arguments_len: int = arguemts_len
-        self.domain: Set[T] = set(domain)
-        if len(self.domain) != len(domain):
+        # Keeps the order of the domain, so the variables don't depend on hashing.
+        unique_domain: Dict[T, None] = dict.fromkeys(domain)
+        if len(unique_domain) != len(domain):
             duplicates = []
-            uniques = []
+            uniques = set()
             for x in domain:
                 if x not in uniques:
-                    uniques.append(x)
+                    uniques.add(x)
                 else:
                     duplicates.append(x)
             warn(
                 f"The domain of function '{name}' contains duplicate values. Duplicates: {duplicates}"
             )
 
+        self.commutative: bool = commutative
         try:
-            self.relation: Dict[T, int] = {
-                tuple(x): i for i, x in enumerate(self.domain, start=start_variable)
-            }
+            if commutative:
+                variables: Dict[Tuple, int] = dict()
+                self.relation: Dict[T, int] = {
+                    tuple(x): variables.setdefault(
+                        _canonical_arguments(tuple(x)), start_variable + len(variables)
+                    )
+                    for x in unique_domain
+                }
+            else:
+                self.relation: Dict[T, int] = {
+                    tuple(x): i
+                    for i, x in enumerate(unique_domain, start=start_variable)
+                }
         except TypeError as te:
             raise RuntimeError(
                 "The single values in the domain of a function must be iterable.",
                 str(te),
             )
-        self.range: Tuple[int, int] = (start_variable, start_variable - 1 + len(domain))
+        self.domain: Set[T] = self.relation.keys()
+        self.range: Tuple[int, int] = (
+            start_variable,
+            start_variable
+            - 1
+            + (len(variables) if commutative else len(unique_domain)),
+        )
+
+    def __getstate__(self) -> Dict:
+        # The domain is a view of the relation, which can't be pickled.
+        state = self.__dict__.copy()
+        if isinstance(state.get("domain"), KeysView):
+            del state["domain"]
+        return state
+
+    def __setstate__(self, state: Dict):
+        self.__dict__.update(state)
+        if "domain" not in state:
+            self.domain = self.relation.keys()
 
     def in_range(self, value: int | None) -> bool:
         if value is None:
@@ -58,6 +120,37 @@ class Function:
         self.was_evaluated = True
         return self.relation[args]
 
+    def index_table(self):
+        """
+        Returns the dense representation of the relation used for vectorized
+        evaluation. It consists of one dict per argument position mapping the
+        values to their index and a NumPy array containing for every
+        combination of indices the variable or '-1' if the combination isn't
+        in the domain. Returns 'None' if the array would be much bigger than
+        the domain. Requires NumPy to be installed.
+        """
+        if hasattr(self, "_index_table"):
+            return self._index_table
+        import numpy
+
+        axes: List[Dict[T, int]] = [dict() for _ in range(self.arguments_len)]
+        for args in self.relation.keys():
+            for axis, arg in zip(axes, args):
+                axis.setdefault(arg, len(axis))
+        shape = tuple(len(axis) for axis in axes)
+        size = 1
+        for length in shape:
+            size *= length
+        if size > max(16 * len(self.relation), 1 << 16):
+            self._index_table = None
+            return None
+        table = numpy.full(shape, -1, dtype=numpy.int64)
+        for args, variable in self.relation.items():
+            table[tuple(axis[arg] for axis, arg in zip(axes, args))] = variable
+        self.was_evaluated = True
+        self._index_table = (tuple(axes), table)
+        return self._index_table
+
     def set_equivalent(self, t1: T, t2: T):
         if self.was_evaluated:
             raise RuntimeError(
@@ -66,21 +159,55 @@ class Function:
         if self.relation.get(t1) and self.relation.get(t2):
             self.relation[t2] = self.relation[t1]
 
+    def set_equivalences(self, pairs: Iterable[Tuple[T, T]]):
+        """
+        Sets all given pairs of arguments equivalent at once. Equivalence is
+        transitive, so all arguments connected by pairs get the variable of
+        the argument among them appearing first in the pairs. Pairs containing
+        arguments outside the domain are ignored.
+        """
+        if self.was_evaluated:
+            raise RuntimeError(
+                "Changing variables after evaluating function can lead to invalid results."
+            )
+        parent: Dict[T, T] = dict()
+        first_seen: Dict[T, int] = dict()
+
+        def find(t: T) -> T:
+            while parent.get(t, t) != t:
+                parent[t] = parent.get(parent[t], parent[t])
+                t = parent[t]
+            return t
+
+        for t1, t2 in pairs:
+            if t1 not in self.relation or t2 not in self.relation:
+                continue
+            first_seen.setdefault(t1, len(first_seen))
+            first_seen.setdefault(t2, len(first_seen))
+            root1, root2 = find(t1), find(t2)
+            if first_seen[root2] < first_seen[root1]:
+                root1, root2 = root2, root1
+            if root1 != root2:
+                parent[root2] = root1
+        for t in parent:
+            self.relation[t] = self.relation[find(t)]
+
     def set_commutative(self):
         """
         Makes the input to the function communitive. E.g. f(x,y) = f(y,x)
+        All permutations of arguments get the variable of the first of them
+        in the domain. To not assign the unused variables at all, build the
+        function with 'commutative=True'.
         """
         if self.was_evaluated:
             raise RuntimeError(
                 "Changing variables after evaluating function can lead to invalid results."
             )
-        remains: List[T] = list(self.domain)
-        while remains:
-            t = remains.pop(0)
-            exclude = (x for x in remains if self._tuple_contain_same_elements(x, t))
-            for x in exclude:
-                self.relation[x] = self.relation[t]
-                remains.remove(x)
+        representatives: Dict[Tuple, T] = dict()
+        for t in self.relation.keys():
+            representative = representatives.setdefault(_canonical_arguments(t), t)
+            if representative is not t:
+                self.relation[t] = self.relation[representative]
 
     @staticmethod
     def _tuple_contain_same_elements(t1: Tuple[T], t2: Tuple[T]) -> bool:
@@ -92,10 +219,304 @@ class Function:
         return True
 
 
+def _canonical_arguments(arguments: Tuple) -> Tuple:
+    """
+    Returns the same key for all permutations of the arguments.
+    """
+    try:
+        return tuple(sorted(arguments))
+    except TypeError:
+        return tuple(sorted(Counter(arguments).items(), key=repr))
+
+
 def to_tuple_iter(iter: Iterable[T]) -> Iterable[Tuple[T]]:
     return map(lambda x: (x,), iter)
 
 
+class ProductDomain:
+    def __init__(self, *axes: Iterable):
+        """
+        Cartesian product of finite axes, which isn't materialized. Used as the
+        domain in 'FunctionFactory.build', it builds a 'ProductFunction'.
+        For example, 'ProductDomain(A, C)' contains the same values as
+        'product(A, C)'.
+        """
+        self.axes: Tuple[Tuple, ...] = tuple(tuple(axis) for axis in axes)
+        self.indices: Tuple[Dict, ...] = tuple(
+            {value: i for i, value in enumerate(axis)} for axis in self.axes
+        )
+        for axis, index in zip(self.axes, self.indices):
+            if len(axis) != len(index):
+                raise ValueError(f"The axis '{axis}' contains duplicate values.")
+        self.sizes: Tuple[int, ...] = tuple(len(axis) for axis in self.axes)
+
+    def __len__(self) -> int:
+        length = 1
+        for size in self.sizes:
+            length *= size
+        return length
+
+    def __iter__(self) -> Iterator[Tuple]:
+        return product(*self.axes)
+
+    def __contains__(self, args) -> bool:
+        try:
+            self.index(args)
+        except KeyError:
+            return False
+        return True
+
+    def index(self, args: Tuple) -> int:
+        """
+        Returns the position of the arguments in the product as mixed radix
+        number of the positions in the axes.
+        """
+        if not isinstance(args, tuple) or len(args) != len(self.indices):
+            raise KeyError(args)
+        position = 0
+        try:
+            for index, size, arg in zip(self.indices, self.sizes, args):
+                position = position * size + index[arg]
+        except TypeError:
+            raise KeyError(args)
+        return position
+
+    def __getitem__(self, position: int) -> Tuple:
+        if not 0 <= position < len(self):
+            raise IndexError("ProductDomain index out of range.")
+        args = []
+        for axis, size in zip(reversed(self.axes), reversed(self.sizes)):
+            position, i = divmod(position, size)
+            args.append(axis[i])
+        return tuple(reversed(args))
+
+
+class ProductRelation(Mapping):
+    def __init__(self, domain: ProductDomain, start_variable: int):
+        """
+        Relation of a 'ProductFunction'. The variable of the arguments is
+        computed from their position in the domain. Variables changed by
+        'set_equivalent' or 'set_commutative' are stored in 'overrides'.
+        """
+        self.domain: ProductDomain = domain
+        self.start_variable: int = start_variable
+        self.overrides: Dict[Tuple, int] = dict()
+
+    def __getitem__(self, args: Tuple) -> int:
+        if self.overrides:
+            variable = self.overrides.get(args)
+            if variable is not None:
+                return variable
+        return self.start_variable + self.domain.index(args)
+
+    def __setitem__(self, args: Tuple, variable: int):
+        if args not in self.domain:
+            raise KeyError(args)
+        self.overrides[args] = variable
+
+    def __contains__(self, args) -> bool:
+        return args in self.domain
+
+    def __iter__(self) -> Iterator[Tuple]:
+        return iter(self.domain)
+
+    def __len__(self) -> int:
+        return len(self.domain)
+
+
+class ProductFunction(Function):
+    def __init__(
+        self,
+        name: str,
+        arguemts_len: int,
+        domain: ProductDomain,
+        start_variable: int,
+    ):
+        """
+        Function over a 'ProductDomain'. The variable of the arguments is
+        'start_variable' plus their position in the domain, so neither the
+        domain nor the relation is materialized. It needs memory in the order
+        of the sum of the sizes of the axes.
+        """
+        if len(domain.axes) != arguemts_len:
+            raise ValueError(
+                f"The domain of function '{name}' has '{len(domain.axes)}' axes but the function takes '{arguemts_len}' arguments."
+            )
+        self.was_evaluated: bool = False
+        self.name: str = name
+        self.arguments_len: int = arguemts_len
+        self.domain: ProductDomain = domain
+        self.commutative: bool = False
+        self.relation: ProductRelation = ProductRelation(domain, start_variable)
+        self.range: Tuple[int, int] = (start_variable, start_variable - 1 + len(domain))
+
+    def evaluate(
+        self, arguments: Tuple[str, ...], context: LogicalOperatorContext
+    ) -> int:
+        args = tuple(context.getArgument(arg) for arg in arguments)
+        try:
+            variable = self.relation[args]
+        except KeyError:
+            raise ValueError(
+                f"The input '{args}' of arguments '{arguments}' is not in the domain of function '{self.name}'."
+            )
+        self.was_evaluated = True
+        return variable
+
+    def index_table(self):
+        if hasattr(self, "_index_table"):
+            return self._index_table
+        import numpy
+
+        table = numpy.arange(
+            self.range[0], self.range[1] + 1, dtype=numpy.int64
+        ).reshape(self.domain.sizes)
+        for args, variable in self.relation.overrides.items():
+            table[
+                tuple(index[arg] for index, arg in zip(self.domain.indices, args))
+            ] = variable
+        self.was_evaluated = True
+        self._index_table = (self.domain.indices, table)
+        return self._index_table
+
+
+class TableRelation(Mapping):
+    def __init__(
+        self,
+        key_table: bytes,
+        key_offsets: Sequence[int],
+        index: Sequence[int],
+        variables: Sequence[int],
+    ):
+        """
+        Relation of a loaded function. The arguments at position 'i' are
+        stored by their compact JSON encoding as
+        'key_table[key_offsets[i] : key_offsets[i + 1]]' and 'variables[i]' is
+        their variable. 'index' contains the positions sorted by the keys, so
+        arguments are looked up by a binary search. All of them can be memory
+        mapped buffers shared by many processes, as no dict from arguments to
+        positions is built.
+        """
+        self.key_table: bytes = key_table
+        self.key_offsets: Sequence[int] = key_offsets
+        self.index: Sequence[int] = index
+        self.variables: Sequence[int] = variables
+        self.overrides: Dict[Tuple, int] = dict()
+
+    def __getstate__(self) -> Dict:
+        # Memory mapped buffers can't be pickled.
+        return {
+            "key_table": bytes(self.key_table),
+            "key_offsets": array("q", self.key_offsets),
+            "index": array("i", self.index),
+            "variables": array("i", self.variables),
+            "overrides": self.overrides,
+        }
+
+    def _key(self, position: int) -> bytes:
+        return bytes(
+            self.key_table[self.key_offsets[position] : self.key_offsets[position + 1]]
+        )
+
+    def _position(self, args: Tuple) -> int:
+        if not isinstance(args, tuple):
+            raise KeyError(args)
+        try:
+            key = _encode_arguments(args)
+        except (TypeError, ValueError):
+            raise KeyError(args)
+        i = bisect_left(self.index, key, key=self._key)
+        if i == len(self.index) or self._key(self.index[i]) != key:
+            raise KeyError(args)
+        return self.index[i]
+
+    def __getitem__(self, args: Tuple) -> int:
+        if self.overrides:
+            variable = self.overrides.get(args)
+            if variable is not None:
+                return variable
+        return self.variables[self._position(args)]
+
+    def __setitem__(self, args: Tuple, variable: int):
+        self._position(args)
+        self.overrides[args] = variable
+
+    def __contains__(self, args) -> bool:
+        try:
+            self._position(args)
+        except KeyError:
+            return False
+        return True
+
+    def __iter__(self) -> Iterator[Tuple]:
+        for position in range(len(self.variables)):
+            yield _from_json(json.loads(self._key(position)))
+
+    def __len__(self) -> int:
+        return len(self.variables)
+
+
+class LoadedFunction(Function):
+    def __init__(
+        self,
+        name: str,
+        arguemts_len: int,
+        relation: TableRelation,
+        range: Tuple[int, int],
+        commutative: bool = False,
+    ):
+        """
+        Function restored by 'FunctionFactory.load'.
+        """
+        self.was_evaluated: bool = False
+        self.name: str = name
+        self.arguments_len: int = arguemts_len
+        self.commutative: bool = commutative
+        self.relation: TableRelation = relation
+        self.domain: TableRelation = relation
+        self.range: Tuple[int, int] = range
+
+
+_VARIABLE_MAP_MAGIC = b"SATXVMAP"
+
+
+def _from_json(value):
+    # JSON turns tuples into lists.
+    if isinstance(value, list):
+        return tuple(map(_from_json, value))
+    return value
+
+
+def _encode_arguments(args: Tuple) -> bytes:
+    # Equal arguments have the same compact JSON encoding.
+    return json.dumps(args, separators=(",", ":")).encode()
+
+
+def _table_index(arguments: Iterable[Tuple]) -> Tuple[bytes, array, array]:
+    """
+    Returns the concatenated keys of the arguments, the offsets of the keys
+    and the positions of the arguments sorted by their keys, as stored for a
+    'TableRelation'.
+    """
+    keys = [_encode_arguments(args) for args in arguments]
+    key_offsets = array("q", [0])
+    for key in keys:
+        key_offsets.append(key_offsets[-1] + len(key))
+    index = array("i", sorted(range(len(keys)), key=keys.__getitem__))
+    return b"".join(keys), key_offsets, index
+
+
+def evaluates_by_relation(func: Function) -> bool:
+    """
+    Checks if the function evaluates to the variables in its 'relation', so
+    the evaluation can be replaced by looking up the relation.
+    """
+    return isinstance(func, Function) and type(func).evaluate in (
+        Function.evaluate,
+        ProductFunction.evaluate,
+    )
+
+
 class Constant(Function):
     def __init__(self, name: str, start_variable: int):
         self.was_evaluated: bool = False
@@ -104,6 +525,7 @@ class Constant(Function):
         self.domain: Set[T] = set()
         self.relation: Dict[T, int] = {(): start_variable}
         self.range: Tuple[int, int] = (start_variable, start_variable + 1)
+        self.commutative: bool = False
         self.value = start_variable
 
     def evaluate(self, *args) -> int:
@@ -113,23 +535,203 @@ class Constant(Function):
         warn(f"Calling 'set_equivalent' on the Constant '{self.name}' has no effect.")
         pass
 
+    def set_equivalences(self, *args):
+        warn(f"Calling 'set_equivalences' on the Constant '{self.name}' has no effect.")
+        pass
+
     def set_commutative(self):
         warn(f"Calling 'set_commutative' on the Constant '{self.name}' has no effect.")
         pass
 
 
+class Atom(NamedTuple):
+    """
+    Value of a variable in a model. For auxiliary variables, 'function' is
+    the label of their block and 'arguments' contains the variable.
+    """
+
+    function: str
+    arguments: Tuple
+    value: bool
+
+
+# Translation of the values in 'FunctionFactory.decode' to a mask of the true
+# variables. 1 is true, 2 is false and 0 is missing in the model.
+_TRUE_MASK = bytes.maketrans(b"\x01\x02", b"\x01\x00")
+
+
 class FunctionFactory:
     def __init__(self):
         self.variable_counter = 1
         self.functions: List[Function] = []
+        # Blocks of auxiliary variables as (label, first variable, last variable).
+        self.auxiliary: List[Tuple[str, int, int]] = []
+
+    def save(self, path: str | PathLike):
+        """
+        Saves the variables of all functions to 'path'. The file starts with a
+        JSON header describing the functions, followed by a binary section per
+        table function, which is memory mapped by 'load'. It contains the
+        variables as 32 bit integers and the arguments as sorted key table,
+        see 'TableRelation'. Product functions only store their axes in the
+        header. The arguments must be JSON serializable, where tuples are
+        restored as tuples.
+        """
+        functions = []
+        sections = []
+        offset = 0
+
+        def add_section(data: bytes) -> int:
+            nonlocal offset
+            # Aligns the sections for the casts in 'load'.
+            padding = -len(data) % 8
+            sections.append(data + b"\0" * padding)
+            offset += len(data) + padding
+            return offset - len(data) - padding
+
+        try:
+            for func in self.functions:
+                description = {
+                    "name": func.name,
+                    "arguments_len": func.arguments_len,
+                    "range": list(func.range),
+                    "commutative": func.commutative,
+                }
+                if isinstance(func, Constant):
+                    description["kind"] = "constant"
+                elif isinstance(func, ProductFunction):
+                    description["kind"] = "product"
+                    description["axes"] = [list(axis) for axis in func.domain.axes]
+                    description["overrides"] = [
+                        [list(args), variable]
+                        for args, variable in func.relation.overrides.items()
+                    ]
+                else:
+                    key_table, key_offsets, index = _table_index(func.relation.keys())
+                    description["kind"] = "table"
+                    description["length"] = len(func.relation)
+                    description["offset"] = add_section(
+                        array("i", func.relation.values()).tobytes()
+                    )
+                    description["index"] = add_section(index.tobytes())
+                    description["key_offsets"] = add_section(key_offsets.tobytes())
+                    description["key_table"] = add_section(key_table)
+                    description["key_table_length"] = len(key_table)
+                functions.append(description)
+            header = json.dumps(
+                {
+                    "byteorder": sys.byteorder,
+                    "variable_counter": self.variable_counter,
+                    "functions": functions,
+                    "auxiliary": self.auxiliary,
+                }
+            ).encode()
+        except (TypeError, ValueError) as e:
+            raise ValueError(
+                "The domains of the functions must be JSON serializable to be saved.",
+                str(e),
+            )
+        padding = -(len(_VARIABLE_MAP_MAGIC) + 8 + len(header)) % 8
+        with open(path, "wb") as f:
+            f.write(_VARIABLE_MAP_MAGIC)
+            f.write((len(header) + padding).to_bytes(8, "little"))
+            f.write(header + b" " * padding)
+            for section in sections:
+                f.write(section)
+
+    @staticmethod
+    def load(path: str | PathLike) -> "FunctionFactory":
+        """
+        Loads a factory saved with 'save'. The variables and the sorted key
+        tables of the functions are memory mapped, so processes loading the
+        same file share them and looking up arguments doesn't build an index
+        per process.
+        """
+        with open(path, "rb") as f:
+            if f.read(len(_VARIABLE_MAP_MAGIC)) != _VARIABLE_MAP_MAGIC:
+                raise ValueError(f"The file '{path}' is not a saved FunctionFactory.")
+            header_length = int.from_bytes(f.read(8), "little")
+            header = json.loads(f.read(header_length))
+            data_start = len(_VARIABLE_MAP_MAGIC) + 8 + header_length
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if header["byteorder"] != sys.byteorder:
+            raise ValueError(
+                f"The file '{path}' was saved with byteorder '{header['byteorder']}'."
+            )
+        data = memoryview(mapped)[data_start:]
+
+        def section(offset: int, length: int, typecode: str) -> memoryview:
+            return data[offset : offset + length * array(typecode).itemsize].cast(
+                typecode
+            )
+
+        factory = FunctionFactory()
+        factory.variable_counter = header["variable_counter"]
+        factory.auxiliary = [tuple(block) for block in header.get("auxiliary", [])]
+        for description in header["functions"]:
+            name = description["name"]
+            start_variable = description["range"][0]
+            if description["kind"] == "constant":
+                func = Constant(name, start_variable)
+            elif description["kind"] == "product":
+                func = ProductFunction(
+                    name,
+                    description["arguments_len"],
+                    ProductDomain(*map(_from_json, description["axes"])),
+                    start_variable,
+                )
+                func.relation.overrides = {
+                    _from_json(args): variable
+                    for args, variable in description["overrides"]
+                }
+            else:
+                length = description["length"]
+                relation = TableRelation(
+                    section(
+                        description["key_table"], description["key_table_length"], "B"
+                    ),
+                    section(description["key_offsets"], length + 1, "q"),
+                    section(description["index"], length, "i"),
+                    section(description["offset"], length, "i"),
+                )
+                func = LoadedFunction(
+                    name,
+                    description["arguments_len"],
+                    relation,
+                    tuple(description["range"]),
+                    commutative=description["commutative"],
+                )
+            func.commutative = description["commutative"]
+            factory.functions.append(func)
+        return factory
 
     def _assert_unique_name(self, name: str):
         if name in map(lambda f: f.name, self.functions):
             raise ValueError(f"The function with the name '{name}' is already defined.")
 
-    def build(self, name: str, arguments_len: int, domain: Iterable[T]) -> Function:
+    def build(
+        self,
+        name: str,
+        arguments_len: int,
+        domain: Iterable[T],
+        commutative: bool = False,
+    ) -> Function:
+        """
+        Builds a function with the given domain. If the domain is a
+        'ProductDomain', a 'ProductFunction' is built, which doesn't
+        materialize its domain, unless it should be 'commutative'.
+        """
         self._assert_unique_name(name)
-        func = Function(name, arguments_len, domain, self.variable_counter)
+        if isinstance(domain, ProductDomain) and not commutative:
+            func = ProductFunction(name, arguments_len, domain, self.variable_counter)
+        else:
+            func = Function(
+                name,
+                arguments_len,
+                domain,
+                self.variable_counter,
+                commutative=commutative,
+            )
         self.variable_counter += func.range[1] - func.range[0] + 1
         self.functions.append(func)
         return func
@@ -140,3 +742,141 @@ class FunctionFactory:
         self.functions.append(const)
         self.variable_counter += 1
         return const
+
+    def new_variables(self, count: int, label: str = "auxiliary") -> range:
+        """
+        Allocates 'count' fresh variables, which don't belong to any function,
+        e.g. the auxiliary variables of cardinality encodings. The block is
+        recorded in 'auxiliary' under 'label'.
+        """
+        variables = range(self.variable_counter, self.variable_counter + count)
+        if count > 0:
+            self.auxiliary.append((label, variables.start, variables.stop - 1))
+        self.variable_counter += count
+        return variables
+
+    def decoder(self) -> Tuple[array, List[Tuple[int, int, str, Iterable[Tuple]]]]:
+        """
+        Returns the sorted starts of the blocks of variables of the functions
+        and the auxiliary variables and the blocks as (first variable, last
+        variable, name, reverse index). The reverse index yields the arguments
+        of every variable of the block in order or 'None' for variables not
+        used because of equivalences. It is built once for the current
+        functions, so call it after setting equivalences.
+        """
+        key = (len(self.functions), len(self.auxiliary), self.variable_counter)
+        cached = getattr(self, "_decoder", None)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        blocks = []
+        for func in self.functions:
+            start = func.range[0]
+            if isinstance(func, Constant):
+                blocks.append((start, start, func.name, ((),)))
+                continue
+            end = func.range[1]
+            if isinstance(func, ProductFunction) and not func.relation.overrides:
+                # The arguments of a product function are in the order of its
+                # variables.
+                blocks.append((start, end, func.name, func.domain))
+                continue
+            reverse: List[Tuple | None] = [None] * (end - start + 1)
+            for args in func.relation:
+                position = func.relation[args] - start
+                if reverse[position] is None:
+                    reverse[position] = args
+            blocks.append((start, end, func.name, reverse))
+        for label, start, end in self.auxiliary:
+            blocks.append((start, end, label, range(start, end + 1)))
+        blocks.sort(key=lambda block: block[0])
+        decoder = (array("q", (block[0] for block in blocks)), blocks)
+        self._decoder = (key, decoder)
+        return decoder
+
+    def lookup(self, variable: int) -> Tuple[str, Tuple] | None:
+        """
+        Returns the name and the arguments of the function the variable
+        belongs to or 'None' if the variable doesn't belong to any function.
+        """
+        starts, blocks = self.decoder()
+        i = bisect_right(starts, abs(variable)) - 1
+        if i < 0 or abs(variable) > blocks[i][1]:
+            return None
+        start, _, name, reverse = blocks[i]
+        position = abs(variable) - start
+        if isinstance(reverse, range):
+            return name, (reverse[position],)
+        args = reverse[position]
+        return None if args is None else (name, args)
+
+    def decode(
+        self,
+        model: Iterable[int],
+        functions: Iterable[str | Function] | None = None,
+        true_only: bool = True,
+    ) -> List[Atom]:
+        """
+        Maps the signed literals of a model, e.g. 'SolverResult.model', to the
+        atoms of the functions and auxiliary variables in the order of their
+        variables. Variables missing in the model or not belonging to any
+        function are skipped.
+
+        Keyword arguments:
+        functions -- names of the functions or labels of the auxiliary blocks
+            to decode. All are decoded if it isn't given.
+        true_only -- if set, only the true atoms are returned.
+        """
+        _, blocks = self.decoder()
+        if functions is not None:
+            names = {f if isinstance(f, str) else f.name for f in functions}
+            blocks = [block for block in blocks if block[2] in names]
+        values = _model_values(model, self.variable_counter)
+        atoms: List[Atom] = []
+        # The atoms are created without calling Python code per variable.
+        new_atom = partial(tuple.__new__, Atom)
+        for start, end, name, reverse in blocks:
+            if isinstance(reverse, range):
+                reverse = zip(reverse)
+            block_values = values[start : end + 1]
+            if true_only:
+                arguments = compress(reverse, block_values.translate(_TRUE_MASK))
+                atoms.extend(
+                    map(
+                        new_atom,
+                        zip(
+                            repeat(name),
+                            filter(partial(is_not, None), arguments),
+                            repeat(True),
+                        ),
+                    )
+                )
+                continue
+            for args, value in compress(zip(reverse, block_values), block_values):
+                if args is not None:
+                    atoms.append(Atom(name, args, value == 1))
+        return atoms
+
+
+def _model_values(model: Iterable[int], n: int) -> bytearray:
+    """
+    Returns for every variable below 'n' if it is true (1), false (2) or
+    missing (0) in the model. Uses NumPy if it is installed.
+    """
+    try:
+        import numpy
+    except ImportError:
+        values = bytearray(n)
+        for literal in model:
+            if 0 < literal < n:
+                values[literal] = 1
+            elif 0 < -literal < n:
+                values[-literal] = 2
+        return values
+    if isinstance(model, array):
+        literals = numpy.frombuffer(model, dtype=model.typecode).astype(numpy.int64)
+    else:
+        literals = numpy.fromiter(model, dtype=numpy.int64)
+    values = numpy.zeros(n, dtype=numpy.uint8)
+    values[-literals[(literals < 0) & (literals > -n)]] = 2
+    values[literals[(literals > 0) & (literals < n)]] = 1
+    return bytearray(values.tobytes())
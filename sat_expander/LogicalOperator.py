@@ -1,10 +1,38 @@
-from sat_expander.Functions import Function, FunctionFactory
+from sat_expander.Functions import (
+    Constant,
+    Function,
+    FunctionFactory,
+    evaluates_by_relation,
+)
 from sat_expander.LogicalOperatorContext import LogicalOperatorContext
-from sat_expander.ExclusionPredicates import ExclusionPredicate
-from sat_expander.CNF import CNF
+from sat_expander.ExclusionPredicates import (
+    ExclusionPredicate,
+    Predicate,
+    predicate_dependencies,
+)
+from sat_expander.CNF import CNF, CNFLine
 
 from enum import Enum
-from typing import Dict, Tuple, Iterable, TypeVar, List, Optional
+from operator import itemgetter
+from typing import (
+    TYPE_CHECKING,
+    AsyncIterator,
+    Callable,
+    Dict,
+    Tuple,
+    Iterable,
+    Iterator,
+    TypeVar,
+    List,
+    Optional,
+)
+
+if TYPE_CHECKING:
+    from concurrent.futures import Executor
+    from sat_expander.CompiledOperator import CompiledOperator
+    from sat_expander.Memoization import SubchainCache
+    from sat_expander.Statistics import Stats
+    from sat_expander.Vectorized import VectorKernel
 
 T = TypeVar("T")  # Type of the arguments for the function
 OptionLogicalOperator = Optional["LogicalOperator"]
@@ -14,6 +42,7 @@ class LogicalOperatorType(Enum):
     ALL = 0
     EXISTS = 1
     EXPRESSION = 2
+    CARDINALITY = 3
 
 
 class LogicalOperator:
@@ -36,6 +65,12 @@ class LogicalOperator:
         self.values: Tuple = tuple(values)
         self.suboperator: None | LogicalOperator = suboperator
         self.exclude_predicate: ExclusionPredicate | None = exclude_predicate
+        self.kernel: Optional["VectorKernel"] = None
+        self.memo: Optional["SubchainCache"] = None
+        self._value_index = None
+        # Variables allocated from a factory by the context they were
+        # allocated in, see 'variable_allocator'.
+        self._allocations: Dict[Tuple, List[range]] = dict()
 
     def evaluate(
         self,
@@ -43,13 +78,279 @@ class LogicalOperator:
     ):
         raise NotImplementedError("Evaluate will not be implemented for base class.")
 
+    def iter_clauses(
+        self,
+        context: LogicalOperatorContext | None = None,
+    ) -> Iterator[CNFLine]:
+        """
+        Yields the lines of the CNF one at a time instead of collecting them.
+        Operators which only implement 'evaluate' are streamed from its result.
+        """
+        yield from self.evaluate(context)
+
+    def aiter_clauses(
+        self,
+        context: LogicalOperatorContext | None = None,
+        batch_size: int | None = None,
+        executor: Optional["Executor"] = None,
+    ) -> AsyncIterator[Tuple[CNFLine, ...]]:
+        """
+        Yields the lines of the CNF in batches of 'batch_size' lines for
+        'async for', while they are generated in 'executor'. The batch size
+        defaults to 'DEFAULT_BATCH_SIZE'. See
+        'sat_expander.Asynchronous.aiter_clauses'.
+        """
+        from sat_expander.Asynchronous import DEFAULT_BATCH_SIZE, aiter_clauses
+
+        if batch_size is None:
+            batch_size = DEFAULT_BATCH_SIZE
+        return aiter_clauses(self, context, batch_size, executor)
+
+    def allocates_variables(self) -> bool:
+        """
+        Returns if an operator of the chain starting at this operator allocates
+        variables from a 'FunctionFactory' while it is evaluated, e.g. a
+        cardinality operator or an 'OrOperator' with definition variables.
+        """
+        operator = self
+        while operator is not None:
+            if operator._allocates_own_variables():
+                return True
+            operator = getattr(operator, "suboperator", None)
+        return False
+
+    def _allocates_own_variables(self) -> bool:
+        return False
+
+    def variable_allocator(
+        self, context: LogicalOperatorContext, label: str
+    ) -> Callable[[int], range]:
+        """
+        Returns 'new_variables(count)' allocating variables labeled 'label' from
+        the factory of this operator in the context. The variables are
+        allocated on the first evaluation in the context and the same ones
+        are returned by later evaluations, e.g. by the counting pass of
+        'sat_expander.Solver.SolverPipe'. So every evaluation gives the same
+        lines and 'factory.variable_counter' doesn't change after the first.
+        """
+        allocations = self._allocations.setdefault(_context_key(context), [])
+        position = 0
+
+        def new_variables(count: int) -> range:
+            nonlocal position
+            if position == len(allocations):
+                allocations.append(self.factory.new_variables(count, label))
+            elif len(allocations[position]) != count:
+                # The values of the operators changed since the last evaluation.
+                allocations[position] = self.factory.new_variables(count, label)
+            position += 1
+            return allocations[position - 1]
+
+        return new_variables
+
+    def dependencies(self) -> frozenset | None:
+        """
+        Returns the variables of the outer context the chain starting at this
+        operator depends on or 'None' if they are unknown because of an opaque
+        exclusion predicate.
+        """
+        sub_dependencies = (
+            frozenset() if self.suboperator is None else self.suboperator.dependencies()
+        )
+        own_dependencies = predicate_dependencies(self.exclude_predicate)
+        if sub_dependencies is None or own_dependencies is None:
+            return None
+        return (sub_dependencies | own_dependencies) - frozenset(self.variables)
+
+    def candidate_values(self, context: LogicalOperatorContext) -> Tuple[Tuple, bool]:
+        """
+        Returns the values which need to be considered in the context and if
+        the exclusion predicate is already satisfied by all of them.
+        For indexable predicates ('sat_expander.ExclusionPredicates.Predicate')
+        a hash index over the values is built once and only the values
+        matching the context are returned. Otherwise, all values are returned.
+        """
+        if self._value_index is None or self._value_index[0] is not self.values:
+            self._value_index = (self.values, *self._build_value_index())
+        _, predicate, index = self._value_index
+        if predicate is None or predicate.key_variable not in context.vars:
+            return self.values, False
+        try:
+            candidates = index.get(context.vars[predicate.key_variable], ())
+        except TypeError:
+            return self.values, False
+        return candidates, predicate is self.exclude_predicate
+
+    def iter_contexts(
+        self, context: LogicalOperatorContext
+    ) -> Iterator[LogicalOperatorContext]:
+        """
+        Yields the context for every value which isn't excluded.
+        """
+        candidates, satisfied = self.candidate_values(context)
+        for values in candidates:
+            current_context = self.bind(context, values)
+            if (
+                self.exclude_predicate is not None
+                and not satisfied
+                and not self.exclude_predicate(current_context, values)
+            ):
+                continue
+            yield current_context
+
+    def bind(self, context: LogicalOperatorContext, values) -> LogicalOperatorContext:
+        """
+        Returns the context with the variables of this operator set to 'values'.
+        """
+        try:
+            len(values)
+        except TypeError:
+            raise RuntimeError(
+                f"The values '{values}' are not iterable. Consider using 'Function.to_tuple_iter(domain)' as the domain in the definition of the AllQantor."
+            )
+        if len(values) != len(self.variables):
+            raise RuntimeError(
+                f"The length of values '{values}' for the variables '{self.variables}' don't have a matching length."
+            )
+        return context.expandContext(**dict(zip(self.variables, values)))
+
+    def _build_value_index(self) -> Tuple:
+        if not isinstance(self.exclude_predicate, Predicate):
+            return None, None
+        predicate = self.exclude_predicate.indexable()
+        if predicate is None:
+            return None, None
+        index: Dict = dict()
+        try:
+            for values in self.values:
+                if len(values) != len(self.variables):
+                    # Keep the errors of the sequential evaluation.
+                    return None, None
+                for key in predicate.index_keys(values):
+                    index.setdefault(key, []).append(values)
+        except TypeError:
+            return None, None
+        return predicate, {key: tuple(values) for key, values in index.items()}
+
+    def emit(self, target, context: LogicalOperatorContext | None = None):
+        """
+        Appends the lines of the CNF to 'target' while they are generated and
+        returns 'target'. 'target' can be anything with an 'extend' method,
+        e.g. a list or a 'sat_expander.CNF.CompactCNF'. Vectorized chains
+        hand whole NumPy blocks to targets with an 'extend_block' method.
+        """
+        if hasattr(target, "extend_block") and self._is_vectorized():
+            from sat_expander.Vectorized import iter_blocks
+
+            for block in iter_blocks(self, context):
+                target.extend_block(block)
+            return target
+        target.extend(self.iter_clauses(context))
+        return target
+
+    def _is_vectorized(self) -> bool:
+        operator = self
+        while operator is not None:
+            if getattr(operator, "kernel", None) is not None:
+                return True
+            operator = getattr(operator, "suboperator", None)
+        return False
+
+    def compile(self) -> "CompiledOperator":
+        """
+        Compiles the chain starting at this operator into nested loops for a
+        faster evaluation. See 'sat_expander.CompiledOperator.CompiledOperator'.
+        """
+        from sat_expander.CompiledOperator import CompiledOperator
+
+        return CompiledOperator(self)
+
+    def vectorize(self) -> "LogicalOperator":
+        """
+        Computes the literals of the innermost operator of the chain with NumPy
+        arrays. See 'sat_expander.Vectorized.VectorKernel'. Requires NumPy.
+        """
+        if self.operator_type == LogicalOperatorType.EXPRESSION:
+            raise NotImplementedError(
+                "An ExpressionOperator can't be vectorized. Vectorize the chain of operators before it."
+            )
+        innermost = self
+        while (
+            innermost.suboperator is not None
+            and innermost.suboperator.operator_type != LogicalOperatorType.EXPRESSION
+        ):
+            innermost = innermost.suboperator
+        if innermost.suboperator is None:
+            raise RuntimeError(
+                "Only chains ending with an ExpressionOperator can be vectorized."
+            )
+        from sat_expander.Vectorized import VectorKernel
+
+        innermost.kernel = VectorKernel(innermost)
+        return self
+
+    def enable_memoization(
+        self, maxsize: int = 1024, max_entry_size: int = 100_000
+    ) -> "LogicalOperator":
+        """
+        Caches the lines of every sub-chain which doesn't depend on all
+        variables bound by the operators above it. The lines are cached by the
+        values of the variables the sub-chain depends on, see 'dependencies'.
+        Sub-chains with opaque exclusion predicates aren't cached. The caches
+        are kept between evaluations. Call 'clear_memoization' if the
+        functions change. See 'sat_expander.Memoization.SubchainCache'.
+        """
+        from sat_expander.Memoization import SubchainCache
+
+        bound = set(self.variables)
+        operator = self.suboperator
+        while operator is not None and operator.variables is not None:
+            dependencies = operator.dependencies()
+            operator.memo = (
+                SubchainCache(tuple(sorted(dependencies)), maxsize, max_entry_size)
+                if dependencies is not None and bound - dependencies
+                else None
+            )
+            bound.update(operator.variables)
+            operator = operator.suboperator
+        return self
+
+    def clear_memoization(self):
+        operator = self
+        while operator is not None:
+            if getattr(operator, "memo", None) is not None:
+                operator.memo.clear()
+            operator = operator.suboperator
+
+    def suboperator_clauses(self, context: LogicalOperatorContext) -> Iterator[CNFLine]:
+        """
+        Yields the lines of the suboperator in the context. Uses its cache if
+        memoization is enabled.
+        """
+        memo = getattr(self.suboperator, "memo", None)
+        if memo is None:
+            return self.suboperator.iter_clauses(context)
+        return memo.iter_clauses(context, self.suboperator.iter_clauses)
+
     def add_suboperator(self, suboperator: "LogicalOperator") -> "LogicalOperator":
         if (
             self.operator_type == LogicalOperatorType.EXISTS
             and suboperator.operator_type == LogicalOperatorType.ALL
+            and getattr(self, "factory", None) is None
+        ):
+            raise RuntimeError(
+                "Can't put an And LogicalOperator after an Or LogicalOperator. Not a valid CNF. Give the Or LogicalOperator a 'FunctionFactory' for definition variables."
+            )
+        cardinality = LogicalOperatorType.CARDINALITY
+        if (
+            self.operator_type == cardinality
+            and suboperator.operator_type == LogicalOperatorType.ALL
+        ) or (
+            suboperator.operator_type == cardinality
+            and self.operator_type in (LogicalOperatorType.EXISTS, cardinality)
         ):
             raise RuntimeError(
-                "Can't put an And LogicalOperator after an Or LogicalOperator. Not a valid CNF."
+                "A cardinality LogicalOperator can only follow an And LogicalOperator and can't be followed by an And LogicalOperator. Not a valid CNF."
             )
         self.suboperator = suboperator
         return self
@@ -81,28 +382,44 @@ class AndOperator(LogicalOperator):
     def evaluate(
         self,
         context: LogicalOperatorContext | None = None,
+        workers: int | None = None,
+        *,
+        stats: Optional["Stats"] = None,
     ) -> CNF:
+        return tuple(self.iter_clauses(context, workers, stats=stats))
+
+    def iter_clauses(
+        self,
+        context: LogicalOperatorContext | None = None,
+        workers: int | None = None,
+        *,
+        stats: Optional["Stats"] = None,
+    ) -> Iterator[CNFLine]:
+        """
+        Keyword arguments:
+        workers -- if given, the values of this operator are evaluated in
+            chunks by a pool of 'workers' processes. See
+            'sat_expander.Parallel.parallel_iter_clauses'.
+        stats -- if given, the statistics of every operator in the chain are
+            recorded in it. See 'sat_expander.Statistics.Stats'.
+        """
         if context is None:
             context = LogicalOperatorContext.empty()
-        res: List[Tuple[int]] = []
-        for values in self.values:
-            try:
-                len(values)
-            except TypeError:
-                raise RuntimeError(
-                    f"The values '{values}' are not iterable. Consider using 'Function.to_tuple_iter(domain)' as the domain in the definition of the AllQantor."
-                )
-            if len(values) != len(self.variables):
-                raise RuntimeError(
-                    f"The length of values '{values}' for the variables '{self.variables}' don't have a matching length."
-                )
-            current_context = context.expandContext(**dict(zip(self.variables, values)))
-            if self.exclude_predicate is not None and not self.exclude_predicate(
-                current_context, values
-            ):
-                continue
-            res.extend(self.suboperator.evaluate(current_context))
-        return tuple(res)
+        if workers is not None and workers > 1:
+            from sat_expander.Parallel import parallel_iter_clauses
+
+            yield from parallel_iter_clauses(self, context, workers, stats=stats)
+            return
+        if stats is not None:
+            from sat_expander.Statistics import instrumented_iter_clauses
+
+            yield from instrumented_iter_clauses(self, context, stats)
+            return
+        if self.kernel is not None:
+            yield from self.kernel.iter_clauses(context)
+            return
+        for current_context in self.iter_contexts(context):
+            yield from self.suboperator_clauses(current_context)
 
 
 class OrOperator(LogicalOperator):
@@ -111,9 +428,22 @@ class OrOperator(LogicalOperator):
         variables: Tuple[str, ...],
         it: Iterable,
         exclusion_predicate: ExclusionPredicate | None = None,
+        factory: FunctionFactory | None = None,
     ):
         """
         There exists a variable in it ...
+
+        Keyword arguments:
+        factory -- if given, the suboperator can give more than one line for
+            a value, e.g. when an 'AndOperator' follows. Such a CNF is replaced
+            in the line by a fresh definition variable 'd' allocated from the
+            factory and 'd -> line' is added for all its lines (Tseitin).
+            The result is satisfiable iff the expanded CNF is satisfiable and
+            grows linearly instead of exponentially. The definition variables
+            are recorded in 'factory.auxiliary' labeled with the context they
+            stand for. They are allocated once for every context and reused
+            when the chain is evaluated again, see 'variable_allocator'. Such
+            a chain can't be evaluated with 'workers'.
         """
         super().__init__(
             LogicalOperatorType.EXISTS,
@@ -121,32 +451,267 @@ class OrOperator(LogicalOperator):
             it,
             exclude_predicate=exclusion_predicate,
         )
+        self.factory: FunctionFactory | None = factory
+
+    def _allocates_own_variables(self) -> bool:
+        return getattr(self, "factory", None) is not None
 
     def evaluate(
         self,
         context: LogicalOperatorContext | None = None,
+        *,
+        stats: Optional["Stats"] = None,
     ) -> CNF:
+        return tuple(self.iter_clauses(context, stats=stats))
+
+    def iter_clauses(
+        self,
+        context: LogicalOperatorContext | None = None,
+        *,
+        stats: Optional["Stats"] = None,
+    ) -> Iterator[CNFLine]:
+        """
+        Keyword arguments:
+        stats -- if given, the statistics of every operator in the chain are
+            recorded in it. See 'sat_expander.Statistics.Stats'.
+        """
         if context is None:
             context = LogicalOperatorContext.empty()
+        if stats is not None:
+            from sat_expander.Statistics import instrumented_iter_clauses
+
+            yield from instrumented_iter_clauses(self, context, stats)
+            return
+        if self.kernel is not None:
+            yield from self.kernel.iter_clauses(context)
+            return
+        yield from self.disjunction(
+            (current_context, tuple(self.suboperator_clauses(current_context)))
+            for current_context in self.iter_contexts(context)
+        )
+
+    def disjunction(
+        self, cnfs: Iterable[Tuple[LogicalOperatorContext, CNF]]
+    ) -> Iterator[CNFLine]:
+        """
+        Yields the line joining the CNFs of the suboperator in their contexts
+        and the lines defining the definition variables.
+        """
         res: List[int] = []
-        for values in self.values:
-            if len(values) != len(self.variables):
-                raise RuntimeError(
-                    f"The length of values '{values}' for the variables '{self.variables}' don't have a matching length."
-                )
-            current_context = context.expandContext(**dict(zip(self.variables, values)))
-            if self.exclude_predicate is not None and not self.exclude_predicate(
-                current_context, values
-            ):
+        satisfied = False
+        for current_context, previous_cnf in cnfs:
+            if len(previous_cnf) == 1:
+                res.extend(previous_cnf[0])
                 continue
-            previous_cnf: CNF = self.suboperator.evaluate(current_context)
-            if len(previous_cnf) != 1:
+            if getattr(self, "factory", None) is None:
                 raise RuntimeError(
                     "Or Opeator  can only evaluate CNFs containing one line. Passed CNF:",
                     previous_cnf,
                 )
-            res.extend(previous_cnf[0])
-        return (tuple(res),)
+            if not previous_cnf:
+                # The empty CNF is always satisfied.
+                satisfied = True
+                continue
+            (definition,) = self.variable_allocator(
+                current_context, _definition_label(current_context)
+            )(1)
+            for line in previous_cnf:
+                yield (-definition, *line)
+            res.append(definition)
+        if not satisfied:
+            yield tuple(res)
+
+
+def _context_key(context: LogicalOperatorContext) -> Tuple:
+    key = tuple(context.vars.items())
+    try:
+        hash(key)
+    except TypeError:
+        # Unhashable values are told apart by their representation.
+        return (repr(key),)
+    return key
+
+
+def _definition_label(context: LogicalOperatorContext) -> str:
+    return (
+        "definition("
+        + ", ".join(f"{var}={value!r}" for var, value in context.vars.items())
+        + ")"
+    )
+
+
+class CardinalityOperator(LogicalOperator):
+    def __init__(
+        self,
+        variables: Tuple[str, ...],
+        it: Iterable,
+        at_most: int | None = None,
+        at_least: int | None = None,
+        factory: FunctionFactory | None = None,
+        exclusion_predicate: ExclusionPredicate | None = None,
+        encoding: str = "sequential",
+    ):
+        """
+        At most 'at_most' and at least 'at_least' variables in it ... Like
+        'OrOperator' it collects one literal for every value, which is given
+        by its suboperator.
+
+        Keyword arguments:
+        factory -- 'FunctionFactory' allocating the auxiliary variables of the
+            encoding. Only the 'pairwise' encoding doesn't need one. The
+            variables are allocated once for every context and reused when
+            the chain is evaluated again, see 'variable_allocator'. Such a
+            chain can't be evaluated with 'workers'.
+        encoding -- one of 'pairwise', 'sequential', 'commander', 'ladder'
+            and 'totalizer'. 'commander' and 'ladder' only encode at most one.
+            See 'sat_expander.CardinalityEncodings'.
+        """
+        super().__init__(
+            LogicalOperatorType.CARDINALITY,
+            variables,
+            it,
+            exclude_predicate=exclusion_predicate,
+        )
+        if encoding != "pairwise" and factory is None:
+            raise ValueError(
+                f"The encoding '{encoding}' needs a 'FunctionFactory' for its auxiliary variables."
+            )
+        self.at_most: int | None = at_most
+        self.at_least: int | None = at_least
+        self.factory: FunctionFactory | None = factory
+        self.encoding: str = encoding
+
+    def _allocates_own_variables(self) -> bool:
+        return (
+            getattr(self, "factory", None) is not None and self.encoding != "pairwise"
+        )
+
+    def evaluate(
+        self,
+        context: LogicalOperatorContext | None = None,
+        *,
+        stats: Optional["Stats"] = None,
+    ) -> CNF:
+        return tuple(self.iter_clauses(context, stats=stats))
+
+    def iter_clauses(
+        self,
+        context: LogicalOperatorContext | None = None,
+        *,
+        stats: Optional["Stats"] = None,
+    ) -> Iterator[CNFLine]:
+        """
+        Keyword arguments:
+        stats -- if given, the statistics of every operator in the chain are
+            recorded in it. See 'sat_expander.Statistics.Stats'.
+        """
+        if context is None:
+            context = LogicalOperatorContext.empty()
+        if stats is not None:
+            from sat_expander.Statistics import instrumented_iter_clauses
+
+            yield from instrumented_iter_clauses(self, context, stats)
+            return
+        yield from self.encode(self.literals(context), context)
+
+    def literals(self, context: LogicalOperatorContext) -> List[int]:
+        """
+        Returns the literal of the suboperator for every value in the context.
+        """
+        return [
+            self.single_literal(tuple(self.suboperator_clauses(current_context)))
+            for current_context in self.iter_contexts(context)
+        ]
+
+    @staticmethod
+    def single_literal(previous_cnf: CNF) -> int:
+        if len(previous_cnf) != 1 or len(previous_cnf[0]) != 1:
+            raise RuntimeError(
+                "Cardinality Operator can only evaluate CNFs containing one literal. Passed CNF:",
+                previous_cnf,
+            )
+        return previous_cnf[0][0]
+
+    def encode(
+        self, literals: List[int], context: LogicalOperatorContext
+    ) -> Iterator[CNFLine]:
+        from sat_expander import CardinalityEncodings
+
+        new_variables = None
+        if self.factory is not None:
+            new_variables = self.variable_allocator(
+                context, f"{type(self).__name__}({self.encoding})"
+            )
+        if self.at_least is not None:
+            yield from CardinalityEncodings.at_least_k(
+                literals, self.at_least, self.encoding, new_variables
+            )
+        if self.at_most is not None:
+            yield from CardinalityEncodings.at_most_k(
+                literals, self.at_most, self.encoding, new_variables
+            )
+
+
+class AtMostOne(CardinalityOperator):
+    def __init__(
+        self,
+        variables: Tuple[str, ...],
+        it: Iterable,
+        factory: FunctionFactory | None = None,
+        exclusion_predicate: ExclusionPredicate | None = None,
+        encoding: str = "sequential",
+    ):
+        """
+        At most one variable in it ...
+        """
+        super().__init__(variables, it, 1, None, factory, exclusion_predicate, encoding)
+
+
+class ExactlyOne(CardinalityOperator):
+    def __init__(
+        self,
+        variables: Tuple[str, ...],
+        it: Iterable,
+        factory: FunctionFactory | None = None,
+        exclusion_predicate: ExclusionPredicate | None = None,
+        encoding: str = "sequential",
+    ):
+        """
+        Exactly one variable in it ...
+        """
+        super().__init__(variables, it, 1, 1, factory, exclusion_predicate, encoding)
+
+
+class AtMostK(CardinalityOperator):
+    def __init__(
+        self,
+        variables: Tuple[str, ...],
+        it: Iterable,
+        k: int,
+        factory: FunctionFactory | None = None,
+        exclusion_predicate: ExclusionPredicate | None = None,
+        encoding: str = "sequential",
+    ):
+        """
+        At most k variables in it ...
+        """
+        super().__init__(variables, it, k, None, factory, exclusion_predicate, encoding)
+
+
+class AtLeastK(CardinalityOperator):
+    def __init__(
+        self,
+        variables: Tuple[str, ...],
+        it: Iterable,
+        k: int,
+        factory: FunctionFactory | None = None,
+        exclusion_predicate: ExclusionPredicate | None = None,
+        encoding: str = "sequential",
+    ):
+        """
+        At least k variables in it ...
+        """
+        super().__init__(variables, it, None, k, factory, exclusion_predicate, encoding)
 
 
 class ExpressionOperator(LogicalOperator):
@@ -166,6 +731,9 @@ class ExpressionOperator(LogicalOperator):
             if not isinstance(functions, FunctionFactory)
             else tuple(functions.functions)
         )
+        self.functions_by_name: Dict[str, Function] = dict()
+        for func in self.functions:
+            self.functions_by_name.setdefault(func.name, func)
         self.expressions: Dict[Function, Tuple[str, ...], int] = tuple(
             map(lambda exp: self.parse_expression(exp), expressions)
         )
@@ -182,50 +750,82 @@ class ExpressionOperator(LogicalOperator):
         self,
         context: LogicalOperatorContext,
     ) -> CNF:
-        return (
-            tuple(
-                exp[2] * exp[0].evaluate(exp[1], context) for exp in self.expressions
-            ),
+        return tuple(self.iter_clauses(context))
+
+    def iter_clauses(
+        self,
+        context: LogicalOperatorContext | None = None,
+    ) -> Iterator[CNFLine]:
+        resolvers = self.literal_resolvers()
+        if resolvers is not None:
+            vars = context.vars if context is not None else dict()
+            try:
+                line = tuple([resolve(vars) for resolve in resolvers])
+            except KeyError:
+                # Missing variables or values outside of the domain. The
+                # evaluation below raises the errors of the functions.
+                pass
+            else:
+                if not self._marked_evaluated:
+                    for func, _, _ in self.expressions:
+                        func.was_evaluated = True
+                    self._marked_evaluated = True
+                yield line
+                return
+        yield tuple(
+            exp[2] * exp[0].evaluate(exp[1], context) for exp in self.expressions
         )
 
+    def literal_resolvers(self) -> Tuple[Callable[[Dict], int], ...] | None:
+        """
+        Returns for every expression the function resolving its literal from
+        the variables of the context, see 'LiteralAccessor'. Returns 'None' if
+        a function of the expressions has its own 'evaluate'.
+        """
+        cached = getattr(self, "_resolvers", None)
+        if cached is None or cached[0] is not self.expressions:
+            accessors = tuple(LiteralAccessor(*exp) for exp in self.expressions)
+            resolvers = tuple(accessor.resolve for accessor in accessors)
+            cached = (
+                self.expressions,
+                None if None in resolvers else resolvers,
+            )
+            self._resolvers = cached
+            self._marked_evaluated = False
+        return cached[1]
+
+    def dependencies(self) -> frozenset:
+        return frozenset(arg for exp in self.expressions for arg in exp[1])
+
+    @classmethod
+    def from_parsed(
+        cls,
+        functions: Tuple[Function, ...] | FunctionFactory,
+        expressions: Iterable[Tuple[str, Tuple[str, ...], int]],
+    ) -> "ExpressionOperator":
+        """
+        Builds the operator from expressions already split by
+        'split_expression' into the function name, arguments and sign, e.g.
+        by 'sat_expander.Templates.ChainTemplate'. Only the functions are
+        looked up.
+        """
+        operator = cls(functions, ())
+        operator.expressions = tuple(
+            operator.resolve_expression(name, args, sign, f"{name}({','.join(args)})")
+            for name, args, sign in expressions
+        )
+        return operator
+
     def parse_expression(
         self, expression: str
     ) -> Tuple[Function, Tuple[str, ...], int]:
-        sign = 1
-        expression = expression.replace(" ", "")
-        if ("(" in expression) ^ (")" in expression):
-            raise ValueError(
-                f"Can't parse expression '{expression}'. It needs to follow the form 'f(x,y)' or 'x'."
-            )
-        if ")" in expression and not expression.endswith(")"):
-            raise ValueError(
-                f"Can't parse expression '{expression}'. It needs to follow the form 'f(x,y)' or 'x'."
-            )
-        if "(" in expression:
-            if expression.index("(") > expression.index(")"):
-                raise ValueError(
-                    f"Can't parse expression '{expression}'. It needs to follow the form 'f(x,y)' or 'x'."
-                )
-        if (
-            len(tuple(s for s in expression if s == "(")) > 1
-            or len(tuple(s for s in expression if s == ")")) > 1
-        ):
-            raise ValueError(
-                f"Can't parse expression '{expression}'. It needs to follow the form 'f(x,y)' or 'x'."
-            )
-        if "(" not in expression:
-            func_name, arguments, *overflow = expression, None, *[]
-        else:
-            func_name, arguments, *overflow = expression.split("(")
-        if overflow:
-            raise ValueError(
-                f"Can't parse expression '{expression}'. It needs to follow the form 'f(x,y)'."
-            )
-        args: Tuple[str] = () if arguments is None else tuple(arguments[:-1].split(","))
-        if func_name.startswith("-"):
-            func_name = func_name[1:]
-            sign = -1
-        func = next((x for x in self.functions if x.name == func_name), None)
+        func_name, args, sign = split_expression(expression)
+        return self.resolve_expression(func_name, args, sign, expression)
+
+    def resolve_expression(
+        self, func_name: str, args: Tuple[str, ...], sign: int, expression: str
+    ) -> Tuple[Function, Tuple[str, ...], int]:
+        func = self.functions_by_name.get(func_name)
         if func is None:
             raise ValueError(
                 f"The function '{func_name}' from expression '{expression}' is not given to the ExpressionOpeator."
@@ -235,4 +835,78 @@ class ExpressionOperator(LogicalOperator):
                 f"The function '{func_name}' needs '{func.arguments_len}' arguments but {len(args)} arguments were given from expression '{expression}'."
             )
         return (func, args, sign)
-        # ))
+
+
+def split_expression(expression: str) -> Tuple[str, Tuple[str, ...], int]:
+    """
+    Splits an expression like '-f(x,y)' into the function name, the arguments
+    and the sign, here ('f', ('x', 'y'), -1).
+    """
+    sign = 1
+    expression = expression.replace(" ", "")
+    if ("(" in expression) ^ (")" in expression):
+        raise ValueError(
+            f"Can't parse expression '{expression}'. It needs to follow the form 'f(x,y)' or 'x'."
+        )
+    if ")" in expression and not expression.endswith(")"):
+        raise ValueError(
+            f"Can't parse expression '{expression}'. It needs to follow the form 'f(x,y)' or 'x'."
+        )
+    if "(" in expression:
+        if expression.index("(") > expression.index(")"):
+            raise ValueError(
+                f"Can't parse expression '{expression}'. It needs to follow the form 'f(x,y)' or 'x'."
+            )
+    if (
+        len(tuple(s for s in expression if s == "(")) > 1
+        or len(tuple(s for s in expression if s == ")")) > 1
+    ):
+        raise ValueError(
+            f"Can't parse expression '{expression}'. It needs to follow the form 'f(x,y)' or 'x'."
+        )
+    if "(" not in expression:
+        func_name, arguments, *overflow = expression, None, *[]
+    else:
+        func_name, arguments, *overflow = expression.split("(")
+    if overflow:
+        raise ValueError(
+            f"Can't parse expression '{expression}'. It needs to follow the form 'f(x,y)'."
+        )
+    args: Tuple[str] = () if arguments is None else tuple(arguments[:-1].split(","))
+    if func_name.startswith("-"):
+        func_name = func_name[1:]
+        sign = -1
+    return (func_name, args, sign)
+
+
+class LiteralAccessor:
+    def __init__(self, function: Function, arguments: Tuple[str, ...], sign: int):
+        """
+        Literal of an expression resolved once. 'resolve' maps the variables
+        of the context to the literal: constants are folded into a fixed
+        integer and the variables of other functions are found with a single
+        lookup in their relation, which raises a 'KeyError' for missing
+        variables and values outside of the domain. 'resolve' is 'None' for
+        functions with an own 'evaluate'.
+        """
+        self.function: Function = function
+        self.arguments: Tuple[str, ...] = arguments
+        self.sign: int = sign
+        self.resolve: Callable[[Dict], int] | None = self._specialize()
+
+    def _specialize(self) -> Callable[[Dict], int] | None:
+        func, sign = self.function, self.sign
+        if isinstance(func, Constant):
+            literal = sign * func.value
+            return lambda vars: literal
+        if not evaluates_by_relation(func):
+            return None
+        # The relation is looked up on every call, since it can be replaced
+        # e.g. by 'set_commutative'.
+        if len(self.arguments) == 0:
+            return lambda vars: sign * func.relation[()]
+        if len(self.arguments) == 1:
+            (argument,) = self.arguments
+            return lambda vars: sign * func.relation[(vars[argument],)]
+        key = itemgetter(*self.arguments)
+        return lambda vars: sign * func.relation[key(vars)]
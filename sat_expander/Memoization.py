@@ -0,0 +1,67 @@
+from sat_expander.LogicalOperatorContext import LogicalOperatorContext
+from sat_expander.CNF import CNFLine
+
+from collections import OrderedDict
+from typing import Callable, Iterator, List, Tuple
+
+
+class SubchainCache:
+    def __init__(
+        self,
+        dependencies: Tuple[str, ...],
+        maxsize: int = 1024,
+        max_entry_size: int = 100_000,
+    ):
+        """
+        Least recently used cache for the lines of a sub-chain. The lines are
+        cached by the values of the variables the sub-chain depends on, so
+        the sub-chain is evaluated once for all values of the other variables.
+
+        Keyword arguments:
+        dependencies -- variables of the context the sub-chain depends on.
+        maxsize -- maximal number of cached results.
+        max_entry_size -- results with more lines aren't cached.
+        """
+        self.dependencies: Tuple[str, ...] = dependencies
+        self.maxsize: int = maxsize
+        self.max_entry_size: int = max_entry_size
+        self.entries: OrderedDict[Tuple, Tuple[CNFLine, ...]] = OrderedDict()
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def iter_clauses(
+        self,
+        context: LogicalOperatorContext,
+        compute: Callable[[LogicalOperatorContext], Iterator[CNFLine]],
+    ) -> Iterator[CNFLine]:
+        """
+        Yields the cached lines for the context or the lines of
+        'compute(context)' while caching them.
+        """
+        try:
+            key = tuple(context.vars[var] for var in self.dependencies)
+            cached = self.entries.get(key)
+        except (KeyError, TypeError):
+            # Missing or unhashable values. Keep the errors of the evaluation.
+            yield from compute(context)
+            return
+        if cached is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            yield from cached
+            return
+        self.misses += 1
+        lines: List[CNFLine] | None = []
+        for line in compute(context):
+            if lines is not None:
+                lines.append(line)
+                if len(lines) > self.max_entry_size:
+                    lines = None
+            yield line
+        if lines is not None:
+            self.entries[key] = tuple(lines)
+            while len(self.entries) > self.maxsize:
+                self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
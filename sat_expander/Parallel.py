@@ -0,0 +1,114 @@
+from sat_expander.LogicalOperator import AndOperator
+from sat_expander.LogicalOperatorContext import LogicalOperatorContext
+from sat_expander.CNF import CNFLine, CompactCNF
+from sat_expander.Statistics import Stats, instrumented_iter_clauses
+
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from copy import copy
+from typing import Iterator, Tuple
+import multiprocessing
+
+_operator: AndOperator | None = None
+_context: LogicalOperatorContext | None = None
+_record_stats: bool = False
+
+
+def parallel_iter_clauses(
+    operator: AndOperator,
+    context: LogicalOperatorContext | None,
+    workers: int,
+    chunk_size: int | None = None,
+    mp_context=None,
+    stats: Stats | None = None,
+) -> Iterator[CNFLine]:
+    """
+    Evaluates the chain starting at 'operator' in a pool of 'workers'
+    processes. The values of 'operator' are split into chunks of 'chunk_size'
+    consecutive values, which are evaluated by the workers. The lines are
+    yielded in the same order as in a sequential evaluation.
+
+    Every worker receives the chain, including the functions of the
+    'FunctionFactory' and the exclusion predicates, once when it starts. If the
+    'fork' start method is available (default on Linux), the workers inherit
+    the chain from this process and exclusion predicates can be any function,
+    including closures. With other start methods, e.g. 'spawn' on Windows and
+    macOS, the chain is pickled. Then the predicates must be picklable, i.e.
+    module level functions (also when decorated with
+    'check_variables_in_context') or the 'Predicate' objects built by
+    'sat_expander.ExclusionPredicates', if the functions combined into them
+    with '&' are picklable.
+
+    The functions are evaluated by copies in the workers, so they are marked
+    as evaluated in this process once the first lines arrive. Afterwards
+    their variables can't be changed, like after a sequential evaluation.
+
+    Chains allocating variables while they are evaluated, see
+    'LogicalOperator.allocates_variables', are rejected with a 'ValueError'.
+
+    If 'stats' is given, every worker records the statistics of its chunks,
+    which are merged into 'stats'. Its hooks are only called in this process.
+    """
+    if operator.allocates_variables():
+        raise ValueError(
+            "The chain allocates variables while it is evaluated, e.g. for a cardinality operator, so it can't be evaluated with 'workers'. The workers would allocate the same variables independently."
+        )
+    if context is None:
+        context = LogicalOperatorContext.empty()
+    if mp_context is None and "fork" in multiprocessing.get_all_start_methods():
+        mp_context = multiprocessing.get_context("fork")
+    n = len(operator.values)
+    if chunk_size is None:
+        chunk_size = max(1, -(-n // (4 * workers)))
+    bounds = deque((i, min(i + chunk_size, n)) for i in range(0, n, chunk_size))
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=mp_context,
+        initializer=_initialize,
+        initargs=(operator, context, stats is not None),
+    ) as pool:
+        # Only a few chunks are submitted ahead to bound the memory of results.
+        pending = deque()
+        marked = False
+        while bounds or pending:
+            while bounds and len(pending) < 2 * workers:
+                pending.append(pool.submit(_evaluate_chunk, bounds.popleft()))
+            cnf, chunk_stats = pending.popleft().result()
+            if stats is not None:
+                stats.merge(chunk_stats)
+            if len(cnf) and not marked:
+                _mark_evaluated(operator)
+                marked = True
+            yield from cnf
+
+
+def _mark_evaluated(operator: AndOperator):
+    while operator.suboperator is not None:
+        operator = operator.suboperator
+    for func, _, _ in getattr(operator, "expressions", ()):
+        func.was_evaluated = True
+
+
+def _initialize(
+    operator: AndOperator, context: LogicalOperatorContext, record_stats: bool
+):
+    global _operator, _context, _record_stats
+    _operator = operator
+    _context = context
+    _record_stats = record_stats
+
+
+def _evaluate_chunk(bounds: Tuple[int, int]) -> Tuple[CompactCNF, Stats | None]:
+    chunk = copy(_operator)
+    chunk.values = _operator.values[bounds[0] : bounds[1]]
+    if _operator.kernel is not None:
+        # The kernel of the operator is built over all of its values.
+        from sat_expander.Vectorized import VectorKernel
+
+        chunk.kernel = VectorKernel(chunk)
+    if not _record_stats:
+        return chunk.emit(CompactCNF(), _context), None
+    stats = Stats()
+    cnf = CompactCNF()
+    cnf.extend(instrumented_iter_clauses(chunk, _context, stats))
+    return cnf, stats
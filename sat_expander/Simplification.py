@@ -0,0 +1,138 @@
+from sat_expander.CNF import CNFLine
+
+from typing import Iterable, Iterator, Set, Tuple
+from array import array
+from tempfile import mkstemp
+import os
+import sqlite3
+
+
+class ClauseSimplifier:
+    def __init__(
+        self,
+        drop_tautologies: bool = True,
+        remove_duplicate_literals: bool = True,
+        deduplicate: bool = True,
+        max_memory_clauses: int = 1_000_000,
+        spill_directory: str | None = None,
+    ):
+        """
+        Simplifies a stream of lines of a CNF, e.g. between an operator and
+        'write_dimacs'. The lines keep their order and the literals in a line
+        keep the order of their first occurrence.
+
+        Keyword arguments:
+        drop_tautologies -- drops lines containing a literal and its negation.
+        remove_duplicate_literals -- keeps only the first occurrence of a
+            literal in a line.
+        deduplicate -- drops lines containing the same literals as an earlier
+            line, in any order.
+        max_memory_clauses -- number of seen lines kept in memory for
+            'deduplicate'. If more lines are seen, they are moved to a
+            temporary database on disk.
+        spill_directory -- directory of the temporary database.
+        """
+        self.drop_tautologies: bool = drop_tautologies
+        self.remove_duplicate_literals: bool = remove_duplicate_literals
+        self.deduplicate: bool = deduplicate
+        self.max_memory_clauses: int = max_memory_clauses
+        self.spill_directory: str | None = spill_directory
+        self.dropped_tautologies: int = 0
+        self.removed_literals: int = 0
+        self.dropped_duplicates: int = 0
+
+    def __call__(self, clauses: Iterable[CNFLine]) -> Iterator[CNFLine]:
+        seen = (
+            _SeenClauses(self.max_memory_clauses, self.spill_directory)
+            if self.deduplicate
+            else None
+        )
+        try:
+            for clause in clauses:
+                literals = dict.fromkeys(clause)
+                if self.drop_tautologies and any(-x in literals for x in literals):
+                    self.dropped_tautologies += 1
+                    continue
+                if seen is not None and not seen.add(
+                    tuple(sorted(literals))
+                    if self.remove_duplicate_literals
+                    else tuple(sorted(clause))
+                ):
+                    self.dropped_duplicates += 1
+                    continue
+                if self.remove_duplicate_literals and len(literals) != len(clause):
+                    self.removed_literals += len(clause) - len(literals)
+                    clause = tuple(literals)
+                yield clause
+        finally:
+            if seen is not None:
+                seen.close()
+
+
+def simplify(clauses: Iterable[CNFLine], **kwargs) -> Iterator[CNFLine]:
+    """
+    Simplifies the lines of a CNF. See 'ClauseSimplifier' for the arguments.
+    """
+    return ClauseSimplifier(**kwargs)(clauses)
+
+
+class _SeenClauses:
+    def __init__(self, max_memory_clauses: int, spill_directory: str | None):
+        """
+        Set of lines, which moves its content to an SQLite database on disk
+        once it contains more than 'max_memory_clauses' lines.
+        """
+        self.max_memory_clauses: int = max_memory_clauses
+        self.spill_directory: str | None = spill_directory
+        self.memory: Set[Tuple[int, ...]] = set()
+        self.database: sqlite3.Connection | None = None
+        self.path: str | None = None
+
+    def add(self, clause: Tuple[int, ...]) -> bool:
+        """
+        Adds the line and returns if it wasn't seen before.
+        """
+        if clause in self.memory:
+            return False
+        if self.database is not None and self._on_disk(clause):
+            return False
+        self.memory.add(clause)
+        if len(self.memory) > self.max_memory_clauses:
+            self._spill()
+        return True
+
+    def _on_disk(self, clause: Tuple[int, ...]) -> bool:
+        return (
+            self.database.execute(
+                "SELECT 1 FROM clauses WHERE clause = ?", (_to_blob(clause),)
+            ).fetchone()
+            is not None
+        )
+
+    def _spill(self):
+        if self.database is None:
+            descriptor, self.path = mkstemp(suffix=".sqlite", dir=self.spill_directory)
+            os.close(descriptor)
+            self.database = sqlite3.connect(self.path)
+            self.database.execute("PRAGMA journal_mode = OFF")
+            self.database.execute("PRAGMA synchronous = OFF")
+            self.database.execute(
+                "CREATE TABLE clauses (clause BLOB PRIMARY KEY) WITHOUT ROWID"
+            )
+        self.database.executemany(
+            "INSERT INTO clauses VALUES (?)",
+            ((_to_blob(clause),) for clause in self.memory),
+        )
+        self.database.commit()
+        self.memory.clear()
+
+    def close(self):
+        self.memory.clear()
+        if self.database is not None:
+            self.database.close()
+            os.remove(self.path)
+            self.database = None
+
+
+def _to_blob(clause: Tuple[int, ...]) -> bytes:
+    return array("q", clause).tobytes()
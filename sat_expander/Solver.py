@@ -0,0 +1,213 @@
+from sat_expander.CNF import (
+    CNFLine,
+    DIMACS_BUFFER_SIZE,
+    DIMACS_HEADER,
+    check_allocated_variables,
+    compressed_stream,
+    dimacs_compression,
+    dimacs_parameters,
+    number_of_variables,
+    write_clauses,
+)
+from sat_expander.Functions import FunctionFactory
+
+from array import array
+from dataclasses import dataclass, field
+from os import PathLike
+from threading import Thread
+from typing import Callable, Iterable, List, Sequence, Sized, Tuple
+import subprocess
+
+# Exit codes of SAT solvers following the SAT competition conventions.
+SOLVER_EXIT_CODES = {10: "SATISFIABLE", 20: "UNSATISFIABLE"}
+
+
+@dataclass
+class SolverResult:
+    """
+    Result of a solver run. 'model' contains the signed literals of the 'v'
+    lines, 'comments' the 'c' lines of the output.
+    """
+
+    status: str
+    model: array
+    returncode: int
+    comments: List[str] = field(default_factory=list)
+
+    @property
+    def satisfiable(self) -> bool | None:
+        if self.status == "SATISFIABLE":
+            return True
+        if self.status == "UNSATISFIABLE":
+            return False
+        return None
+
+
+class SolverPipe:
+    def __init__(
+        self,
+        command: Sequence[str],
+        factory: FunctionFactory | None = None,
+        header: str | None = None,
+        buffer_size: int = DIMACS_BUFFER_SIZE,
+        timeout: float | None = None,
+    ):
+        """
+        Streams clauses in the DIMACS format into the standard input of a
+        solver while they are generated and parses the 's' and 'v' lines of
+        its output. Nothing is written to disk.
+
+        Keyword arguments:
+        command -- command starting the solver reading DIMACS from its standard
+            input, e.g. ('kissat', '-q') or ('minisat', '-verb=0', '/dev/stdin').
+        factory -- 'FunctionFactory' used to build the clauses. Its
+            'variable_counter' gives the number of variables.
+        buffer_size -- number of characters collected before writing to the
+            solver. Writing blocks while the solver doesn't read its input, so
+            at most this many characters are buffered.
+        timeout -- seconds to wait for the solver after all clauses are
+            written. Afterwards the solver is killed and
+            'subprocess.TimeoutExpired' is raised.
+        """
+        self.command: Sequence[str] = command
+        self.factory: FunctionFactory | None = factory
+        self.header: str = DIMACS_HEADER if header is None else header
+        self.buffer_size: int = buffer_size
+        self.timeout: float | None = timeout
+
+    def solve(
+        self,
+        clauses: Iterable[CNFLine] | Callable[[], Iterable[CNFLine]],
+        num_clauses: int | None = None,
+    ) -> SolverResult:
+        """
+        Runs the solver on the clauses. The 'p cnf' line is written first, so
+        the number of clauses must be known beforehand. It is taken from
+        'num_clauses' or from 'clauses', if it is a sized collection.
+        Otherwise, 'clauses' must be a function returning the clauses, e.g.
+        'and_op.iter_clauses', which is then called twice: once to count the
+        clauses and once to stream them into the solver. Both calls must give
+        the same lines. Chains allocating variables while they are evaluated,
+        e.g. with cardinality operators, allocate them in the counting pass
+        and reuse them in the second one, see
+        'LogicalOperator.variable_allocator'. If such a chain isn't evaluated
+        before and 'num_clauses' is given, the variables are allocated after
+        the 'p cnf' line was written and a 'RuntimeError' is raised.
+        """
+        generate = clauses if callable(clauses) else lambda: clauses
+        num_variables = None if self.factory is None else 0
+        if num_clauses is None or num_variables is None:
+            if not callable(clauses) and not isinstance(clauses, Sized):
+                if num_clauses is None:
+                    raise ValueError(
+                        "The number of clauses must be given, if the clauses are an iterator. Pass a function returning the clauses for a counting pass."
+                    )
+                raise ValueError(
+                    "Without a factory the number of variables must be counted, so the clauses can't be an iterator. Pass a function returning the clauses for a counting pass."
+                )
+            num_clauses, num_variables = _count(generate(), num_clauses)
+        num_variables = number_of_variables(self.factory, num_variables)
+
+        process = subprocess.Popen(
+            self.command, stdin=subprocess.PIPE, stdout=subprocess.PIPE
+        )
+        # The output is read concurrently, so a solver writing while the
+        # clauses are written never blocks.
+        output: List[bytes] = []
+        reader = Thread(target=lambda: output.extend(process.stdout), daemon=True)
+        reader.start()
+        try:
+            try:
+                process.stdin.write(
+                    (
+                        self.header + dimacs_parameters(num_variables, num_clauses)
+                    ).encode()
+                )
+                written, _ = write_clauses(
+                    process.stdin, generate(), str.encode, self.buffer_size, False
+                )
+                process.stdin.close()
+            except BrokenPipeError:
+                # The solver stopped reading, e.g. because of an error.
+                written = None
+                _close_quietly(process.stdin)
+            returncode = process.wait(self.timeout)
+        finally:
+            if process.poll() is None:
+                process.kill()
+                process.wait()
+            reader.join()
+            process.stdout.close()
+        if written is not None and written != num_clauses:
+            raise RuntimeError(
+                f"Expected '{num_clauses}' clauses, but '{written}' clauses were written."
+            )
+        check_allocated_variables(self.factory, num_variables)
+        status, model, comments = parse_solver_output(output)
+        if status is None:
+            status = SOLVER_EXIT_CODES.get(returncode, "UNKNOWN")
+        return SolverResult(status, model, returncode, comments)
+
+
+def parse_solver_output(
+    lines: Iterable[bytes | str],
+) -> Tuple[str | None, array, List[str]]:
+    """
+    Parses the output of a solver in the SAT competition format. Returns the
+    status of the 's' line, the signed literals of the 'v' lines and the 'c'
+    lines.
+    """
+    status = None
+    model = array("i")
+    comments = []
+    for line in lines:
+        head = line[:1]
+        if head == b"v" or head == "v":
+            # 'int' also parses bytes, so the 'v' lines aren't decoded.
+            model.extend(map(int, line[1:].split()))
+            continue
+        if isinstance(line, bytes):
+            line = line.decode()
+        if head in (b"s", "s"):
+            status = line[1:].strip()
+        elif head in (b"c", "c"):
+            comments.append(line.rstrip("\n"))
+    if 0 in model:
+        # The last 'v' line ends with '0'.
+        model = array("i", filter(None, model))
+    return status, model, comments
+
+
+def read_solver_output(path: str | PathLike) -> SolverResult:
+    """
+    Reads the output of a solver saved to a file, e.g. by
+    'kissat formula.cnf > model.txt'. Files ending with '.gz', '.bz2' or
+    '.xz' are decompressed. The file can also contain only the 'v' lines.
+    The return code is unknown and set to '0'.
+    """
+    compression = dimacs_compression(path)
+    stream = (
+        open(path, "rb")
+        if compression is None
+        else compressed_stream(compression, path, "rb")
+    )
+    with stream:
+        status, model, comments = parse_solver_output(stream)
+    return SolverResult(status or "UNKNOWN", model, 0, comments)
+
+
+def _close_quietly(stream):
+    try:
+        stream.close()
+    except BrokenPipeError:
+        pass
+
+
+def _count(clauses: Iterable[CNFLine], num_clauses: int | None) -> Tuple[int, int]:
+    counted = 0
+    max_variable = 0
+    for line in clauses:
+        counted += 1
+        if line:
+            max_variable = max(max_variable, max(map(abs, line)))
+    return (counted if num_clauses is None else num_clauses), max_variable
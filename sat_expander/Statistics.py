@@ -0,0 +1,255 @@
+from sat_expander.LogicalOperator import LogicalOperator, LogicalOperatorType
+from sat_expander.LogicalOperatorContext import LogicalOperatorContext
+from sat_expander.CNF import CNFLine
+
+from dataclasses import dataclass
+from time import perf_counter
+from typing import Iterable, Iterator, List
+
+
+@dataclass
+class OperatorStats:
+    """
+    Statistics of the operator at 'depth' in the chain. 'seconds' is the
+    cumulative wall time spent in the operator including its suboperators.
+    """
+
+    depth: int
+    operator: str
+    values: int = 0
+    predicate_calls: int = 0
+    rejections: int = 0
+    clauses: int = 0
+    literals: int = 0
+    seconds: float = 0.0
+
+    def merge(self, other: "OperatorStats"):
+        self.values += other.values
+        self.predicate_calls += other.predicate_calls
+        self.rejections += other.rejections
+        self.clauses += other.clauses
+        self.literals += other.literals
+        self.seconds += other.seconds
+
+
+class EvaluationHook:
+    """
+    Hook for external profilers. Every time an operator is evaluated in a
+    context, 'operator_entered' is called before its first line and
+    'operator_exited' after its last line with the time spent in the operator.
+    """
+
+    def operator_entered(
+        self, depth: int, operator: LogicalOperator, context: LogicalOperatorContext
+    ):
+        pass
+
+    def operator_exited(
+        self,
+        depth: int,
+        operator: LogicalOperator,
+        context: LogicalOperatorContext,
+        seconds: float,
+    ):
+        pass
+
+
+class Stats:
+    def __init__(self, hooks: Iterable[EvaluationHook] = ()):
+        """
+        Collects the statistics of an evaluation, e.g.
+        'and_op.evaluate(stats=Stats())'. The statistics are recorded per
+        depth in the chain, so evaluating several chains with the same 'Stats'
+        adds up the operators at the same depth.
+
+        Keyword arguments:
+        hooks -- 'EvaluationHook's called for every evaluated operator.
+        """
+        self.operators: List[OperatorStats] = []
+        self.hooks: List[EvaluationHook] = list(hooks)
+
+    def __getitem__(self, depth: int) -> OperatorStats:
+        return self.operators[depth]
+
+    def __len__(self) -> int:
+        return len(self.operators)
+
+    def record(self, depth: int, operator: LogicalOperator) -> OperatorStats:
+        while len(self.operators) <= depth:
+            self.operators.append(OperatorStats(len(self.operators), ""))
+        record = self.operators[depth]
+        if not record.operator:
+            record.operator = _describe(operator)
+        return record
+
+    def merge(self, other: "Stats"):
+        """
+        Adds the statistics of 'other', e.g. of a worker process.
+        """
+        for record in other.operators:
+            self.record(record.depth, None).merge(record)
+            if not self.operators[record.depth].operator:
+                self.operators[record.depth].operator = record.operator
+
+    def __getstate__(self):
+        # Hooks stay in the process they were registered in.
+        return {"operators": self.operators, "hooks": []}
+
+    def report(self) -> str:
+        """
+        Returns a table of the statistics. 'self' is the time spent in the
+        operator without its suboperators.
+        """
+        lines = [
+            f"{'depth':>5} {'operator':<24} {'values':>10} {'pred calls':>10} "
+            f"{'rejected':>10} {'clauses':>10} {'literals':>10} {'time':>9} {'self':>9}"
+        ]
+        for record, sub in zip(self.operators, self.operators[1:] + [None]):
+            own = record.seconds - (sub.seconds if sub is not None else 0.0)
+            lines.append(
+                f"{record.depth:>5} {record.operator:<24} {record.values:>10} "
+                f"{record.predicate_calls:>10} {record.rejections:>10} "
+                f"{record.clauses:>10} {record.literals:>10} "
+                f"{record.seconds:>8.3f}s {own:>8.3f}s"
+            )
+        return "\n".join(lines)
+
+
+def instrumented_iter_clauses(
+    operator: LogicalOperator,
+    context: LogicalOperatorContext,
+    stats: Stats,
+    depth: int = 0,
+) -> Iterator[CNFLine]:
+    """
+    Yields the same lines as 'operator.iter_clauses(context)' while recording
+    the statistics of every operator of the chain in 'stats'.
+    """
+    record = stats.record(depth, operator)
+    lines = _instrumented(operator, context, stats, depth, record)
+    return _timed(lines, operator, context, stats, depth, record)
+
+
+def _instrumented(
+    operator: LogicalOperator,
+    context: LogicalOperatorContext,
+    stats: Stats,
+    depth: int,
+    record: OperatorStats,
+) -> Iterator[CNFLine]:
+    if (
+        operator.operator_type == LogicalOperatorType.EXPRESSION
+        or operator.suboperator is None
+        or getattr(operator, "kernel", None) is not None
+    ):
+        lines = operator.iter_clauses(context)
+    elif operator.operator_type == LogicalOperatorType.ALL:
+        lines = (
+            line
+            for current_context in _iter_contexts(operator, context, record)
+            for line in _suboperator_clauses(operator, current_context, stats, depth)
+        )
+    elif operator.operator_type == LogicalOperatorType.EXISTS:
+        lines = _or_clauses(operator, context, stats, depth, record)
+    else:
+        lines = operator.encode(
+            [
+                operator.single_literal(
+                    tuple(_suboperator_clauses(operator, current_context, stats, depth))
+                )
+                for current_context in _iter_contexts(operator, context, record)
+            ],
+            context,
+        )
+    for line in lines:
+        record.clauses += 1
+        record.literals += len(line)
+        yield line
+
+
+def _or_clauses(
+    operator: LogicalOperator,
+    context: LogicalOperatorContext,
+    stats: Stats,
+    depth: int,
+    record: OperatorStats,
+) -> Iterator[CNFLine]:
+    return operator.disjunction(
+        (
+            current_context,
+            tuple(_suboperator_clauses(operator, current_context, stats, depth)),
+        )
+        for current_context in _iter_contexts(operator, context, record)
+    )
+
+
+def _iter_contexts(
+    operator: LogicalOperator,
+    context: LogicalOperatorContext,
+    record: OperatorStats,
+) -> Iterator[LogicalOperatorContext]:
+    candidates, satisfied = operator.candidate_values(context)
+    predicate = None if satisfied else operator.exclude_predicate
+    for values in candidates:
+        record.values += 1
+        current_context = operator.bind(context, values)
+        if predicate is not None:
+            record.predicate_calls += 1
+            if not predicate(current_context, values):
+                record.rejections += 1
+                continue
+        yield current_context
+
+
+def _suboperator_clauses(
+    operator: LogicalOperator,
+    context: LogicalOperatorContext,
+    stats: Stats,
+    depth: int,
+) -> Iterator[CNFLine]:
+    suboperator = operator.suboperator
+
+    def compute(context: LogicalOperatorContext) -> Iterator[CNFLine]:
+        return instrumented_iter_clauses(suboperator, context, stats, depth + 1)
+
+    memo = getattr(suboperator, "memo", None)
+    if memo is None:
+        return compute(context)
+    return memo.iter_clauses(context, compute)
+
+
+def _timed(
+    lines: Iterator[CNFLine],
+    operator: LogicalOperator,
+    context: LogicalOperatorContext,
+    stats: Stats,
+    depth: int,
+    record: OperatorStats,
+) -> Iterator[CNFLine]:
+    for hook in stats.hooks:
+        hook.operator_entered(depth, operator, context)
+    # Only the time spent producing the lines is counted, not the consumer.
+    seconds = 0.0
+    try:
+        while True:
+            start = perf_counter()
+            try:
+                line = next(lines)
+            except StopIteration:
+                return
+            finally:
+                seconds += perf_counter() - start
+            yield line
+    finally:
+        record.seconds += seconds
+        for hook in stats.hooks:
+            hook.operator_exited(depth, operator, context, seconds)
+
+
+def _describe(operator: LogicalOperator | None) -> str:
+    if operator is None:
+        return ""
+    variables = operator.variables
+    if variables is None:
+        return type(operator).__name__
+    return f"{type(operator).__name__}({', '.join(variables)})"
@@ -0,0 +1,301 @@
+from sat_expander.CNF import CNF, CNFLine
+from sat_expander.Functions import FunctionFactory
+from sat_expander.LogicalOperator import (
+    ExpressionOperator,
+    LogicalOperator,
+    split_expression,
+)
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Tuple, TypeVar
+import multiprocessing
+
+R = TypeVar("R")  # Result of the function mapped over the instances
+
+FACTORY_PARAMETER = "factory"
+
+
+@dataclass(frozen=True)
+class Parameter:
+    """
+    Placeholder in a 'ChainTemplate' for the value given by 'name' to
+    'instantiate'. 'transform' is applied once per instance, e.g.
+    'to_tuple_iter', also if the parameter is used several times.
+    """
+
+    name: str
+    transform: Callable[[Any], Any] | None = None
+
+
+# The 'FunctionFactory' of the instance, e.g. for the auxiliary variables of
+# cardinality operators.
+FACTORY = Parameter(FACTORY_PARAMETER)
+
+
+class OperatorTemplate:
+    def __init__(self, operator_class: type, *args, **kwargs):
+        """
+        Operator of a 'ChainTemplate'. The operator is built with
+        'operator_class(*args, **kwargs)', where every 'Parameter' is
+        replaced by its value. The first argument are the variables of the
+        operator.
+        """
+        self.operator_class: type = operator_class
+        self.args: Tuple = args
+        self.kwargs: Dict[str, Any] = kwargs
+
+    @property
+    def variables(self) -> Tuple[str, ...]:
+        return self.args[0] if self.args else self.kwargs["variables"]
+
+    def parameters(self) -> Iterator[Parameter]:
+        for value in (*self.args, *self.kwargs.values()):
+            if isinstance(value, Parameter):
+                yield value
+
+    def build(self, resolve: Callable[[Any], Any]) -> LogicalOperator:
+        return self.operator_class(
+            *map(resolve, self.args),
+            **{key: resolve(value) for key, value in self.kwargs.items()},
+        )
+
+
+@dataclass
+class ChainInstance:
+    factory: FunctionFactory
+    chains: Tuple[LogicalOperator, ...]
+    parameters: Dict[str, Any] = field(default_factory=dict)
+
+    def iter_clauses(self) -> Iterator[CNFLine]:
+        """
+        Yields the lines of all chains in the order they were added to the
+        template.
+        """
+        for chain in self.chains:
+            yield from chain.iter_clauses()
+
+    def evaluate(self) -> CNF:
+        return tuple(self.iter_clauses())
+
+
+class ChainTemplate:
+    def __init__(self):
+        """
+        Describes the functions and chains of an encoding once with the
+        domains and values as 'Parameter's. 'instantiate' builds the
+        'FunctionFactory' and the chains for given values, where the
+        expressions are already parsed and the chains validated.
+
+            template = ChainTemplate().function("p", 2, Parameter("E"))
+            template.chain(
+                OperatorTemplate(AndOperator, ("v",), Parameter("V", to_tuple_iter)),
+                OperatorTemplate(OrOperator, ("u", "w"), Parameter("E"), in_edge),
+                expressions=("p(u,w)",),
+            )
+            instance = template.instantiate(V=V, E=E)
+        """
+        self.functions: List[Tuple[str, int, Any, bool]] = []
+        self.constants: List[str] = []
+        self.chains: List[
+            Tuple[Tuple[OperatorTemplate, ...], Tuple[Tuple[str, Tuple, int], ...]]
+        ] = []
+
+    @property
+    def parameters(self) -> frozenset:
+        """
+        Names of the parameters which must be given to 'instantiate'.
+        """
+        names = {
+            domain.name
+            for _, _, domain, _ in self.functions
+            if isinstance(domain, Parameter)
+        }
+        for operators, _ in self.chains:
+            for operator in operators:
+                names.update(parameter.name for parameter in operator.parameters())
+        return frozenset(names - {FACTORY_PARAMETER})
+
+    def function(
+        self,
+        name: str,
+        arguments_len: int,
+        domain: Iterable | Parameter,
+        commutative: bool = False,
+    ) -> "ChainTemplate":
+        """
+        Adds a function built by 'FunctionFactory.build' for every instance.
+        """
+        self._assert_unique_name(name)
+        self.functions.append((name, arguments_len, domain, commutative))
+        return self
+
+    def constant(self, name: str) -> "ChainTemplate":
+        """
+        Adds a constant built by 'FunctionFactory.add_constant' for every
+        instance.
+        """
+        self._assert_unique_name(name)
+        self.constants.append(name)
+        return self
+
+    def _assert_unique_name(self, name: str):
+        if name in self.constants or name in (f[0] for f in self.functions):
+            raise ValueError(f"The function with the name '{name}' is already defined.")
+
+    def chain(
+        self, *operators: OperatorTemplate, expressions: Iterable[str]
+    ) -> "ChainTemplate":
+        """
+        Adds a chain of the operators ending with an 'ExpressionOperator' of
+        'expressions'. The expressions are parsed and checked against the
+        functions of the template and the variables of the operators. The
+        chaining of the operators is checked as well.
+        """
+        arities = {name: arguments_len for name, arguments_len, _, _ in self.functions}
+        arities.update((name, 0) for name in self.constants)
+        bound = {var for operator in operators for var in operator.variables}
+        parsed = []
+        for expression in expressions:
+            name, args, sign = split_expression(expression)
+            if name not in arities:
+                raise ValueError(
+                    f"The function '{name}' from expression '{expression}' is not defined in the template."
+                )
+            if arities[name] != len(args):
+                raise ValueError(
+                    f"The function '{name}' needs '{arities[name]}' arguments but {len(args)} arguments were given from expression '{expression}'."
+                )
+            unbound = set(args) - bound
+            if unbound:
+                raise ValueError(
+                    f"The arguments {sorted(unbound)} of expression '{expression}' aren't variables of the operators."
+                )
+            parsed.append((name, args, sign))
+        # Chain the operators without values to check their order once.
+        placeholder_factory = FunctionFactory()
+
+        def placeholder(value):
+            if not isinstance(value, Parameter):
+                return value
+            return placeholder_factory if value.name == FACTORY_PARAMETER else ()
+
+        _link(
+            [operator.build(placeholder) for operator in operators]
+            + [ExpressionOperator((), ())]
+        )
+        self.chains.append((tuple(operators), tuple(parsed)))
+        return self
+
+    def instantiate(self, **parameters) -> ChainInstance:
+        """
+        Builds the functions and chains with the values of the parameters.
+        Values which are tuples are used by the operators without copying and
+        iterators are collected into tuples. Other values, e.g. the 'k' of
+        'AtMostK', are passed as they are.
+        """
+        missing = self.parameters - parameters.keys()
+        if missing:
+            raise ValueError(f"The parameters {sorted(missing)} are missing.")
+        unknown = parameters.keys() - self.parameters
+        if unknown:
+            raise ValueError(
+                f"The parameters {sorted(unknown)} aren't used by the template."
+            )
+        factory = FunctionFactory()
+        values: Dict[Parameter, Any] = {}
+
+        def resolve(value):
+            if not isinstance(value, Parameter):
+                return value
+            if value.name == FACTORY_PARAMETER:
+                return factory
+            if value not in values:
+                resolved = parameters[value.name]
+                if value.transform is not None:
+                    resolved = value.transform(resolved)
+                if isinstance(resolved, Iterator):
+                    # Iterators can only be used once.
+                    resolved = tuple(resolved)
+                values[value] = resolved
+            return values[value]
+
+        for name, arguments_len, domain, commutative in self.functions:
+            factory.build(name, arguments_len, resolve(domain), commutative)
+        for name in self.constants:
+            factory.add_constant(name)
+        chains = tuple(
+            _link(
+                [operator.build(resolve) for operator in operators]
+                + [ExpressionOperator.from_parsed(factory, expressions)]
+            )
+            for operators, expressions in self.chains
+        )
+        return ChainInstance(factory, chains, parameters)
+
+    def instances(
+        self, parameter_sets: Iterable[Dict[str, Any]]
+    ) -> Iterator[ChainInstance]:
+        for parameters in parameter_sets:
+            yield self.instantiate(**parameters)
+
+    def map(
+        self,
+        function: Callable[[ChainInstance], R],
+        parameter_sets: Iterable[Dict[str, Any]],
+        workers: int | None = None,
+        mp_context=None,
+    ) -> Iterator[R]:
+        """
+        Yields 'function(instance)' for the instance of every parameter set,
+        e.g. writing its DIMACS file, in the order of the parameter sets.
+
+        With 'workers', the instances are built and processed in a pool of
+        processes. The template and 'function' are given to every worker
+        once, like the chain in 'sat_expander.Parallel'. So with start
+        methods other than 'fork', they must be picklable. The parameter
+        sets and results are always pickled.
+        """
+        if workers is None or workers <= 1:
+            for instance in self.instances(parameter_sets):
+                yield function(instance)
+            return
+        if mp_context is None and "fork" in multiprocessing.get_all_start_methods():
+            mp_context = multiprocessing.get_context("fork")
+        parameter_sets = iter(parameter_sets)
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=mp_context,
+            initializer=_initialize,
+            initargs=(self, function),
+        ) as pool:
+            # Only a few instances are submitted ahead to bound the memory of
+            # results.
+            pending = deque()
+            for parameters in parameter_sets:
+                pending.append(pool.submit(_run, parameters))
+                if len(pending) >= 2 * workers:
+                    yield pending.popleft().result()
+            while pending:
+                yield pending.popleft().result()
+
+
+def _link(operators: List[LogicalOperator]) -> LogicalOperator:
+    for operator, suboperator in zip(operators, operators[1:]):
+        operator.add_suboperator(suboperator)
+    return operators[0]
+
+
+_template: ChainTemplate | None = None
+_function: Callable[[ChainInstance], Any] | None = None
+
+
+def _initialize(template: ChainTemplate, function: Callable[[ChainInstance], Any]):
+    global _template, _function
+    _template = template
+    _function = function
+
+
+def _run(parameters: Dict[str, Any]) -> Any:
+    return _function(_template.instantiate(**parameters))
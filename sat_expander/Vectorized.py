@@ -0,0 +1,147 @@
+from sat_expander.LogicalOperator import (
+    LogicalOperator,
+    AndOperator,
+    OrOperator,
+    ExpressionOperator,
+)
+from sat_expander.LogicalOperatorContext import LogicalOperatorContext
+from sat_expander.Functions import Constant, evaluates_by_relation
+from sat_expander.CNF import CNFLine
+
+from typing import Iterator, List, Tuple
+
+try:
+    import numpy
+except ImportError:  # pragma: no cover
+    numpy = None
+
+
+class VectorKernel:
+    def __init__(self, operator: AndOperator | OrOperator):
+        """
+        Evaluates an 'AndOperator' or 'OrOperator' followed by an
+        'ExpressionOperator' for all its values at once. The values are
+        translated once into index arrays of the functions' 'index_table', so
+        every literal of the expression is computed for all values with one
+        NumPy indexing operation.
+
+        The operator can't have an exclusion predicate. Variables of the
+        expression not bound by the operator are taken from the context.
+        """
+        if numpy is None:
+            raise ImportError("Vectorized evaluation requires NumPy to be installed.")
+        if not isinstance(operator, (AndOperator, OrOperator)):
+            raise ValueError(
+                f"The operator '{type(operator).__name__}' can't be vectorized."
+            )
+        if operator.exclude_predicate is not None:
+            raise ValueError(
+                "Operators with an exclusion predicate can't be vectorized."
+            )
+        if not isinstance(operator.suboperator, ExpressionOperator):
+            raise ValueError(
+                "Only operators followed by an ExpressionOperator can be vectorized."
+            )
+        self.operator: AndOperator | OrOperator = operator
+        self.expression: ExpressionOperator = operator.suboperator
+        values = operator.values
+        for value in values:
+            if len(value) != len(operator.variables):
+                raise RuntimeError(
+                    f"The length of values '{value}' for the variables '{operator.variables}' don't have a matching length."
+                )
+        self.literals: List[Tuple] = []
+        for func, args, sign in self.expression.expressions:
+            if isinstance(func, Constant):
+                self.literals.append((None, sign * func.value, None))
+                continue
+            if not evaluates_by_relation(func):
+                raise ValueError(f"The function '{func.name}' can't be vectorized.")
+            index_table = func.index_table()
+            if index_table is None:
+                raise ValueError(
+                    f"The domain of function '{func.name}' is too sparse to be vectorized."
+                )
+            axes, table = index_table
+            indices = []
+            for axis, arg in zip(axes, args):
+                if arg in operator.variables:
+                    position = operator.variables.index(arg)
+                    indices.append(
+                        numpy.fromiter(
+                            (axis.get(value[position], -1) for value in values),
+                            dtype=numpy.int64,
+                            count=len(values),
+                        )
+                    )
+                else:
+                    indices.append(arg)
+            self.literals.append((table, sign, (axes, indices)))
+
+    def block(self, context: LogicalOperatorContext) -> "numpy.ndarray":
+        """
+        Returns an array with a row of literals for every value of the operator.
+        """
+        n = len(self.operator.values)
+        columns = []
+        for table, sign, indexing in self.literals:
+            if table is None:
+                columns.append(numpy.full(n, sign, dtype=numpy.int64))
+                continue
+            axes, indices = indexing
+            resolved = []
+            for axis, index in zip(axes, indices):
+                if isinstance(index, str):
+                    resolved.append(axis.get(context.getArgument(index), -1))
+                else:
+                    resolved.append(index)
+            missing = numpy.zeros(n, dtype=bool)
+            for index in resolved:
+                missing |= numpy.asarray(index) < 0
+            safe = tuple(numpy.where(missing, 0, index) for index in resolved)
+            variables = table[safe] if safe else numpy.full(n, table[()])
+            missing |= variables < 0
+            if missing.any():
+                self._raise_domain_error(context, int(numpy.argmax(missing)))
+            columns.append(sign * variables)
+        if not columns:
+            return numpy.zeros((n, 0), dtype=numpy.int64)
+        return numpy.stack(columns, axis=1)
+
+    def iter_clauses(self, context: LogicalOperatorContext) -> Iterator[CNFLine]:
+        block = self.block(context)
+        if isinstance(self.operator, OrOperator):
+            yield tuple(block.ravel().tolist())
+        else:
+            yield from map(tuple, block.tolist())
+
+    def _raise_domain_error(self, context: LogicalOperatorContext, row: int):
+        # Evaluate the failing value to raise the error of the interpreted path.
+        value = self.operator.values[row]
+        self.expression.evaluate(
+            context.expandContext(**dict(zip(self.operator.variables, value)))
+        )
+        raise RuntimeError(
+            f"The vectorized evaluation failed for the value '{value}' in context '{context.vars}'."
+        )
+
+
+def iter_blocks(
+    operator: LogicalOperator, context: LogicalOperatorContext | None = None
+) -> Iterator["numpy.ndarray"]:
+    """
+    Yields the CNF of a vectorized chain as NumPy arrays, where every row is a
+    line of the CNF. Parts of the chain without a 'VectorKernel' yield one
+    array per line.
+    """
+    if context is None:
+        context = LogicalOperatorContext.empty()
+    if operator.kernel is not None:
+        block = operator.kernel.block(context)
+        yield block if isinstance(operator, AndOperator) else block.reshape(1, -1)
+    elif isinstance(operator, AndOperator):
+        for current_context in operator.iter_contexts(context):
+            yield from iter_blocks(operator.suboperator, current_context)
+    else:
+        for clause in operator.iter_clauses(context):
+            yield numpy.array([clause], dtype=numpy.int64).reshape(1, len(clause))
@@ -0,0 +1,132 @@
+from sat_expander.Asynchronous import AsyncDimacsSink, aiter_clauses
+from sat_expander.CNF import read_dimacs, CompactCNF
+from sat_expander.Functions import FunctionFactory
+from sat_expander.LogicalOperator import (
+    AndOperator,
+    ExpressionOperator,
+    OrOperator,
+)
+
+from concurrent.futures import ThreadPoolExecutor
+from itertools import product
+import asyncio
+import os
+import sys
+import tempfile
+import threading
+import unittest
+
+
+def build_chain():
+    factory = FunctionFactory()
+    factory.build("f", 2, tuple(product(range(10), range(5))))
+    chain = AndOperator(("x",), ((x,) for x in range(10)))
+    chain.chain(AndOperator(("y",), ((y,) for y in range(5)))).chain(
+        OrOperator(("z",), ((z,) for z in range(5)))
+    ).chain(ExpressionOperator(factory, ("f(x,z)", "-f(x,y)")))
+    return factory, chain
+
+
+class TestAsynchronous(unittest.TestCase):
+    def test_aiter_clauses_batches(self):
+        factory, chain = build_chain()
+        threads = set()
+
+        class RecordingExecutor(ThreadPoolExecutor):
+            def submit(self, fn, *args):
+                def run():
+                    threads.add(threading.get_ident())
+                    return fn(*args)
+
+                return super().submit(run)
+
+        async def collect():
+            with RecordingExecutor(1) as executor:
+                return [
+                    batch
+                    async for batch in chain.aiter_clauses(
+                        batch_size=7, executor=executor
+                    )
+                ]
+
+        batches = asyncio.run(collect())
+        self.assertEqual(sum(batches, ()), chain.evaluate())
+        self.assertEqual([len(batch) for batch in batches], [7] * 7 + [1])
+        self.assertNotIn(threading.get_ident(), threads)
+
+        async def collect_exact(batch_size):
+            return [
+                batch async for batch in aiter_clauses(chain, batch_size=batch_size)
+            ]
+
+        self.assertEqual(
+            [len(batch) for batch in asyncio.run(collect_exact(25))], [25, 25]
+        )
+        with self.assertRaises(ValueError):
+            asyncio.run(collect_exact(0))
+
+    def test_aiter_clauses_early_exit(self):
+        _, chain = build_chain()
+
+        async def first():
+            async for batch in chain.aiter_clauses(batch_size=3):
+                return batch
+
+        self.assertEqual(asyncio.run(first()), chain.evaluate()[:3])
+
+    def test_async_dimacs_sink_file(self):
+        factory, chain = build_chain()
+
+        async def write(path):
+            async with AsyncDimacsSink(path, factory) as sink:
+                return await sink.write_all(chain.aiter_clauses(batch_size=6))
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "out.cnf")
+            # The file is only opened in the executor.
+            AsyncDimacsSink(path, factory)
+            self.assertFalse(os.path.exists(path))
+            self.assertEqual(asyncio.run(write(path)), 50)
+            self.assertEqual(read_dimacs(path), CompactCNF(chain.evaluate()))
+            with open(path) as f:
+                self.assertIn("p cnf         50                   50\n", f.read())
+
+    def test_async_dimacs_sink_stream(self):
+        factory, chain = build_chain()
+
+        async def send():
+            process = await asyncio.create_subprocess_exec(
+                sys.executable,
+                "-c",
+                "import sys; sys.stdout.write(sys.stdin.read())",
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+            )
+            async with AsyncDimacsSink(
+                process.stdin, factory, header="", num_clauses=50
+            ) as sink:
+                await sink.write_all(chain.aiter_clauses(batch_size=16))
+            with self.assertRaises(ValueError):
+                AsyncDimacsSink(process.stdin)
+            sink = AsyncDimacsSink(
+                process.stdin, header="", num_clauses=2, num_variables=3
+            )
+            with self.assertRaises(RuntimeError):
+                await sink.write(((1, 4),))
+            process.stdin.close()
+            output = await process.stdout.read()
+            await process.wait()
+            return output
+
+        lines = asyncio.run(send()).decode().splitlines()
+        self.assertEqual(lines[0], "p cnf 50 50")
+        self.assertEqual(
+            tuple(tuple(map(int, line.split()[:-1])) for line in lines[1:-1]),
+            chain.evaluate(),
+        )
+        # Only the 'p cnf' line of the second sink was written.
+        self.assertEqual(lines[-1], "p cnf 3 2")
+
+
+if __name__ == "__main__":
+    unittest.main()
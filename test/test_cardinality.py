@@ -0,0 +1,237 @@
+from sat_expander.CardinalityEncodings import at_least_k, at_most_k, exactly_one
+from sat_expander.Functions import FunctionFactory
+from sat_expander.LogicalOperator import (
+    AndOperator,
+    AtLeastK,
+    AtMostK,
+    AtMostOne,
+    ExactlyOne,
+    ExpressionOperator,
+    OrOperator,
+)
+from sat_expander.Statistics import Stats
+
+from itertools import product
+import unittest
+
+ENCODINGS = ("pairwise", "sequential", "commander", "ladder", "totalizer")
+
+
+def satisfiable(cnf, assignment):
+    """
+    Small DPLL deciding if the CNF is satisfiable under the assignment.
+    """
+    assignment = set(assignment)
+    lines = []
+    for line in cnf:
+        if any(x in assignment for x in line):
+            continue
+        line = tuple(x for x in line if -x not in assignment)
+        if not line:
+            return False
+        lines.append(line)
+    if not lines:
+        return True
+    literal = min(lines, key=len)[0]
+    return satisfiable(lines, (literal,)) or satisfiable(lines, (-literal,))
+
+
+class TestCardinality(unittest.TestCase):
+    def assert_counts(self, encode, literals, allowed):
+        cnf = tuple(encode())
+        for values in product((False, True), repeat=len(literals)):
+            assignment = tuple(x if value else -x for x, value in zip(literals, values))
+            self.assertEqual(
+                satisfiable(cnf, assignment),
+                sum(values) in allowed,
+                f"{values} with {cnf}",
+            )
+
+    def test_encodings_match_brute_force(self):
+        for n in range(0, 8):
+            literals = tuple(range(1, n + 1))
+            for encoding in ENCODINGS:
+                ks = (
+                    range(-1, n + 2)
+                    if encoding not in ("commander", "ladder")
+                    else (1,)
+                )
+                for k in ks:
+                    with self.subTest(n=n, k=k, encoding=encoding):
+                        counter = iter(range(100, 10_000))
+                        new_variables = lambda c: [next(counter) for _ in range(c)]
+                        self.assert_counts(
+                            lambda: at_most_k(literals, k, encoding, new_variables),
+                            literals,
+                            range(0, k + 1),
+                        )
+                        self.assert_counts(
+                            lambda: at_least_k(literals, k, encoding, new_variables),
+                            literals,
+                            range(k, n + 1),
+                        )
+                with self.subTest(n=n, encoding=encoding):
+                    self.assert_counts(
+                        lambda: exactly_one(literals, encoding, new_variables),
+                        literals,
+                        (1,),
+                    )
+
+    def test_encodings_with_negative_literals(self):
+        literals = (-1, 2, -3, 4, -5)
+        for encoding in ENCODINGS:
+            with self.subTest(encoding=encoding):
+                counter = iter(range(100, 10_000))
+                new_variables = lambda c: [next(counter) for _ in range(c)]
+                self.assert_counts(
+                    lambda: at_most_k(literals, 1, encoding, new_variables),
+                    literals,
+                    (0, 1),
+                )
+
+    def test_unsupported_encoding(self):
+        with self.assertRaises(ValueError):
+            tuple(at_most_k((1, 2, 3, 4), 2, "ladder", lambda c: range(c)))
+        with self.assertRaises(ValueError):
+            tuple(at_most_k((1, 2, 3, 4), 1, "unknown", lambda c: range(c)))
+
+    def test_cardinality_operators(self):
+        factory = FunctionFactory()
+        nodes = range(4)
+        colors = range(3)
+        color = factory.build("color", 2, tuple(product(nodes, colors)))
+        counter_before = factory.variable_counter
+        exactly = (
+            AndOperator(("n",), ((n,) for n in nodes))
+            .chain(
+                ExactlyOne(("c",), ((c,) for c in colors), factory, encoding="ladder")
+            )
+            .chain(ExpressionOperator(factory, ("color(n,c)",)))
+        )
+        cnf = exactly.evaluate()
+        self.assertIn(color.relation[(0, 0)], (x for line in cnf for x in line))
+        self.assertEqual(
+            factory.auxiliary,
+            [
+                (
+                    "ExactlyOne(ladder)",
+                    counter_before + 2 * i,
+                    counter_before + 2 * i + 1,
+                )
+                for i in nodes
+            ],
+        )
+        self.assertEqual(factory.variable_counter, counter_before + 8)
+        for values in product((False, True), repeat=12):
+            assignment = tuple(
+                color.relation[(n, c)] if value else -color.relation[(n, c)]
+                for (n, c), value in zip(product(nodes, colors), values)
+            )
+            exactly_one_color = all(sum(values[3 * n : 3 * n + 3]) == 1 for n in nodes)
+            self.assertEqual(satisfiable(cnf, assignment), exactly_one_color)
+
+    def test_cardinality_operator_reevaluation(self):
+        factory = FunctionFactory()
+        factory.build("g", 2, tuple(product(range(4), range(3))))
+        chain = (
+            AndOperator(("n",), ((n,) for n in range(4)))
+            .chain(AtMostOne(("c",), ((c,) for c in range(3)), factory))
+            .chain(ExpressionOperator(factory, ("g(n,c)",)))
+        )
+        cnf = chain.evaluate()
+        counter = factory.variable_counter
+        auxiliary = list(factory.auxiliary)
+        self.assertEqual(len(auxiliary), 4)
+        self.assertEqual(chain.evaluate(), cnf)
+        self.assertEqual(chain.evaluate(stats=Stats()), cnf)
+        self.assertEqual(factory.variable_counter, counter)
+        self.assertEqual(factory.auxiliary, auxiliary)
+        self.assertTrue(chain.allocates_variables())
+        with self.assertRaises(ValueError):
+            chain.evaluate(workers=2)
+        self.assertEqual(factory.variable_counter, counter)
+
+        pairwise = (
+            AndOperator(("n",), ((n,) for n in range(4)))
+            .chain(
+                AtMostOne(
+                    ("c",), ((c,) for c in range(3)), factory, encoding="pairwise"
+                )
+            )
+            .chain(ExpressionOperator(factory, ("g(n,c)",)))
+        )
+        self.assertFalse(pairwise.allocates_variables())
+        self.assertEqual(pairwise.evaluate(workers=2), pairwise.evaluate())
+
+    def test_cardinality_operator_without_aux_variables(self):
+        factory = FunctionFactory()
+        g = factory.build("g", 1, ((i,) for i in range(4)))
+        at_most = AtMostOne(("i",), ((i,) for i in range(4)), encoding="pairwise")
+        at_most.chain(ExpressionOperator(factory, ("-g(i)",)))
+        self.assertEqual(len(at_most.evaluate()), 6)
+        self.assertEqual(at_most.evaluate()[0], (g.relation[(0,)], g.relation[(1,)]))
+        self.assertEqual(factory.auxiliary, [])
+        with self.assertRaises(ValueError):
+            AtLeastK(("i",), ((i,) for i in range(4)), 2)
+
+    def test_cardinality_operator_k_and_stats(self):
+        factory = FunctionFactory()
+        g = factory.build("g", 1, ((i,) for i in range(5)))
+        for operator, allowed in (
+            (AtMostK(("i",), ((i,) for i in range(5)), 2, factory), range(0, 3)),
+            (
+                AtLeastK(
+                    ("i",), ((i,) for i in range(5)), 3, factory, encoding="totalizer"
+                ),
+                range(3, 6),
+            ),
+        ):
+            operator.chain(ExpressionOperator(factory, ("g(i)",)))
+            stats = Stats()
+            cnf = operator.evaluate(stats=stats)
+            self.assertEqual(stats[0].clauses, len(cnf))
+            self.assertEqual(stats[1].clauses, 5)
+            for values in product((False, True), repeat=5):
+                assignment = tuple(
+                    g.relation[(i,)] if value else -g.relation[(i,)]
+                    for i, value in enumerate(values)
+                )
+                self.assertEqual(satisfiable(cnf, assignment), sum(values) in allowed)
+
+    def test_cardinality_operator_chaining(self):
+        factory = FunctionFactory()
+        factory.build("g", 1, ((i,) for i in range(4)))
+        with self.assertRaises(RuntimeError):
+            OrOperator(("i",), ((i,) for i in range(4))).chain(
+                AtMostOne(("j",), ((j,) for j in range(4)), factory)
+            )
+        with self.assertRaises(RuntimeError):
+            AtMostOne(("i",), ((i,) for i in range(4)), factory).chain(
+                AndOperator(("j",), ((j,) for j in range(4)))
+            )
+        two_literals = (
+            AtMostOne(("i",), ((i,) for i in range(4)), factory)
+            .chain(OrOperator(("j",), ((j,) for j in range(2))))
+            .chain(ExpressionOperator(factory, ("g(j)",)))
+        )
+        with self.assertRaises(RuntimeError):
+            two_literals.evaluate()
+
+    def test_factory_saves_auxiliary_variables(self):
+        import os
+        import tempfile
+
+        factory = FunctionFactory()
+        factory.build("g", 1, ((i,) for i in range(4)))
+        self.assertEqual(factory.new_variables(3, "aux"), range(5, 8))
+        self.assertEqual(factory.new_variables(0), range(8, 8))
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "factory.bin")
+            factory.save(path)
+            loaded = FunctionFactory.load(path)
+        self.assertEqual(loaded.auxiliary, [("aux", 5, 7)])
+        self.assertEqual(loaded.variable_counter, 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,79 @@
+from sat_expander.ClauseStore import ClauseStore
+from sat_expander.CNF import CompactCNF, join_cnfs, read_dimacs
+from sat_expander.Functions import FunctionFactory
+from sat_expander.LogicalOperator import AndOperator, ExpressionOperator, OrOperator
+from sat_expander.Simplification import simplify
+
+from itertools import product
+import os
+import tempfile
+import unittest
+
+
+def lines(n, start=1):
+    return tuple(
+        tuple(range(i, i + i % 4 + 1)) if i % 3 else (-i,)
+        for i in range(start, start + n)
+    )
+
+
+class TestClauseStore(unittest.TestCase):
+    def test_clause_store_spills(self):
+        cnf = lines(5000)
+        with tempfile.TemporaryDirectory() as directory:
+            with ClauseStore(cnf, max_memory_bytes=4096, directory=directory) as store:
+                self.assertGreater(len(store.chunks), 1)
+                self.assertEqual(len(os.listdir(directory)), 0)
+                self.assertLess(store.buffer.nbytes, 4096)
+                self.assertEqual(len(store), len(cnf))
+                self.assertEqual(tuple(store), cnf)
+                # Every pass reads the files again.
+                self.assertEqual(tuple(store), cnf)
+                for index in (0, 1, 1023, 1024, 2500, 4999, -1, -5000):
+                    self.assertEqual(store[index], cnf[index])
+                with self.assertRaises(IndexError):
+                    store[5000]
+                self.assertEqual(sum(map(len, store.iter_chunks())), len(cnf))
+                self.assertEqual(
+                    store.max_variable, max(abs(x) for line in cnf for x in line)
+                )
+            self.assertEqual(len(store), 0)
+            self.assertEqual(tuple(store), ())
+
+    def test_clause_store_emit(self):
+        factory = FunctionFactory()
+        factory.build("f", 2, tuple(product(range(30), repeat=2)))
+        chain = AndOperator(("x",), ((x,) for x in range(30)))
+        chain.chain(AndOperator(("y",), ((y,) for y in range(30)))).chain(
+            OrOperator(("z",), ((z,) for z in range(30)))
+        ).chain(ExpressionOperator(factory, ("-f(x,y)", "f(y,z)")))
+        store = chain.emit(ClauseStore(max_memory_bytes=8192))
+        self.assertGreater(len(store.chunks), 1)
+        self.assertEqual(store, chain.evaluate())
+        store.close()
+
+    def test_clause_store_join(self):
+        first = ClauseStore(lines(3000), max_memory_bytes=4096)
+        second = ClauseStore(lines(2000, start=7), max_memory_bytes=4096)
+        joined = join_cnfs(first, second)
+        self.assertEqual(tuple(joined), lines(3000) + lines(2000, start=7))
+        self.assertEqual(tuple(first), lines(3000))
+        first += CompactCNF(((1, 2),))
+        first += first
+        self.assertEqual(tuple(first), (lines(3000) + ((1, 2),)) * 2)
+        for store in (first, second, joined):
+            store.close()
+
+    def test_clause_store_passes(self):
+        cnf = lines(3000) + lines(3000)
+        with ClauseStore(cnf, max_memory_bytes=4096) as store:
+            with ClauseStore(simplify(store), max_memory_bytes=4096) as simplified:
+                self.assertEqual(tuple(simplified), lines(3000))
+            with tempfile.TemporaryDirectory() as directory:
+                path = os.path.join(directory, "store.cnf")
+                self.assertEqual(store.write_dimacs(path), len(cnf))
+                self.assertEqual(read_dimacs(path), CompactCNF(cnf))
+
+
+if __name__ == "__main__":
+    unittest.main()
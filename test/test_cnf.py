@@ -1,5 +1,20 @@
-from sat_expander.CNF import join_cnfs, cnf_to_dimacs
+from sat_expander.CNF import (
+    join_cnfs,
+    cnf_to_dimacs,
+    compact_variables,
+    write_dimacs,
+    read_dimacs,
+    CompactCNF,
+    DimacsFile,
+)
+from sat_expander.Functions import FunctionFactory, to_tuple_iter
 
+from io import BytesIO, StringIO
+from tempfile import TemporaryDirectory
+import bz2
+import gzip
+import lzma
+import os
 import unittest
 
 
@@ -19,3 +34,220 @@ class TestCNF(unittest.TestCase):
 1 3 -5 0
 """
         self.assertEqual(cnf_to_dimacs(cnf, header=""), expected_result)
+
+    def test_cnf_to_dimacs_gaps(self):
+        cnf = ((-2, 9), (), (9, -4))
+        self.assertEqual(
+            cnf_to_dimacs(cnf, header=""), "p cnf 9 3\n-2 9 0\n0\n9 -4 0\n"
+        )
+
+    def test_compact_variables(self):
+        factory = FunctionFactory()
+        factory.build("f", 1, to_tuple_iter(range(100)))
+        relation = factory.functions[0].relation
+        f = {x: relation[(x,)] for x in (3, 4, 10, 40, 99)}
+        cnf = ((-f[10], f[99]), (), (f[99], -f[40], f[10]), (f[3],))
+        compacted, renumbering = compact_variables(iter(cnf))
+        self.assertEqual(tuple(compacted), ((-2, 4), (), (4, -3, 2), (1,)))
+        self.assertEqual(len(renumbering), 4)
+        self.assertEqual(tuple(renumbering.original), (0, f[3], f[10], f[40], f[99]))
+        self.assertEqual(renumbering.original_literal(-3), -f[40])
+        self.assertEqual(renumbering.renumbered_literal(-f[99]), -4)
+        self.assertEqual(renumbering.renumber(((f[3], -f[40]),)), ((1, -3),))
+        with self.assertRaises(ValueError):
+            renumbering.renumbered_literal(f[4])
+        with self.assertRaises(ValueError):
+            renumbering.original_literal(5)
+        self.assertEqual(
+            cnf_to_dimacs(tuple(compacted), header="").split("\n", 1)[0], "p cnf 4 4"
+        )
+        stream = BytesIO()
+        compacted.write_dimacs(stream, header="")
+        self.assertEqual(
+            stream.getvalue().split(b"\n", 1)[0].split(), [b"p", b"cnf", b"4", b"4"]
+        )
+
+        model = renumbering.restore_model((1, -2, 3, 4))
+        self.assertEqual(tuple(model), (f[3], -f[10], f[40], f[99]))
+        self.assertEqual(
+            [atom.arguments for atom in factory.decode(model)], [(3,), (40,), (99,)]
+        )
+        with self.assertRaises(ValueError):
+            renumbering.restore_model((5,))
+
+        compacted, renumbering = compact_variables(CompactCNF(((), ())))
+        self.assertEqual(tuple(compacted), ((), ()))
+        self.assertEqual(len(renumbering), 0)
+
+
+class TestWriteDimacs(unittest.TestCase):
+    cnf = ((-1, 2, 3), (-2, 3, 4), (-3, 4, 5), (1, 3, -5))
+    clauses = "-1 2 3 0\n-2 3 4 0\n-3 4 5 0\n1 3 -5 0\n"
+
+    def test_write_dimacs_seekable(self):
+        stream = BytesIO()
+        written = write_dimacs(stream, iter(self.cnf), header="", buffer_size=4)
+        self.assertEqual(written, 4)
+        parameters, clauses = stream.getvalue().decode().split("\n", 1)
+        self.assertEqual(parameters.split(), ["p", "cnf", "5", "4"])
+        self.assertEqual(clauses, self.clauses)
+
+    def test_write_dimacs_factory(self):
+        factory = FunctionFactory()
+        factory.build("f", 1, to_tuple_iter(range(7)))
+        stream = StringIO()
+        write_dimacs(stream, iter(self.cnf), factory=factory, header="c test\n")
+        lines = stream.getvalue().split("\n")
+        self.assertEqual(lines[0], "c test")
+        self.assertEqual(lines[1].split(), ["p", "cnf", "7", "4"])
+
+    def test_write_dimacs_file(self):
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "out.cnf")
+            write_dimacs(path, (line for line in self.cnf), header="")
+            with open(path) as f:
+                content = f.read()
+        parameters, clauses = content.split("\n", 1)
+        self.assertEqual(parameters.split(), ["p", "cnf", "5", "4"])
+        self.assertEqual(clauses, self.clauses)
+
+    def test_write_dimacs_compressed(self):
+        factory = FunctionFactory()
+        factory.build("f", 1, to_tuple_iter(range(5)))
+        openers = {"gz": gzip.open, "bz2": bz2.open, "xz": lzma.open}
+        with TemporaryDirectory() as directory:
+            for suffix, opener in openers.items():
+                for clauses, kwargs in (
+                    (iter(self.cnf), {}),
+                    (iter(self.cnf), {"factory": factory, "num_clauses": 4}),
+                    (self.cnf, {"compresslevel": 1}),
+                ):
+                    path = os.path.join(directory, f"out.cnf.{suffix}")
+                    written = write_dimacs(path, clauses, header="c x\n", **kwargs)
+                    self.assertEqual(written, 4)
+                    with opener(path, "rt") as f:
+                        content = f.read()
+                    header, parameters, clauses = content.split("\n", 2)
+                    self.assertEqual(header, "c x")
+                    self.assertEqual(parameters.split(), ["p", "cnf", "5", "4"])
+                    self.assertEqual(clauses, self.clauses)
+                    self.assertEqual(tuple(read_dimacs(path)), self.cnf)
+            self.assertEqual(
+                sorted(os.listdir(directory)),
+                ["out.cnf.bz2", "out.cnf.gz", "out.cnf.xz"],
+            )
+            with self.assertRaises(RuntimeError):
+                write_dimacs(
+                    os.path.join(directory, "out.cnf.gz"), iter(self.cnf), num_clauses=3
+                )
+
+    def test_read_dimacs(self):
+        content = (
+            b"c comment\np cnf 5 4\n-1 2\n 3 0 -2 3 4 0\nc between\n-3 4 5 0\n"
+            b"1 3 -5 0\n%\n0\n"
+        )
+        for buffer_size in (1, 5, 1 << 20):
+            cnf = read_dimacs(BytesIO(content), buffer_size=buffer_size)
+            self.assertEqual(tuple(cnf), self.cnf)
+        self.assertEqual(tuple(read_dimacs(BytesIO(b"p cnf 0 1\n0\n"))), ((),))
+        with self.assertRaises(ValueError):
+            read_dimacs(BytesIO(b"p cnf 2 1\n1 2\n"))
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "out.cnf")
+            write_dimacs(path, iter(self.cnf))
+            self.assertEqual(read_dimacs(path), CompactCNF(self.cnf))
+
+    def test_dimacs_file_append(self):
+        factory = FunctionFactory()
+        factory.build("f", 1, to_tuple_iter(range(5)))
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "out.cnf")
+            write_dimacs(path, iter(self.cnf[:2]), header="c first\n")
+            with DimacsFile(path) as dimacs:
+                self.assertEqual((dimacs.num_variables, dimacs.num_clauses), (4, 2))
+                self.assertEqual(dimacs.add(iter(self.cnf[2:3])), 1)
+            self.assertEqual(read_dimacs(path), CompactCNF(self.cnf[:3]))
+            with DimacsFile(path, factory=factory) as dimacs:
+                dimacs.add(self.cnf[3:])
+                dimacs.add(())
+            with open(path) as f:
+                header, parameters, clauses = f.read().split("\n", 2)
+            self.assertEqual(header, "c first")
+            self.assertEqual(parameters.split(), ["p", "cnf", "5", "4"])
+            self.assertEqual(clauses, self.clauses)
+
+            path = os.path.join(directory, "new.cnf")
+            dimacs = DimacsFile(path, header="")
+            dimacs.add(iter(self.cnf))
+            dimacs.close()
+            dimacs.close()
+            self.assertEqual(read_dimacs(path), CompactCNF(self.cnf))
+
+            path = os.path.join(directory, "string.cnf")
+            with open(path, "w") as f:
+                f.write(cnf_to_dimacs(self.cnf))
+            with self.assertRaises(ValueError):
+                DimacsFile(path)
+            with self.assertRaises(ValueError):
+                DimacsFile(os.path.join(directory, "out.cnf.gz"))
+
+    def test_write_dimacs_not_seekable(self):
+        stream = NotSeekableStream()
+        write_dimacs(stream, self.cnf, header="")
+        self.assertEqual(stream.getvalue().decode(), cnf_to_dimacs(self.cnf, ""))
+        with self.assertRaises(ValueError) as _:
+            write_dimacs(NotSeekableStream(), iter(self.cnf))
+        factory = FunctionFactory()
+        factory.build("f", 1, to_tuple_iter(range(5)))
+        stream = NotSeekableStream()
+        write_dimacs(stream, iter(self.cnf), factory=factory, num_clauses=4, header="")
+        self.assertEqual(stream.getvalue().decode(), cnf_to_dimacs(self.cnf, ""))
+        with self.assertRaises(RuntimeError) as _:
+            write_dimacs(
+                NotSeekableStream(), iter(self.cnf), factory=factory, num_clauses=3
+            )
+
+
+class TestCompactCNF(unittest.TestCase):
+    cnf = ((-1, 2, 3), (), (4,), (1, 3, -5))
+
+    def test_compact_cnf_construction(self):
+        compact = CompactCNF(self.cnf)
+        self.assertEqual(len(compact), 4)
+        self.assertEqual(tuple(compact), self.cnf)
+        self.assertEqual(compact[0], (-1, 2, 3))
+        self.assertEqual(compact[1], ())
+        self.assertEqual(compact[-1], (1, 3, -5))
+        with self.assertRaises(IndexError) as _:
+            compact[4]
+        self.assertEqual(compact, self.cnf)
+        self.assertNotEqual(compact, self.cnf[1:])
+        compact.append((7, -8))
+        self.assertEqual(tuple(compact), self.cnf + ((7, -8),))
+        self.assertEqual(tuple(compact.literals), (-1, 2, 3, 4, 1, 3, -5, 7, -8))
+        self.assertEqual(tuple(compact.offsets), (0, 3, 3, 4, 7, 9))
+
+    def test_compact_cnf_join(self):
+        cnf1 = CompactCNF(self.cnf)
+        cnf2 = CompactCNF(((6, 7), (-8,)))
+        joined = join_cnfs(cnf1, cnf2)
+        self.assertEqual(tuple(joined), self.cnf + ((6, 7), (-8,)))
+        self.assertEqual(tuple(cnf1), self.cnf)
+        self.assertEqual(joined, CompactCNF(self.cnf + ((6, 7), (-8,))))
+        cnf1 += ((9,),)
+        self.assertEqual(tuple(cnf1), self.cnf + ((9,),))
+        joined = join_cnfs(self.cnf, cnf2)
+        self.assertIsInstance(joined, CompactCNF)
+        self.assertEqual(tuple(joined), self.cnf + ((6, 7), (-8,)))
+        self.assertEqual(tuple(join_cnfs(cnf2, self.cnf)), ((6, 7), (-8,)) + self.cnf)
+
+    def test_compact_cnf_dimacs(self):
+        compact = CompactCNF(self.cnf)
+        stream = NotSeekableStream()
+        compact.write_dimacs(stream, header="")
+        self.assertEqual(stream.getvalue().decode(), cnf_to_dimacs(self.cnf, ""))
+
+
+class NotSeekableStream(BytesIO):
+    def seekable(self):
+        return False
@@ -0,0 +1,135 @@
+from sat_expander.Functions import FunctionFactory, ProductDomain, to_tuple_iter
+from sat_expander.LogicalOperator import AndOperator, OrOperator, ExpressionOperator
+from sat_expander.LogicalOperatorContext import LogicalOperatorContext
+from sat_expander.ExclusionPredicates import (
+    check_variables_in_context,
+    exclude_variable,
+    exclude_var_tuple,
+    require_var_in_value,
+    VarNotFoundResponse,
+)
+
+from itertools import product
+
+import unittest
+
+
+class TestCompiledOperator(unittest.TestCase):
+    def test_compiled_readme_chain(self):
+        A = tuple(range(4))
+        V = tuple(range(1, 5))
+        U = tuple(range(1, 7, 2))
+        C = ("also", "valid", "function", "input")
+        factory = FunctionFactory()
+        factory.build("s", 2, product(A, C))
+        factory.build("r", 1, to_tuple_iter(V))
+        factory.build("w", 2, product(U, C))
+        factory.add_constant("t")
+        quant = (
+            AndOperator(("x",), to_tuple_iter(A))
+            .chain(AndOperator(("u", "v"), product(V, U)))
+            .chain(
+                OrOperator(
+                    ("y",), to_tuple_iter(C), exclusion_predicate=exclude_variable("x")
+                )
+            )
+            .chain(ExpressionOperator(factory, ("s(x,y)", "r(u)", "w(v, y)", "-t")))
+        )
+        self.assertEqual(quant.compile().evaluate(), quant.evaluate())
+
+    def test_compiled_predicates_and_context(self):
+        factory = FunctionFactory()
+        factory.add_constant("n")
+        base_set = tuple(product(range(1, 4), repeat=2))
+        factory.build("f", 2, base_set)
+
+        @check_variables_in_context(
+            "x", "y", "c", var_not_found_response=VarNotFoundResponse.ERROR
+        )
+        def predicate(context, values):
+            return context.vars["x"] != context.vars["y"] + context.vars["c"]
+
+        quant = AndOperator(("x", "y"), base_set, exclude_predicate=predicate).chain(
+            ExpressionOperator(factory, ("n", "f(x,y)", "-f(y,z)"))
+        )
+        context = LogicalOperatorContext.empty().expandContext(c=1, z=2)
+        compiled = quant.compile()
+        self.assertEqual(compiled.free_variables, ("z",))
+        self.assertEqual(compiled.evaluate(context), quant.evaluate(context))
+        with self.assertRaises(ValueError) as _:
+            compiled.evaluate(LogicalOperatorContext.empty().expandContext(c=1))
+        with self.assertRaises(ValueError) as _:
+            compiled.evaluate(context.expandContext(x=1))
+
+    def test_compiled_value_index(self):
+        V = tuple(range(1, 6))
+        E = tuple((u, w) for u in V for w in V if u < w)
+        factory = FunctionFactory()
+        factory.build("p", 2, E)
+        quant = (
+            AndOperator(("v",), to_tuple_iter(V))
+            .chain(AndOperator(("u", "w"), E, require_var_in_value("v")))
+            .chain(
+                AndOperator(
+                    ("r", "s"),
+                    E,
+                    require_var_in_value("v") & exclude_var_tuple("u", "w"),
+                )
+            )
+            .chain(ExpressionOperator(factory, ("-p(u,w)", "-p(r,s)")))
+        )
+        compiled = quant.compile()
+        self.assertIn("_index1.get(", compiled.source)
+        self.assertIn("_index2.get(", compiled.source)
+        self.assertEqual(compiled.evaluate(), quant.evaluate())
+        self.assertEqual(len(compiled.evaluate()), 5 * 4 * 3)
+
+    def test_compiled_product_function(self):
+        factory = FunctionFactory()
+        factory.add_constant("t")
+        factory.build("f", 3, ProductDomain(range(3), "abc", range(2)))
+        quant = (
+            AndOperator(("x", "z"), product(range(3), range(3)))
+            .chain(OrOperator(("y",), to_tuple_iter("abcd")))
+            .chain(ExpressionOperator(factory, ("-f(x, y, z)", "t")))
+        )
+        with self.assertRaises(ValueError) as _:
+            quant.compile().evaluate()
+        quant.suboperator.values = tuple(to_tuple_iter("abc"))
+        quant.values = tuple(product(range(3), range(2)))
+        self.assertEqual(quant.compile().evaluate(), quant.evaluate())
+
+    def test_compiled_or_chain(self):
+        factory = FunctionFactory()
+        func = factory.build("f", 2, product(range(3), repeat=2))
+        quant = (
+            OrOperator(("x",), to_tuple_iter(range(3)))
+            .chain(OrOperator(("y",), to_tuple_iter(range(2))))
+            .chain(ExpressionOperator(factory, ("f(x,y)",)))
+        )
+        self.assertEqual(quant.compile().evaluate(), quant.evaluate())
+        self.assertTrue(func.was_evaluated)
+
+    def test_compiled_errors(self):
+        factory = FunctionFactory()
+        factory.build("f", 1, to_tuple_iter(range(3)))
+        quant = AndOperator(("x",), to_tuple_iter(range(4))).chain(
+            ExpressionOperator(factory, ("f(x)",))
+        )
+        clauses = quant.compile().iter_clauses()
+        f = factory.functions[0].relation
+        self.assertEqual(
+            tuple(next(clauses) for _ in range(3)), ((f[(0,)],), (f[(1,)],), (f[(2,)],))
+        )
+        with self.assertRaises(ValueError) as _:
+            next(clauses)
+        with self.assertRaises(RuntimeError) as _:
+            AndOperator(("x", "y"), to_tuple_iter(range(4))).chain(
+                ExpressionOperator(factory, ("f(x)",))
+            ).compile()
+        with self.assertRaises(ValueError) as _:
+            AndOperator(("x",), to_tuple_iter(range(3))).chain(
+                AndOperator(("x",), to_tuple_iter(range(3)))
+            ).chain(ExpressionOperator(factory, ("f(x)",))).compile()
+        with self.assertRaises(RuntimeError) as _:
+            AndOperator(("x",), to_tuple_iter(range(3))).compile()
@@ -1,10 +1,14 @@
 from sat_expander.ExclusionPredicates import (
     exclude_variable,
     exclude_var_tuple,
+    require_var_in_value,
+    require_value_item,
     _handle_vars_not_found,
     VarNotFoundResponse,
+    AllOf,
 )
 
+import pickle
 import unittest
 
 
@@ -45,6 +49,57 @@ class TestExclusionPredicates(unittest.TestCase):
         context = DummyContext({"x": 1, "y": 2, "a": 2})
         self.assertEqual(values, tuple(x for x in values if predicate(context, x)))
 
+    def test_require_var_in_value_predicate(self):
+        values = ((1, 2), (2, 3), (3, 1), (4, 4))
+        context = DummyContext({"x": 1})
+        predicate = require_var_in_value(
+            "x", var_not_found_response=VarNotFoundResponse.ERROR
+        )
+        self.assertEqual(
+            ((1, 2), (3, 1)), tuple(x for x in values if predicate(context, x))
+        )
+        self.assertEqual(tuple(predicate.index_keys((4, 4))), (4,))
+        self.assertIs(predicate.indexable(), predicate)
+        with self.assertRaises(RuntimeError) as _:
+            predicate(DummyContext({"y": 1}), (1, 2))
+
+    def test_require_value_item_predicate(self):
+        values = ((1, 2), (2, 3), (3, 1), (1, 4))
+        context = DummyContext({"x": 1})
+        predicate = require_value_item(0, "x")
+        self.assertEqual(
+            ((1, 2), (1, 4)), tuple(x for x in values if predicate(context, x))
+        )
+        self.assertEqual(tuple(predicate.index_keys((3, 1))), (3,))
+
+    def test_all_of_predicate(self):
+        values = ((1, 2), (2, 3), (3, 1), (1, 4))
+        context = DummyContext({"x": 1, "y": 4})
+        in_value = require_var_in_value("x")
+        predicate = in_value & (lambda context, value: context.vars["y"] not in value)
+        self.assertIsInstance(predicate, AllOf)
+        self.assertIs(predicate.indexable(), in_value)
+        self.assertEqual(
+            ((1, 2), (3, 1)), tuple(x for x in values if predicate(context, x))
+        )
+        own = predicate.predicates[1]
+        for predicate in (own & in_value, own & (in_value & exclude_variable("y"))):
+            self.assertIsInstance(predicate, AllOf)
+            self.assertIs(predicate.predicates[0], own)
+            self.assertIs(predicate.indexable(), in_value)
+            self.assertEqual(
+                ((1, 2), (3, 1)), tuple(x for x in values if predicate(context, x))
+            )
+        predicate = exclude_variable("y") & exclude_var_tuple("x", "y")
+        self.assertIsNone(predicate.indexable())
+
+    def test_predicates_picklable(self):
+        predicate = require_var_in_value("x") & exclude_var_tuple("x", "y")
+        context = DummyContext({"x": 1, "y": 2})
+        copied = pickle.loads(pickle.dumps(predicate))
+        self.assertTrue(copied(context, (1, 3)))
+        self.assertFalse(copied(context, (1, 2)))
+
 
 class DummyContext:
     def __init__(self, vars):
@@ -1,7 +1,21 @@
 import unittest
 
 from sat_expander.LogicalOperatorContext import LogicalOperatorContext
-from sat_expander.Functions import Function, FunctionFactory, to_tuple_iter
+from sat_expander.Functions import (
+    Atom,
+    Function,
+    FunctionFactory,
+    ProductDomain,
+    ProductFunction,
+    to_tuple_iter,
+)
+
+from itertools import product
+from tempfile import TemporaryDirectory
+import os
+import pickle
+import subprocess
+import sys
 
 
 class TestFunction(unittest.TestCase):
@@ -49,6 +63,40 @@ class TestFunction(unittest.TestCase):
         self.assertEqual(f[(0, 1)], f[(1, 0)])
         self.assertNotEqual(f[(2, 3)], f[(3, 1)])
 
+    def test_function_commutative_multiset(self):
+        domain = ((1, 1, 2), (1, 2, 2), (2, 1, 1), ("a", 1, 1), (1, "a", 1))
+        func = Function("test_func", 3, domain, start_variable=1)
+        func.set_commutative()
+        f = func.relation
+        self.assertEqual(f[(1, 1, 2)], f[(2, 1, 1)])
+        self.assertNotEqual(f[(1, 1, 2)], f[(1, 2, 2)])
+        self.assertEqual(f[("a", 1, 1)], f[(1, "a", 1)])
+
+    def test_function_commutative_build(self):
+        factory = FunctionFactory()
+        domain = tuple(product(range(3), repeat=2))
+        func = factory.build("f", 2, domain, commutative=True)
+        f = func.relation
+        self.assertEqual(func.range, (1, 6))
+        self.assertEqual(factory.variable_counter, 7)
+        self.assertEqual(set(f.values()), set(range(1, 7)))
+        for x, y in domain:
+            self.assertEqual(f[(x, y)], f[(y, x)])
+        self.assertNotEqual(f[(0, 1)], f[(0, 2)])
+
+    def test_function_equivalences(self):
+        domain = tuple(to_tuple_iter(range(6)))
+        func = Function("test_func", 1, domain, start_variable=1)
+        f = dict(func.relation)
+        func.set_equivalences((((0,), (1,)), ((2,), (1,)), ((3,), (4,)), ((9,), (5,))))
+        self.assertEqual(func.relation[(1,)], f[(0,)])
+        self.assertEqual(func.relation[(2,)], f[(0,)])
+        self.assertEqual(func.relation[(4,)], f[(3,)])
+        self.assertEqual(func.relation[(5,)], f[(5,)])
+        func.evaluate(("a",), LogicalOperatorContext({"a": 1}))
+        with self.assertRaises(RuntimeError) as _:
+            func.set_equivalences((((0,), (5,)),))
+
     def test_function_tuple_same(self):
         t1 = (1, 2, 3)
         t2 = (3, 2, 1)
@@ -69,3 +117,176 @@ class TestFunction(unittest.TestCase):
         self.assertEqual(func2.relation, {(1,): 4, (2,): 5, (3,): 6})
         with self.assertRaises(ValueError) as _:
             factory.build("func1", 1, domain)
+
+    def test_function_deterministic_order(self):
+        code = (
+            "from sat_expander.Functions import Function, to_tuple_iter;"
+            "f = Function('f', 1, to_tuple_iter(('also', 'valid', 'input')), 1);"
+            "print(f.relation)"
+        )
+        outputs = set()
+        for seed in ("1", "2", "3"):
+            outputs.add(
+                subprocess.run(
+                    (sys.executable, "-c", code),
+                    env={**os.environ, "PYTHONHASHSEED": seed},
+                    capture_output=True,
+                    check=True,
+                    text=True,
+                ).stdout
+            )
+        self.assertEqual(outputs, {"{('also',): 1, ('valid',): 2, ('input',): 3}\n"})
+
+    def test_function_factory_save_load(self):
+        factory = FunctionFactory()
+        func = factory.build("f", 2, product(("a", "b"), ((1, 2), (2, 3))))
+        func.set_equivalent(("a", (1, 2)), ("b", (2, 3)))
+        factory.add_constant("t")
+        factory.build("g", 2, product(range(3), repeat=2), commutative=True)
+        product_func = factory.build("h", 2, ProductDomain(range(2), "xy"))
+        product_func.set_equivalent((0, "x"), (1, "y"))
+        with TemporaryDirectory() as directory:
+            path = os.path.join(directory, "variables.map")
+            factory.save(path)
+            loaded = FunctionFactory.load(path)
+            self.assertEqual(loaded.variable_counter, factory.variable_counter)
+            for original, restored in zip(factory.functions, loaded.functions):
+                self.assertEqual(original.name, restored.name)
+                self.assertEqual(original.range, restored.range)
+                self.assertEqual(original.commutative, restored.commutative)
+                self.assertEqual(dict(original.relation), dict(restored.relation))
+            context = LogicalOperatorContext({"x": "b", "y": (2, 3)})
+            self.assertEqual(
+                loaded.functions[0].evaluate(("x", "y"), context),
+                func.evaluate(("x", "y"), context),
+            )
+            with self.assertRaises(ValueError) as _:
+                loaded.functions[0].evaluate(("y", "x"), context)
+            copied = pickle.loads(pickle.dumps(loaded.functions[0]))
+            self.assertEqual(dict(copied.relation), dict(func.relation))
+            # The arguments are looked up in the memory mapped key table.
+            relation = loaded.functions[2].relation
+            self.assertIsInstance(relation.key_table, memoryview)
+            self.assertEqual(list(relation), list(factory.functions[2].relation))
+            self.assertEqual(relation[(2, 1)], relation[(1, 2)])
+            self.assertIn((0, 2), relation)
+            self.assertNotIn((0, 3), relation)
+            self.assertNotIn([0, 2], relation)
+            self.assertNotIn((0, {}), relation)
+            with self.assertRaises(KeyError) as _:
+                relation[(3,)]
+            loaded.functions[2].set_equivalent((0, 0), (2, 2))
+            self.assertEqual(relation[(2, 2)], relation[(0, 0)])
+            self.assertEqual(relation.overrides, {(2, 2): relation[(0, 0)]})
+            # No index from the arguments is built by the lookups.
+            self.assertEqual(
+                [
+                    key
+                    for key, value in vars(relation).items()
+                    if isinstance(value, dict)
+                ],
+                ["overrides"],
+            )
+            del loaded, copied, relation
+        with self.assertRaises(ValueError) as _:
+            factory = FunctionFactory()
+            factory.build("f", 1, to_tuple_iter((object(),)))
+            factory.save(os.devnull)
+
+
+class TestDecode(unittest.TestCase):
+    def test_function_factory_decode(self):
+        factory = FunctionFactory()
+        f = factory.build("f", 2, product(("a", "b"), (1, 2)))
+        f.set_equivalent(("a", 1), ("b", 2))
+        t = factory.add_constant("t")
+        g = factory.build("g", 2, product(range(3), repeat=2), commutative=True)
+        h = factory.build("h", 2, ProductDomain(range(2), "xy"))
+        aux = factory.new_variables(2, "aux")
+        model = [x if x % 2 else -x for x in range(1, factory.variable_counter + 3)]
+        true_atoms = factory.decode(model)
+        self.assertEqual(
+            true_atoms,
+            [atom for atom in factory.decode(model, true_only=False) if atom.value],
+        )
+        for atom in factory.decode(model, true_only=False):
+            func = next(
+                (func for func in factory.functions if func.name == atom.function), None
+            )
+            variable = (
+                atom.arguments[0] if func is None else func.relation[atom.arguments]
+            )
+            self.assertEqual(atom.value, variable % 2 == 1)
+            self.assertEqual(factory.lookup(variable), atom[:2])
+            self.assertEqual(factory.lookup(-variable), atom[:2])
+        self.assertIn(Atom("f", ("a", 1), True), true_atoms)
+        self.assertNotIn(("b", 2), (atom.arguments for atom in true_atoms))
+        self.assertEqual(
+            sum(1 for atom in factory.decode(model, ("g",), False)),
+            len(set(map(g.relation.__getitem__, g.relation))),
+        )
+        self.assertEqual(
+            factory.decode(model, (h, "aux")),
+            [
+                Atom("h", args, True)
+                for args in product(range(2), "xy")
+                if h.relation[args] % 2
+            ]
+            + [Atom("aux", (v,), True) for v in aux if v % 2],
+        )
+        self.assertEqual(factory.decode([t.value]), [Atom("t", (), True)])
+        self.assertEqual(factory.decode([]), [])
+        self.assertIsNone(factory.lookup(0))
+        self.assertIsNone(factory.lookup(factory.variable_counter))
+        # The unused variable of the equivalent arguments.
+        self.assertIsNone(factory.lookup(f.range[1]))
+
+
+class TestProductFunction(unittest.TestCase):
+    def test_product_domain(self):
+        A = (3, 1, 2)
+        C = ("a", "b")
+        domain = ProductDomain(A, C)
+        self.assertEqual(len(domain), 6)
+        self.assertEqual(tuple(domain), tuple(product(A, C)))
+        self.assertEqual(tuple(domain[i] for i in range(6)), tuple(product(A, C)))
+        self.assertEqual(domain.index((1, "b")), 3)
+        self.assertIn((2, "a"), domain)
+        self.assertNotIn((2, "c"), domain)
+        self.assertNotIn((2,), domain)
+        self.assertNotIn([2, "a"], domain)
+        with self.assertRaises(ValueError) as _:
+            ProductDomain((1, 1), C)
+
+    def test_product_function(self):
+        factory = FunctionFactory()
+        factory.add_constant("n")
+        func = factory.build("f", 2, ProductDomain(range(3), "ab"))
+        self.assertIsInstance(func, ProductFunction)
+        self.assertEqual(func.range, (2, 7))
+        self.assertEqual(factory.variable_counter, 8)
+        self.assertEqual(
+            sorted(func.relation[args] for args in product(range(3), "ab")),
+            list(range(2, 8)),
+        )
+        self.assertEqual(func.relation.get((0, "c")), None)
+        context = LogicalOperatorContext({"x": 2, "y": "b", "z": 5})
+        self.assertEqual(func.evaluate(("x", "y"), context), 7)
+        with self.assertRaises(ValueError) as _:
+            func.evaluate(("z", "y"), context)
+        with self.assertRaises(ValueError) as _:
+            func.evaluate(("x",), context)
+
+    def test_product_function_equivalent(self):
+        func = ProductFunction("f", 2, ProductDomain(range(3), range(3)), 1)
+        func.set_commutative()
+        f = func.relation
+        self.assertEqual(f[(0, 1)], f[(1, 0)])
+        self.assertEqual(f[(2, 1)], f[(1, 2)])
+        self.assertNotEqual(f[(0, 1)], f[(0, 2)])
+        func.set_equivalent((0, 0), (2, 2))
+        self.assertEqual(f[(0, 0)], f[(2, 2)])
+        factory = FunctionFactory()
+        func = factory.build("f", 2, ProductDomain(range(3), range(3)), True)
+        self.assertNotIsInstance(func, ProductFunction)
+        self.assertEqual(func.range, (1, 6))
@@ -0,0 +1,106 @@
+from sat_expander.Functions import FunctionFactory, to_tuple_iter
+from sat_expander.LogicalOperator import AndOperator, OrOperator, ExpressionOperator
+from sat_expander.ExclusionPredicates import check_variables_in_context
+from sat_expander.Parallel import parallel_iter_clauses
+
+from itertools import product
+import multiprocessing
+import pickle
+
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@check_variables_in_context("x", "y")
+def x_not_y(context, values):
+    return context.vars["x"] != context.vars["y"]
+
+
+class TestParallel(unittest.TestCase):
+    def build(self, predicate):
+        base_set = tuple(range(7))
+        factory = FunctionFactory()
+        factory.build("f", 2, product(base_set, repeat=2))
+        factory.add_constant("n")
+        return (
+            AndOperator(("x",), to_tuple_iter(base_set))
+            .chain(AndOperator(("z",), to_tuple_iter(base_set)))
+            .chain(
+                OrOperator(
+                    ("y",), to_tuple_iter(base_set), exclusion_predicate=predicate
+                )
+            )
+            .chain(ExpressionOperator(factory, ("f(x, y)", "-f(z, y)", "n")))
+        )
+
+    def test_parallel_closure_predicate(self):
+        offset = 2
+
+        @check_variables_in_context("x", "y")
+        def predicate(context, values):
+            return context.vars["y"] != (context.vars["x"] + offset) % 7
+
+        quant = self.build(predicate)
+        expected_result = quant.evaluate()
+        self.assertEqual(quant.evaluate(workers=2), expected_result)
+        self.assertEqual(tuple(quant.iter_clauses(workers=3)), expected_result)
+        self.assertEqual(
+            tuple(parallel_iter_clauses(quant, None, workers=2, chunk_size=1)),
+            expected_result,
+        )
+
+    @unittest.skipIf(numpy is None, "NumPy is not installed.")
+    def test_parallel_vectorized(self):
+        factory = FunctionFactory()
+        factory.build("g", 1, to_tuple_iter(range(20)))
+        factory.build("f", 2, product(range(20), range(3)))
+
+        def build():
+            return (
+                AndOperator(("x",), to_tuple_iter(range(20)))
+                .chain(ExpressionOperator(factory, ("g(x)",)))
+                .vectorize()
+            )
+
+        expected_result = build().evaluate()
+        self.assertEqual(len(expected_result), 20)
+        self.assertEqual(build().evaluate(workers=2), expected_result)
+        self.assertEqual(
+            tuple(parallel_iter_clauses(build(), None, workers=2, chunk_size=3)),
+            expected_result,
+        )
+        chain = (
+            AndOperator(("x",), to_tuple_iter(range(20)))
+            .chain(OrOperator(("y",), to_tuple_iter(range(3))))
+            .chain(ExpressionOperator(factory, ("f(x, y)", "-g(x)")))
+            .vectorize()
+        )
+        self.assertEqual(chain.evaluate(workers=2), chain.evaluate())
+
+    def test_parallel_marks_functions_evaluated(self):
+        quant = self.build(x_not_y)
+        f = quant.suboperator.suboperator.suboperator.functions_by_name["f"]
+        self.assertFalse(f.was_evaluated)
+        quant.evaluate(workers=2)
+        self.assertTrue(f.was_evaluated)
+        with self.assertRaises(RuntimeError):
+            f.set_equivalent((0, 1), (1, 0))
+
+    def test_parallel_spawn(self):
+        self.assertIs(pickle.loads(pickle.dumps(x_not_y)), x_not_y)
+        quant = self.build(x_not_y)
+        self.assertEqual(
+            tuple(
+                parallel_iter_clauses(
+                    quant,
+                    None,
+                    workers=2,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            ),
+            quant.evaluate(),
+        )
@@ -6,8 +6,14 @@ from sat_expander.LogicalOperator import (
     OrOperator,
     LogicalOperatorType,
 )
-from sat_expander.Functions import Function
+from sat_expander.Functions import Function, FunctionFactory
+from sat_expander.ExclusionPredicates import (
+    exclude_variable,
+    require_value_item,
+    VarInValue,
+)
 
+from itertools import product
 from typing import Tuple
 
 import unittest
@@ -112,6 +118,41 @@ class TestExpressionOperator(unittest.TestCase):
         expression_operator = DummyExpressionOperator(1, 1)
         self.assertEqual(expression_operator.evaluate(None), (("1|1", "2|"),))
 
+    def test_expression_operator_literal_accessors(self):
+        factory = FunctionFactory()
+        f = factory.build("f", 2, ((i, j) for i in range(2) for j in range(3)))
+        g = factory.build("g", 1, ((i,) for i in range(2)))
+        factory.add_constant("t")
+        expression_operator = ExpressionOperator(
+            factory, ("f(x, y)", "-g(x)", "-t", "f(y, x)")
+        )
+        self.assertTrue(expression_operator.literal_resolvers() is not None)
+        context = LogicalOperatorContext({"x": 1, "y": 0})
+        self.assertFalse(f.was_evaluated or g.was_evaluated)
+        cnf = expression_operator.evaluate(context)
+        # The fast path marks the functions itself.
+        self.assertTrue(f.was_evaluated and g.was_evaluated)
+        self.assertEqual(
+            cnf,
+            (
+                tuple(
+                    exp[2] * exp[0].evaluate(exp[1], context)
+                    for exp in expression_operator.expressions
+                ),
+            ),
+        )
+        self.assertEqual(expression_operator.evaluate(context), ((4, -8, -9, 2),))
+        with self.assertRaises(ValueError):
+            expression_operator.evaluate(LogicalOperatorContext({"x": 1}))
+        with self.assertRaises(ValueError):
+            expression_operator.evaluate(LogicalOperatorContext({"x": 1, "y": 2}))
+
+        functions = (DummyFunction("func1", 1, evaluation=1), g, DummyFunction("g", 1))
+        expression_operator = ExpressionOperator(functions, ("g(x)", "func1(x)"))
+        self.assertEqual(expression_operator.expressions[0][0], g)
+        self.assertIsNone(expression_operator.literal_resolvers())
+        self.assertEqual(expression_operator.evaluate(context), ((8, "1|x"),))
+
 
 class TestExistsOperator(unittest.TestCase):
     def test_or_operator_evaluate(self):
@@ -163,6 +204,80 @@ class TestExistsOperator(unittest.TestCase):
         with self.assertRaises(RuntimeError) as _:
             exists.evaluate(context)
 
+    def test_or_operator_definitions(self):
+        factory = FunctionFactory()
+        f = factory.build("f", 2, tuple(product(range(3), range(2))))
+        exists = OrOperator(("y",), ((y,) for y in range(3)), factory=factory)
+        exists.chain(AndOperator(("z",), ((z,) for z in range(2)))).chain(
+            ExpressionOperator(factory, ("f(y,z)",))
+        )
+        cnf = exists.evaluate()
+        self.assertEqual(
+            factory.auxiliary,
+            [
+                ("definition(y=0)", 7, 7),
+                ("definition(y=1)", 8, 8),
+                ("definition(y=2)", 9, 9),
+            ],
+        )
+        self.assertEqual(
+            cnf,
+            ((-7, 1), (-7, 2), (-8, 3), (-8, 4), (-9, 5), (-9, 6), (7, 8, 9)),
+        )
+        # The CNF is satisfiable for an assignment of 'f' iff exists y for all z f(y,z).
+        for values in product((False, True), repeat=6):
+            assignment = dict(zip(range(1, 7), values))
+            expected = any(
+                all(assignment[f.relation[(y, z)]] for z in range(2)) for y in range(3)
+            )
+            satisfiable = any(
+                all(
+                    any(
+                        {**assignment, 7: d0, 8: d1, 9: d2}[abs(x)] == (x > 0)
+                        for x in line
+                    )
+                    for line in cnf
+                )
+                for d0, d1, d2 in product((False, True), repeat=3)
+            )
+            self.assertEqual(satisfiable, expected)
+
+        # Single lines are joined as before and empty CNFs satisfy the line.
+        exists = OrOperator(("a",), ((0,), (1,)), factory=factory)
+        exists.add_suboperator(DummyFixedOperatorEvaluation(((1, 2),)))
+        self.assertEqual(exists.evaluate(), ((1, 2, 1, 2),))
+        exists = OrOperator(("a",), ((0,), (1,)), factory=factory)
+        exists.add_suboperator(DummyFixedOperatorEvaluation(()))
+        self.assertEqual(exists.evaluate(), ())
+        with self.assertRaises(NotImplementedError):
+            OrOperator(("y",), ((0,),), factory=factory).chain(
+                AndOperator(("z",), ((0,),))
+            ).chain(ExpressionOperator(factory, ("f(y,z)",))).compile()
+
+    def test_or_operator_definitions_reevaluation(self):
+        factory = FunctionFactory()
+        factory.build("f", 3, tuple(product(range(2), repeat=3)))
+        chain = (
+            AndOperator(("x",), ((x,) for x in range(2)))
+            .chain(OrOperator(("y",), ((y,) for y in range(2)), factory=factory))
+            .chain(AndOperator(("z",), ((z,) for z in range(2))))
+            .chain(ExpressionOperator(factory, ("f(x,y,z)",)))
+        )
+        cnf = chain.evaluate()
+        self.assertEqual((cnf[4], cnf[9]), ((9, 10), (11, 12)))
+        self.assertEqual(len(factory.auxiliary), 4)
+        self.assertEqual(factory.variable_counter, 13)
+        self.assertEqual(chain.evaluate(), cnf)
+        self.assertEqual(tuple(chain.iter_clauses()), cnf)
+        self.assertEqual(len(factory.auxiliary), 4)
+        self.assertEqual(factory.variable_counter, 13)
+        # The workers would allocate the same definition variables for
+        # different values of 'x'.
+        self.assertTrue(chain.allocates_variables())
+        with self.assertRaises(ValueError):
+            chain.evaluate(workers=2)
+        self.assertEqual(factory.variable_counter, 13)
+
 
 class TestAllOperator(unittest.TestCase):
     def test_and_operator_evaluate(self):
@@ -187,6 +302,49 @@ class TestAllOperator(unittest.TestCase):
         with self.assertRaises(RuntimeError) as _:
             and_operator.evaluate(context)
 
+    def test_and_operator_iter_clauses(self):
+        values = ((0,), (1,), (2,))
+        and_operator = AndOperator(("a",), values)
+        and_operator.add_suboperator(DummySimpleOperatorEvaluation())
+        clauses = and_operator.iter_clauses()
+        self.assertEqual(next(clauses), ("a: 0",))
+        self.assertEqual(tuple(clauses), (("a: 1",), ("a: 2",)))
+        self.assertEqual(
+            tuple(and_operator.iter_clauses()), and_operator.evaluate()
+        )
+
+    def test_and_operator_value_index(self):
+        values = ((0, 1), (1, 2), (2, 0), (2, 2))
+        predicate = CountingPredicate("c")
+        and_operator = AndOperator(("a", "b"), values, exclude_predicate=predicate)
+        and_operator.add_suboperator(DummySimpleOperatorEvaluation())
+        context = LogicalOperatorContext({"c": 2})
+        self.assertEqual(
+            and_operator.evaluate(context),
+            (
+                ("c: 2", "a: 1", "b: 2"),
+                ("c: 2", "a: 2", "b: 0"),
+                ("c: 2", "a: 2", "b: 2"),
+            ),
+        )
+        self.assertEqual(predicate.calls, 0)
+        self.assertEqual(
+            and_operator.candidate_values(LogicalOperatorContext({"c": 5})), ((), True)
+        )
+        with self.assertWarns(Warning):
+            self.assertEqual(len(and_operator.evaluate()), 4)
+        and_operator.values = ((3, 3),)
+        self.assertEqual(
+            len(and_operator.evaluate(LogicalOperatorContext({"c": 3}))), 1
+        )
+
+        or_operator = OrOperator(("a", "b"), values, require_value_item(1, "c"))
+        or_operator.add_suboperator(DummySimpleOperatorEvaluation())
+        self.assertEqual(
+            or_operator.evaluate(LogicalOperatorContext({"c": 0})),
+            (("c: 0", "a: 2", "b: 0"),),
+        )
+
 
 class TestOperator(unittest.TestCase):
     def test_operator_add_suboperator(self):
@@ -206,6 +364,9 @@ class TestOperator(unittest.TestCase):
         operator8 = LogicalOperator(LogicalOperatorType.ALL, None, ())
         with self.assertRaises(RuntimeError) as _:
             operator7.add_suboperator(operator8)
+        operator7.factory = FunctionFactory()
+        operator7.add_suboperator(operator8)
+        self.assertEqual(operator7.suboperator, operator8)
         operator9 = LogicalOperator(LogicalOperatorType.EXISTS, None, ())
         operator10 = LogicalOperator(LogicalOperatorType.EXISTS, None, ())
         operator9.add_suboperator(operator10)
@@ -240,6 +401,58 @@ class TestOperator(unittest.TestCase):
         with self.assertRaises(RuntimeError) as _:
             operator6.chain(operator7)
 
+    def test_operator_memoization(self):
+        factory = FunctionFactory()
+        factory.build("f", 2, ((i, j) for i in range(3) for j in range(4)))
+        factory.build("g", 1, ((i,) for i in range(4)))
+
+        def create_chain(predicate):
+            return (
+                AndOperator(("x",), ((i,) for i in range(3)))
+                .chain(AndOperator(("y",), ((i,) for i in range(4)), predicate))
+                .chain(OrOperator(("z",), ((i,) for i in range(4))))
+                .chain(ExpressionOperator(factory, ("g(z)", "-f(x,y)")))
+            )
+
+        chain = create_chain(exclude_variable("x"))
+        expected = chain.evaluate()
+        self.assertEqual(chain.suboperator.dependencies(), frozenset({"x"}))
+        self.assertEqual(
+            chain.suboperator.suboperator.dependencies(), frozenset({"x", "y"})
+        )
+        chain.enable_memoization()
+        self.assertIsNone(chain.suboperator.memo)
+        self.assertIsNone(chain.suboperator.suboperator.memo)
+        self.assertEqual(chain.evaluate(), expected)
+
+        chain = AndOperator(("x",), ((i,) for i in range(3))).chain(
+            OrOperator(("z",), ((i,) for i in range(4)))
+        )
+        chain.chain(ExpressionOperator(factory, ("g(z)",)))
+        chain.enable_memoization(maxsize=1)
+        memo = chain.suboperator.memo
+        self.assertEqual(memo.dependencies, ())
+        self.assertEqual(chain.evaluate(), ((13, 14, 15, 16),) * 3)
+        self.assertEqual((memo.hits, memo.misses), (2, 1))
+        chain.clear_memoization()
+        self.assertEqual(len(memo.entries), 0)
+
+        chain = create_chain(lambda context, value: value[0] != context.vars["x"])
+        self.assertIsNone(chain.suboperator.dependencies())
+        chain.enable_memoization()
+        self.assertIsNone(chain.suboperator.memo)
+        self.assertEqual(chain.evaluate(), expected)
+
+
+class CountingPredicate(VarInValue):
+    def __init__(self, var):
+        super().__init__(var)
+        self.calls = 0
+
+    def __call__(self, context, value):
+        self.calls += 1
+        return super().__call__(context, value)
+
 
 class DummyFunction(Function):
     def __init__(self, name: str, length: int, evaluation=0):
@@ -5,6 +5,8 @@ from sat_expander.ExclusionPredicates import (
     VarNotFoundResponse,
 )
 
+from sat_expander.CNF import CompactCNF
+
 from itertools import product
 
 import unittest
@@ -28,6 +30,7 @@ class TestScenarios(unittest.TestCase):
             (f[(3, 1)], f[(3, 2)], f[(3, 3)]),
         )
         self.assertEqual(quant.evaluate(), expected_res)
+        self.assertEqual(tuple(quant.iter_clauses()), expected_res)
 
     def test_scenario2(self):
         base_set1 = set(range(1, 4))
@@ -56,6 +59,7 @@ class TestScenarios(unittest.TestCase):
             (-f[(3, "cc")], g[(3,)]),
         )
         self.assertEqual(quant.evaluate(), expected_result)
+        self.assertEqual(tuple(quant.emit(CompactCNF())), expected_result)
 
     def test_scenario3(self):
         base_set1 = set(range(1, 4))
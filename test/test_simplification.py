@@ -0,0 +1,34 @@
+from sat_expander.Simplification import ClauseSimplifier, simplify
+
+import unittest
+
+
+class TestSimplification(unittest.TestCase):
+    def test_simplify_tautologies_and_literals(self):
+        cnf = ((-1, 1), (1, 2, 1, 3, 2), (4, -5, -4), (-5,))
+        self.assertEqual(tuple(simplify(cnf)), ((1, 2, 3), (-5,)))
+        self.assertEqual(
+            tuple(simplify(cnf, drop_tautologies=False)),
+            ((-1, 1), (1, 2, 3), (4, -5, -4), (-5,)),
+        )
+        self.assertEqual(
+            tuple(simplify(cnf, remove_duplicate_literals=False)),
+            ((1, 2, 1, 3, 2), (-5,)),
+        )
+
+    def test_simplify_deduplicate(self):
+        cnf = ((-1, -2), (-2, -1), (3,), (-1, -2, -1), (3,), (2, 1))
+        simplifier = ClauseSimplifier()
+        self.assertEqual(tuple(simplifier(cnf)), ((-1, -2), (3,), (2, 1)))
+        self.assertEqual(simplifier.dropped_duplicates, 3)
+        self.assertEqual(
+            tuple(simplify(cnf, deduplicate=False)),
+            ((-1, -2), (-2, -1), (3,), (-1, -2), (3,), (2, 1)),
+        )
+
+    def test_simplify_spill_to_disk(self):
+        cnf = tuple((i, -(i + 1)) for i in range(1, 50))
+        simplifier = ClauseSimplifier(max_memory_clauses=4)
+        result = tuple(simplifier(cnf + tuple(reversed(cnf)) + cnf[::-1]))
+        self.assertEqual(result, cnf)
+        self.assertEqual(simplifier.dropped_duplicates, 2 * len(cnf))
@@ -0,0 +1,186 @@
+from sat_expander.Functions import FunctionFactory, to_tuple_iter
+from sat_expander.LogicalOperator import (
+    AndOperator,
+    ExactlyOne,
+    OrOperator,
+    ExpressionOperator,
+)
+from sat_expander.ExclusionPredicates import exclude_variable
+from sat_expander.Solver import SolverPipe, parse_solver_output, read_solver_output
+
+from itertools import product
+from tempfile import TemporaryDirectory
+import gzip
+import os
+import subprocess
+import sys
+
+import unittest
+
+# Stand-in solver: checks the 'p cnf' line and tries all assignments.
+BRUTE_FORCE_SOLVER = """
+import sys
+from itertools import product
+header = None
+clauses = []
+clause = []
+for line in sys.stdin:
+    if line.startswith("c"):
+        continue
+    if line.startswith("p"):
+        header = tuple(map(int, line.split()[2:]))
+        continue
+    for literal in map(int, line.split()):
+        if literal == 0:
+            clauses.append(clause)
+            clause = []
+        else:
+            clause.append(literal)
+if header[1] != len(clauses):
+    print("c wrong number of clauses")
+    sys.exit(1)
+print("c solving", header[0], "variables")
+for assignment in product((False, True), repeat=header[0]):
+    if all(any(assignment[abs(x) - 1] == (x > 0) for x in c) for c in clauses):
+        values = [i + 1 if v else -(i + 1) for i, v in enumerate(assignment)]
+        print("s SATISFIABLE")
+        print("v", *values[:2])
+        print("v", *values[2:], 0)
+        sys.exit(10)
+print("s UNSATISFIABLE")
+sys.exit(20)
+"""
+
+
+class TestSolver(unittest.TestCase):
+    def build(self, n):
+        # Each x is mapped to a different y, i.e. a permutation with x != y.
+        base_set = tuple(range(n))
+        factory = FunctionFactory()
+        factory.build("f", 2, product(base_set, repeat=2))
+        each = (
+            AndOperator(("x",), to_tuple_iter(base_set))
+            .chain(OrOperator(("y",), to_tuple_iter(base_set), exclude_variable("x")))
+            .chain(ExpressionOperator(factory, ("f(x, y)",)))
+        )
+        once = (
+            AndOperator(("y",), to_tuple_iter(base_set))
+            .chain(AndOperator(("x", "z"), product(base_set, repeat=2)))
+            .chain(ExpressionOperator(factory, ("-f(x, y)", "-f(z, y)")))
+        )
+        return factory, each, once
+
+    def test_solver_pipe_satisfiable(self):
+        factory, each, once = self.build(3)
+        cnf = each.evaluate() + tuple(
+            line for line in once.evaluate() if line[0] != line[1]
+        )
+        pipe = SolverPipe((sys.executable, "-c", BRUTE_FORCE_SOLVER), factory=factory)
+        result = pipe.solve(cnf)
+        self.assertEqual(result.status, "SATISFIABLE")
+        self.assertTrue(result.satisfiable)
+        self.assertEqual(result.returncode, 10)
+        self.assertEqual(result.comments, ["c solving 9 variables"])
+        self.assertEqual(len(result.model), 9)
+        model = set(result.model)
+        self.assertTrue(all(any(x in model for x in line) for line in cnf))
+
+        result = pipe.solve(iter(cnf), num_clauses=len(cnf))
+        self.assertTrue(result.satisfiable)
+        result = SolverPipe((sys.executable, "-c", BRUTE_FORCE_SOLVER)).solve(
+            lambda: iter(cnf[:3])
+        )
+        self.assertEqual(result.comments, ["c solving 8 variables"])
+        self.assertTrue(result.satisfiable)
+
+    def test_solver_pipe_unsatisfiable(self):
+        factory, each, once = self.build(1)
+        pipe = SolverPipe((sys.executable, "-c", BRUTE_FORCE_SOLVER), factory=factory)
+        result = pipe.solve(each.iter_clauses)
+        self.assertFalse(result.satisfiable)
+        self.assertEqual(len(result.model), 0)
+
+    def test_solver_pipe_cardinality(self):
+        def build():
+            factory = FunctionFactory()
+            g = factory.build("g", 2, tuple(product(range(2), range(3))))
+            chain = (
+                AndOperator(("n",), to_tuple_iter(range(2)))
+                .chain(ExactlyOne(("c",), to_tuple_iter(range(3)), factory))
+                .chain(ExpressionOperator(factory, ("g(n,c)",)))
+            )
+            return factory, g, chain
+
+        factory, g, chain = build()
+        pipe = SolverPipe((sys.executable, "-c", BRUTE_FORCE_SOLVER), factory=factory)
+        # The counting pass allocates the auxiliary variables and the second
+        # pass reuses them, so the 'p cnf' line covers them.
+        result = pipe.solve(chain.iter_clauses)
+        self.assertTrue(result.satisfiable)
+        self.assertEqual(
+            result.comments, [f"c solving {factory.variable_counter - 1} variables"]
+        )
+        self.assertEqual(len(factory.auxiliary), 2)
+        model = set(result.model)
+        for n in range(2):
+            self.assertEqual(sum(g.relation[(n, c)] in model for c in range(3)), 1)
+
+        factory, _, chain = build()
+        pipe = SolverPipe((sys.executable, "-c", BRUTE_FORCE_SOLVER), factory=factory)
+        num_clauses = len(chain.evaluate())
+        result = pipe.solve(chain.iter_clauses(), num_clauses=num_clauses)
+        self.assertTrue(result.satisfiable)
+        # Without an evaluation before, the variables are allocated after the
+        # 'p cnf' line was written.
+        factory, _, chain = build()
+        pipe = SolverPipe((sys.executable, "-c", BRUTE_FORCE_SOLVER), factory=factory)
+        with self.assertRaises(RuntimeError):
+            pipe.solve(chain.iter_clauses(), num_clauses=num_clauses)
+
+    def test_solver_pipe_errors(self):
+        pipe = SolverPipe((sys.executable, "-c", BRUTE_FORCE_SOLVER))
+        with self.assertRaisesRegex(ValueError, "number of clauses"):
+            pipe.solve(iter(((1,),)))
+        with self.assertRaisesRegex(ValueError, "number of variables"):
+            pipe.solve(iter(((1,),)), num_clauses=1)
+        with self.assertRaises(RuntimeError):
+            pipe.solve(((1,), (-1, 2)), num_clauses=3)
+        result = SolverPipe(
+            (sys.executable, "-c", "import sys; sys.stdin.close()")
+        ).solve(((1,),) * 100000)
+        self.assertEqual(result.status, "UNKNOWN")
+        pipe = SolverPipe(
+            (sys.executable, "-c", "import time; time.sleep(10)"), timeout=0.1
+        )
+        with self.assertRaises(subprocess.TimeoutExpired):
+            pipe.solve(((1,),))
+
+    def test_parse_solver_output(self):
+        status, model, comments = parse_solver_output(
+            (b"c comment\n", b"s SATISFIABLE\n", b"v 1 -2\n", b"v 3 0\n")
+        )
+        self.assertEqual(status, "SATISFIABLE")
+        self.assertEqual(tuple(model), (1, -2, 3))
+        self.assertEqual(comments, ["c comment"])
+        self.assertEqual(parse_solver_output(("s UNKNOWN",))[0], "UNKNOWN")
+        self.assertEqual(
+            tuple(parse_solver_output(("v 4 -5", "v -6 0"))[1]), (4, -5, -6)
+        )
+
+    def test_read_solver_output(self):
+        output = "c kissat\ns SATISFIABLE\nv -1 2 -3\nv 4 0\n"
+        with TemporaryDirectory() as directory:
+            for name, opener in (("model.txt", open), ("model.txt.gz", gzip.open)):
+                path = os.path.join(directory, name)
+                with opener(path, "wt") as f:
+                    f.write(output)
+                result = read_solver_output(path)
+                self.assertTrue(result.satisfiable)
+                self.assertEqual(tuple(result.model), (-1, 2, -3, 4))
+                self.assertEqual(result.comments, ["c kissat"])
+            path = os.path.join(directory, "values.txt")
+            with open(path, "w") as f:
+                f.write("v 1 -2 0\n")
+            result = read_solver_output(path)
+            self.assertEqual(result.status, "UNKNOWN")
+            self.assertEqual(tuple(result.model), (1, -2))
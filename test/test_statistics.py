@@ -0,0 +1,84 @@
+from sat_expander.Functions import FunctionFactory, to_tuple_iter
+from sat_expander.LogicalOperator import AndOperator, OrOperator, ExpressionOperator
+from sat_expander.ExclusionPredicates import exclude_variable, require_value_item
+from sat_expander.Statistics import EvaluationHook, Stats
+
+from itertools import product
+
+import unittest
+
+
+class RecordingHook(EvaluationHook):
+    def __init__(self):
+        self.events = []
+
+    def operator_entered(self, depth, operator, context):
+        self.events.append(("enter", depth, dict(context.vars)))
+
+    def operator_exited(self, depth, operator, context, seconds):
+        self.events.append(("exit", depth, dict(context.vars)))
+
+
+class TestStatistics(unittest.TestCase):
+    def build(self, predicate):
+        base_set = tuple(range(3))
+        factory = FunctionFactory()
+        factory.build("f", 2, product(base_set, repeat=2))
+        return (
+            AndOperator(("x",), to_tuple_iter(base_set))
+            .chain(OrOperator(("y",), to_tuple_iter(base_set), predicate))
+            .chain(ExpressionOperator(factory, ("f(x, y)",)))
+        )
+
+    def test_stats_counts(self):
+        chain = self.build(exclude_variable("x"))
+        stats = Stats()
+        self.assertEqual(chain.evaluate(stats=stats), chain.evaluate())
+        self.assertEqual(len(stats), 3)
+        self.assertEqual(
+            [record.operator for record in stats.operators],
+            ["AndOperator(x)", "OrOperator(y)", "ExpressionOperator"],
+        )
+        self.assertEqual(
+            [
+                (r.values, r.predicate_calls, r.rejections, r.clauses, r.literals)
+                for r in stats.operators
+            ],
+            [(3, 0, 0, 3, 6), (9, 9, 3, 3, 6), (0, 0, 0, 6, 6)],
+        )
+        self.assertGreaterEqual(stats[0].seconds, stats[1].seconds)
+        self.assertGreaterEqual(stats[1].seconds, stats[2].seconds)
+        self.assertEqual(len(stats.report().splitlines()), 4)
+
+        chain.evaluate(stats=stats)
+        self.assertEqual((stats[1].values, stats[1].rejections), (18, 6))
+        with self.assertRaises(TypeError):
+            chain.evaluate(None, None, stats)
+        with self.assertRaises(TypeError):
+            chain.suboperator.evaluate(None, stats)
+
+    def test_stats_value_index(self):
+        chain = self.build(require_value_item(0, "x"))
+        stats = Stats()
+        self.assertEqual(chain.evaluate(stats=stats), ((1,), (5,), (9,)))
+        self.assertEqual((stats[1].values, stats[1].predicate_calls), (3, 0))
+
+    def test_stats_hooks(self):
+        chain = AndOperator(("x",), to_tuple_iter(range(2))).chain(
+            self.build(None).suboperator
+        )
+        hook = RecordingHook()
+        chain.evaluate(stats=Stats(hooks=(hook,)))
+        self.assertEqual(hook.events[:2], [("enter", 0, {}), ("enter", 1, {"x": 0})])
+        self.assertEqual(hook.events[-1], ("exit", 0, {}))
+        self.assertEqual(sum(event[0] == "enter" for event in hook.events), 9)
+        self.assertEqual(sum(event[0] == "exit" for event in hook.events), 9)
+
+    def test_stats_parallel(self):
+        chain = self.build(exclude_variable("x"))
+        stats = Stats()
+        self.assertEqual(chain.evaluate(workers=2, stats=stats), chain.evaluate())
+        self.assertEqual(
+            [(r.values, r.rejections, r.clauses) for r in stats.operators],
+            [(3, 0, 3), (9, 3, 3), (0, 0, 6)],
+        )
@@ -0,0 +1,171 @@
+from sat_expander.ExclusionPredicates import require_var_in_value
+from sat_expander.Functions import FunctionFactory, to_tuple_iter
+from sat_expander.LogicalOperator import (
+    AndOperator,
+    AtMostK,
+    ExactlyOne,
+    ExpressionOperator,
+    OrOperator,
+)
+from sat_expander.Templates import (
+    FACTORY,
+    ChainTemplate,
+    ChainInstance,
+    OperatorTemplate,
+    Parameter,
+)
+
+from itertools import combinations
+import unittest
+
+from sample.perfect_matching import create_operators
+
+
+def perfect_matching_template() -> ChainTemplate:
+    V = Parameter("V", to_tuple_iter)
+    E = Parameter("E")
+    in_edge = require_var_in_value("v")
+    return (
+        ChainTemplate()
+        .function("p", 2, E)
+        .chain(
+            OperatorTemplate(AndOperator, ("v",), V),
+            OperatorTemplate(OrOperator, ("u", "w"), E, in_edge),
+            expressions=("p(u, w)",),
+        )
+        .chain(
+            OperatorTemplate(AndOperator, ("v",), V),
+            OperatorTemplate(AndOperator, ("u", "w"), E, in_edge),
+            OperatorTemplate(
+                AndOperator,
+                ("r", "s"),
+                E,
+                exclude_predicate=in_edge
+                & (
+                    lambda context, edge: edge != (context.vars["u"], context.vars["w"])
+                ),
+            ),
+            expressions=("-p(u,w)", "-p(r,s)"),
+        )
+    )
+
+
+def graph(n):
+    return tuple(range(n)), tuple(combinations(range(n), 2))
+
+
+def number_of_clauses(instance: ChainInstance) -> int:
+    return sum(1 for _ in instance.iter_clauses())
+
+
+class TestTemplates(unittest.TestCase):
+    def test_template_matches_hand_built_chains(self):
+        template = perfect_matching_template()
+        self.assertEqual(template.parameters, frozenset(("V", "E")))
+        for n in range(2, 6):
+            V, E = graph(n)
+            instance = template.instantiate(V=V, E=E)
+            first, second = create_operators(V, E)
+            self.assertEqual(instance.evaluate(), first.evaluate() + second.evaluate())
+            self.assertEqual(instance.factory.variable_counter, len(E) + 1)
+            self.assertIs(instance.chains[0].suboperator.values, E)
+
+    def test_template_validation(self):
+        template = ChainTemplate().function("p", 2, Parameter("E"))
+        with self.assertRaises(ValueError):
+            template.function("p", 1, ())
+        with self.assertRaises(ValueError):
+            template.chain(
+                OperatorTemplate(AndOperator, ("u", "w"), Parameter("E")),
+                expressions=("q(u,w)",),
+            )
+        with self.assertRaises(ValueError):
+            template.chain(
+                OperatorTemplate(AndOperator, ("u", "w"), Parameter("E")),
+                expressions=("p(u)",),
+            )
+        with self.assertRaises(ValueError):
+            template.chain(
+                OperatorTemplate(AndOperator, ("u", "w"), Parameter("E")),
+                expressions=("p(u,x)",),
+            )
+        with self.assertRaises(RuntimeError):
+            template.chain(
+                OperatorTemplate(OrOperator, ("u",), Parameter("V")),
+                OperatorTemplate(AndOperator, ("w",), Parameter("V")),
+                expressions=("p(u,w)",),
+            )
+        self.assertEqual(template.chains, [])
+        with self.assertRaises(ValueError):
+            perfect_matching_template().instantiate(V=(1, 2))
+        with self.assertRaises(ValueError):
+            perfect_matching_template().instantiate(V=(1, 2), E=((1, 2),), Ee=())
+
+    def test_template_parameters(self):
+        transformed = []
+
+        def transform(values):
+            transformed.append(values)
+            return to_tuple_iter(values)
+
+        V = Parameter("V", transform)
+        template = (
+            ChainTemplate()
+            .function("c", 2, Parameter("domain"))
+            .constant("t")
+            .chain(
+                OperatorTemplate(AndOperator, ("v",), V),
+                OperatorTemplate(ExactlyOne, ("k",), V, FACTORY, encoding="ladder"),
+                expressions=("c(v,k)",),
+            )
+            .chain(expressions=("t",))
+        )
+        V = (1, 2, 3)
+        instance = template.instantiate(V=V, domain=tuple((v, k) for v in V for k in V))
+        self.assertEqual(transformed, [V])
+        self.assertIs(instance.chains[0].suboperator.factory, instance.factory)
+        cnf = instance.evaluate()
+        self.assertEqual(cnf[-1], (10,))
+        self.assertEqual(len(instance.factory.auxiliary), 3)
+
+    def test_template_scalar_parameters(self):
+        template = (
+            ChainTemplate()
+            .function("c", 1, Parameter("V", to_tuple_iter))
+            .chain(
+                OperatorTemplate(
+                    AtMostK,
+                    ("v",),
+                    Parameter("V", to_tuple_iter),
+                    Parameter("k"),
+                    FACTORY,
+                ),
+                expressions=("c(v)",),
+            )
+        )
+        self.assertEqual(template.parameters, frozenset(("V", "k")))
+        for k in range(4):
+            instance = template.instantiate(V=range(4), k=k)
+            self.assertEqual(instance.chains[0].at_most, k)
+            factory = FunctionFactory()
+            factory.build("c", 1, to_tuple_iter(range(4)))
+            expected = AtMostK(("v",), to_tuple_iter(range(4)), k, factory).chain(
+                ExpressionOperator(factory, ("c(v)",))
+            )
+            self.assertEqual(instance.evaluate(), expected.evaluate())
+
+    def test_template_map(self):
+        template = perfect_matching_template()
+        parameter_sets = [dict(zip("VE", graph(n))) for n in range(2, 8)]
+        expected = [number_of_clauses(i) for i in template.instances(parameter_sets)]
+        self.assertEqual(
+            list(template.map(number_of_clauses, parameter_sets)), expected
+        )
+        self.assertEqual(
+            list(template.map(number_of_clauses, parameter_sets, workers=2)),
+            expected,
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,93 @@
+from sat_expander.Functions import FunctionFactory, ProductDomain, to_tuple_iter
+from sat_expander.LogicalOperator import AndOperator, OrOperator, ExpressionOperator
+from sat_expander.LogicalOperatorContext import LogicalOperatorContext
+from sat_expander.ExclusionPredicates import exclude_variable
+from sat_expander.CNF import CompactCNF
+
+from itertools import product
+
+import unittest
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+@unittest.skipIf(numpy is None, "NumPy is not installed.")
+class TestVectorized(unittest.TestCase):
+    def build_factory(self):
+        factory = FunctionFactory()
+        factory.build("s", 2, product(range(4), ("a", "b", "c")))
+        factory.build("r", 1, to_tuple_iter(range(1, 5)))
+        factory.add_constant("t")
+        return factory
+
+    def test_vectorized_and_chain(self):
+        factory = self.build_factory()
+
+        def build():
+            return (
+                AndOperator(("x",), to_tuple_iter(range(4)))
+                .chain(AndOperator(("y", "u"), product(("a", "b", "c"), range(1, 5))))
+                .chain(ExpressionOperator(factory, ("s(x, y)", "-r(u)", "t")))
+            )
+
+        self.assertEqual(build().vectorize().evaluate(), build().evaluate())
+        self.assertEqual(
+            tuple(build().vectorize().emit(CompactCNF())), build().evaluate()
+        )
+
+    def test_vectorized_or_chain(self):
+        factory = self.build_factory()
+
+        def build():
+            return (
+                AndOperator(("x",), to_tuple_iter(range(4)))
+                .chain(OrOperator(("y",), to_tuple_iter(("a", "b", "c"))))
+                .chain(ExpressionOperator(factory, ("s(x, y)", "-t")))
+            )
+
+        self.assertEqual(build().vectorize().evaluate(), build().evaluate())
+        self.assertEqual(
+            tuple(build().vectorize().emit(CompactCNF())), build().evaluate()
+        )
+        empty = OrOperator(("y",), ()).chain(ExpressionOperator(factory, ("-t",)))
+        self.assertEqual(empty.vectorize().evaluate(), ((),))
+
+    def test_vectorized_product_function(self):
+        factory = FunctionFactory()
+        factory.build("s", 2, ProductDomain(range(4), ("a", "b", "c")))
+
+        def build():
+            return (
+                AndOperator(("x",), to_tuple_iter(range(4)))
+                .chain(OrOperator(("y",), to_tuple_iter(("c", "a"))))
+                .chain(ExpressionOperator(factory, ("-s(x, y)",)))
+            )
+
+        self.assertEqual(build().vectorize().evaluate(), build().evaluate())
+
+    def test_vectorized_errors(self):
+        factory = self.build_factory()
+        quant = AndOperator(("x",), to_tuple_iter(range(5))).chain(
+            ExpressionOperator(factory, ("s(x, y)",))
+        )
+        quant.vectorize()
+        context = LogicalOperatorContext.empty().expandContext(y="a")
+        with self.assertRaises(ValueError) as _:
+            quant.evaluate(context)
+        quant = AndOperator(("x",), to_tuple_iter(range(4))).chain(
+            ExpressionOperator(factory, ("s(x, y)",))
+        )
+        quant.vectorize()
+        with self.assertRaises(ValueError) as _:
+            quant.evaluate(LogicalOperatorContext.empty().expandContext(y="d"))
+        with self.assertRaises(ValueError) as _:
+            OrOperator(
+                ("y",), to_tuple_iter("abc"), exclusion_predicate=exclude_variable("x")
+            ).chain(ExpressionOperator(factory, ("s(x, y)",))).vectorize()
+        with self.assertRaises(NotImplementedError) as _:
+            ExpressionOperator(factory, ("s(x, y)",)).vectorize()
+        with self.assertRaises(RuntimeError) as _:
+            AndOperator(("x",), to_tuple_iter(range(4))).vectorize()